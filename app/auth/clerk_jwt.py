@@ -1,50 +1,227 @@
-import requests
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
 from jose import JWTError, jwt
-from fastapi import HTTPException, Request
+from fastapi import HTTPException
+from starlette.requests import HTTPConnection
+from app.services.metrics import track_stage
 
 CLERK_JWKS_URL = "https://grown-bedbug-51.clerk.accounts.dev/.well-known/jwks.json"
 CLERK_ISSUER = "https://grown-bedbug-51.clerk.accounts.dev"
 
-def get_public_key():
+logger = logging.getLogger(__name__)
+
+JWKSFetcher = Callable[[], Awaitable[Dict[str, Any]]]
+
+async def fetch_clerk_jwks() -> Dict[str, Any]:
     """
     Fetches the Clerk JWKS (JSON Web Key Set) for verifying the JWT signature.
     """
-    response = requests.get(CLERK_JWKS_URL)
-    if response.status_code != 200:
-        raise Exception("Could not fetch Clerk JWKS")
-    
-    # Return JWKS (JSON Web Key Set)
-    return response.json()
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=5)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with session.get(CLERK_JWKS_URL) as response:
+            if response.status != 200:
+                raise Exception("Could not fetch Clerk JWKS")
+            # Return JWKS (JSON Web Key Set)
+            return await response.json()
+
+def file_jwks_fetcher(path: str) -> JWKSFetcher:
+    """
+    Returns a fetcher that serves the JWKS from a local JSON file (tests, offline runs).
+    """
+    async def fetch() -> Dict[str, Any]:
+        with open(path) as f:
+            return json.load(f)
+    return fetch
+
+class JWKSCache:
+    """
+    In-process JWKS cache indexed by `kid`.
+
+    - Fresh keys (younger than `ttl`) are served straight from memory.
+    - Stale keys (up to `ttl + stale_ttl`) are still served, while a refresh runs in the background.
+    - An unknown `kid` forces a refresh (key rotation), at most once per `min_refresh_interval`.
+    Concurrent refreshes share a single in-flight fetch.
+    """
+
+    def __init__(
+        self,
+        fetcher: JWKSFetcher,
+        ttl: float = 3600,
+        stale_ttl: float = 86400,
+        min_refresh_interval: float = 30,
+    ):
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _age(self) -> float:
+        if self._fetched_at is None:
+            return float("inf")
+        return time.monotonic() - self._fetched_at
+
+    async def _fetch(self):
+        self._last_attempt = time.monotonic()
+        with track_stage("jwks_fetch"):
+            jwks = await self.fetcher()
+        self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+        self._fetched_at = time.monotonic()
+
+    async def refresh(self):
+        """
+        Refetches the key set; callers arriving during a fetch wait on the same one.
+        """
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._fetch())
+            self._refresh_task = task
+        await asyncio.shield(task)
+
+    def _refresh_in_background(self):
+        task = self._refresh_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return
+
+        async def run():
+            try:
+                await self._fetch()
+            except Exception as e:
+                logger.warning("Background JWKS refresh failed: %s", e)
+
+        self._refresh_task = asyncio.ensure_future(run())
+
+    def _may_force_refresh(self) -> bool:
+        return (
+            self._last_attempt is None
+            or time.monotonic() - self._last_attempt >= self.min_refresh_interval
+        )
+
+    async def get_key(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the JWK for `kid`, or None if the issuer does not publish it.
+        """
+        age = self._age()
+        key = self._keys.get(kid)
+        if key is not None:
+            if age <= self.ttl:
+                return key
+            if age <= self.ttl + self.stale_ttl:
+                self._refresh_in_background()
+                return key
+
+        # Expired key set, or an unknown kid that may indicate a key rotation
+        if age > self.ttl + self.stale_ttl or self._may_force_refresh():
+            try:
+                await self.refresh()
+            except Exception as e:
+                if not self._keys:
+                    raise HTTPException(status_code=503, detail="Could not fetch Clerk JWKS") from e
+                logger.warning("JWKS refresh failed, serving cached keys: %s", e)
+        return self._keys.get(kid)
+
+class VerifiedTokenCache:
+    """
+    Small LRU of already-verified tokens; entries are dropped once the token's `exp` passes.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        payload = self._entries.get(token)
+        if payload is None:
+            return None
+        if payload["exp"] <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return payload
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        # Tokens without an expiry are never cached
+        if not isinstance(payload.get("exp"), (int, float)):
+            return
+        self._entries[token] = payload
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+def _default_fetcher() -> JWKSFetcher:
+    jwks_file = os.environ.get("CLERK_JWKS_FILE")
+    return file_jwks_fetcher(jwks_file) if jwks_file else fetch_clerk_jwks
+
+jwks_cache = JWKSCache(_default_fetcher())
+verified_tokens = VerifiedTokenCache()
+
+def configure_jwks(fetcher: JWKSFetcher, **options):
+    """
+    Replaces the JWKS source (e.g. with file_jwks_fetcher) and drops every cached key and token.
+    """
+    global jwks_cache
+    jwks_cache = JWKSCache(fetcher, **options)
+    verified_tokens.clear()
 
-def verify_clerk_token(token: str):
+async def verify_clerk_token(token: str):
     """
     Verifies the Clerk-issued JWT token and returns the decoded payload if valid.
     """
-    public_keys = get_public_key()
-    
+    cached = verified_tokens.get(token)
+    if cached is not None:
+        return cached
+
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    public_key = await jwks_cache.get_key(kid)
+    if public_key is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
     try:
         # Decode and verify the JWT token
         payload = jwt.decode(
             token,
-            public_keys,
+            public_key,
             algorithms=["RS256"],
             audience=CLERK_ISSUER,
             issuer=CLERK_ISSUER
         )
-        return payload
     except JWTError as e:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def get_current_user(request: Request):
+    verified_tokens.put(token, payload)
+    return payload
+
+async def get_current_user(connection: HTTPConnection):
     """
     Middleware to validate the JWT token from the Authorization header.
+    Works for HTTP requests and WebSockets; browsers cannot set headers on a WebSocket handshake,
+    so there the token may be passed as the `token` query parameter instead.
     """
-    authorization: str = request.headers.get("Authorization")
-    print(f"Request Headers: {request.headers}") 
-    
-    if not authorization or not authorization.startswith("Bearer "):
+    authorization: str = connection.headers.get("Authorization")
+
+    if authorization and authorization.startswith("Bearer "):
+        # Extract the token from the 'Bearer ' part
+        token = authorization.split(" ")[1]
+    elif connection.scope["type"] == "websocket" and connection.query_params.get("token"):
+        token = connection.query_params["token"]
+    else:
         raise HTTPException(status_code=401, detail="Authorization header missing or invalid")
-    
-    # Extract the token from the 'Bearer ' part
-    token = authorization.split(" ")[1]
-    return verify_clerk_token(token)
+    return await verify_clerk_token(token)
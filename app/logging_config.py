@@ -0,0 +1,109 @@
+import atexit
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Credentials that must never reach the log sink
+_SECRET_PATTERNS = [
+    (re.compile(r"""(?i)(['"]?(?:authorization|x-api-key|api[_-]?key)['"]?\s*[:=]\s*)('[^']*'|"[^"]*"|(?:(?:bearer|token|basic)\s+)?[^,\s}]+)"""), r"\1'[REDACTED]'"),
+    (re.compile(r"(?i)\b(bearer|token)\s+[A-Za-z0-9\-_.~+/=]{8,}"), r"\1 [REDACTED]"),
+    (re.compile(r"\beyJ[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+\.[A-Za-z0-9\-_]+"), "[REDACTED_JWT]"),
+]
+
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+class RedactingFilter(logging.Filter):
+    """
+    Masks bearer tokens, API keys and JWTs and truncates oversized messages (code buffers,
+    transcripts, upstream payloads). Runs on the listener thread, off the event loop.
+    """
+
+    def __init__(self, max_chars: int = 2000):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        for pattern, replacement in _SECRET_PATTERNS:
+            message = pattern.sub(replacement, message)
+        if len(message) > self.max_chars:
+            message = f"{message[:self.max_chars]}... [truncated {len(message) - self.max_chars} chars]"
+        record.msg = message
+        record.args = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every `every` records that carry a `sample` key (passed via `extra`), per key.
+    Unmarked records always pass. Runs before records are queued, so dropped ones cost a counter bump.
+    """
+
+    def __init__(self, every: int = 100):
+        super().__init__()
+        self.every = max(every, 1)
+        self._counts: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None:
+            return True
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.every:
+            return False
+        record.msg = f"{record.msg} (sampled 1/{self.every})"
+        return True
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging():
+    """
+    Routes all logging through a queue drained by a background thread, so handlers never do
+    blocking stdout I/O on the event loop.
+
+    Environment:
+        LOG_LEVEL               root level (default INFO)
+        LOG_LEVELS              per-logger overrides, e.g. "app.main=DEBUG,app.auth=WARNING"
+        LOG_SAMPLE_EVERY        keep 1 in N sampled debug events (default 100)
+        LOG_MAX_MESSAGE_CHARS   truncate longer messages (default 2000)
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        sink = logging.StreamHandler(sys.stdout)
+        sink.setFormatter(logging.Formatter(LOG_FORMAT))
+        sink.addFilter(RedactingFilter(int(os.environ.get("LOG_MAX_MESSAGE_CHARS", 2000))))
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(int(os.environ.get("LOG_SAMPLE_EVERY", 100))))
+
+        root = logging.getLogger()
+        root.addHandler(queue_handler)
+        root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+        for name, level in _parse_levels(os.environ.get("LOG_LEVELS", "")).items():
+            logging.getLogger(name).setLevel(level)
+
+        _listener = QueueListener(log_queue, sink, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
@@ -1,28 +1,99 @@
 import os
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends
+import logging
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Request
 from .auth.clerk_jwt import get_current_user
+from .routers import interview
+from .logging_config import setup_logging
 from fastapi.middleware.cors import CORSMiddleware
-import openai
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from .services.http_pool import HTTPPool
+from .services.llm_client import LLMClient
+from .services.tts_cache import AudioCache, audio_cache_key
+from .services.tts_stream import coalesce_frames, split_sentences, stream_in_order
+from .services.session_store import SessionStore, InMemorySessionStore, MongoSessionStore
+from .services.summary import SummaryCompactor, count_tokens, tail_tokens
+from .services.code_delta import DeltaConflict, apply_edits
+from .services.coalescer import FeedbackCoalescer
+from .services.feedback_cache import feedback_cache_key
+from .services.event_log import EventWriter
+from .services.job_queue import DONE, JobQueue, PermanentError, QueueFull
+from .services.tts_format import DEFAULT_ENCODING, DEFAULT_MODEL, DEFAULT_MODELS, TTSFormat, UnsupportedFormat
+from .services.interview_channel import ChannelRegistry, InterviewChannel
+from .services.admission import BACKGROUND, LIVE, AdmissionController, Overloaded
+from .services.solutions import TTLCache, ensure_solution_indexes, find_solutions, format_solution
+from .services.solutions import cache_key as solutions_cache_key
+from .services.problem_index import ProblemNameIndex, keep_index_fresh
+from .services.metrics import MetricsMiddleware, bytes_streamed, observe_stage, registry as metrics_registry, track_stage
+from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
 from typing import List, Dict, Any, Optional
-from uuid import uuid4
 
-import aiohttp
 import asyncio
 
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
+from datetime import datetime, timezone
 import json
-import pprint
+import time
 
 load_dotenv()
+setup_logging()
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Every route is registered here; create_app() mounts it on a FastAPI instance
+router = APIRouter()
 
-openai.api_key = os.environ.get("OPENAI_API_KEY")
+llm_client = LLMClient.from_env()
 deepgram_api_key = os.environ.get("DEEPGRAM_API_KEY")
-deepgram_url = "https://api.deepgram.com/v1/speak?model=aura-asteria-en&encoding=mp3"
+DEEPGRAM_MODEL = os.environ.get("TTS_DEFAULT_MODEL", DEFAULT_MODEL).strip()
+DEEPGRAM_ENCODING = os.environ.get("TTS_DEFAULT_ENCODING", DEFAULT_ENCODING).strip()
+# Voices a client may ask for on /ws/tts (comma-separated)
+TTS_MODELS = tuple(
+    model.strip() for model in os.environ.get("TTS_MODELS", ",".join(DEFAULT_MODELS)).split(",") if model.strip()
+) + (DEEPGRAM_MODEL,)
+# Validated once here, so a typo in the defaults fails at boot rather than on every synthesis
+try:
+    DEFAULT_TTS_FORMAT = TTSFormat.negotiate(DEEPGRAM_MODEL, DEEPGRAM_ENCODING, models=TTS_MODELS)
+except UnsupportedFormat as e:
+    raise RuntimeError(f"Invalid TTS_DEFAULT_MODEL/TTS_DEFAULT_ENCODING: {e}") from e
+# Overridable to point at a local stand-in (see benchmarks/)
+DEEPGRAM_BASE_URL = os.environ.get("DEEPGRAM_BASE_URL", "https://api.deepgram.com").rstrip("/")
+deepgram_url = f"{DEEPGRAM_BASE_URL}/v1/speak"
+audio_cache = AudioCache.from_env()
+tts_http = HTTPPool(limit=int(os.environ.get("TTS_POOL_SIZE", 100)))
+# Interview history (questions, code, transcript, feedback) is persisted write-behind, off the request path
+event_writer = EventWriter(
+    max_batch=int(os.environ.get("EVENT_BATCH_SIZE", 500)),
+    flush_interval=float(os.environ.get("EVENT_FLUSH_MS", 1000)) / 1000,
+    max_queue=int(os.environ.get("EVENT_QUEUE_MAX", 50000)),
+)
+# Lifecycle events (session start, evaluation outcome) wait this long for room in a full queue before being dropped
+EVENT_PUT_TIMEOUT_SECONDS = float(os.environ.get("EVENT_PUT_TIMEOUT_MS", 2000)) / 1000
+"""
+Admission control in front of each upstream: at most *_ADMISSION_CONCURRENCY calls in flight, optionally
+*_ADMISSION_RATE new calls per second (token bucket of *_ADMISSION_BURST), and a wait queue of *_ADMISSION_QUEUE
+calls where live-interview traffic goes ahead of background work (summary compaction, evaluations). A call that
+finds the queue full, or waits longer than *_ADMISSION_TIMEOUT_SECONDS, is rejected with Overloaded, which HTTP
+endpoints answer with 429 + Retry-After and WebSockets with close code 1013.
+"""
+def admission_from_env(prefix: str, max_concurrency: int) -> AdmissionController:
+    return AdmissionController(
+        prefix.lower(),
+        max_concurrency=int(os.environ.get(f"{prefix}_ADMISSION_CONCURRENCY", max_concurrency)),
+        rate=float(os.environ.get(f"{prefix}_ADMISSION_RATE", 0)),
+        burst=int(os.environ.get(f"{prefix}_ADMISSION_BURST", 0)) or None,
+        max_waiting=int(os.environ.get(f"{prefix}_ADMISSION_QUEUE", 256)),
+        timeout=float(os.environ.get(f"{prefix}_ADMISSION_TIMEOUT_SECONDS", 10)),
+    )
+
+llm_admission = admission_from_env("LLM", 64)
+tts_admission = admission_from_env("TTS", 32)
+# Deepgram calls used to run without any timeout; a hung stream now frees its slot
+TTS_TIMEOUT_SECONDS = float(os.environ.get("TTS_TIMEOUT_SECONDS", 30))
+TTS_READ_TIMEOUT_SECONDS = float(os.environ.get("TTS_READ_TIMEOUT_SECONDS", 10))
+# Sentences synthesized ahead of the one being sent, and the size/latency target for outgoing audio frames
+TTS_MAX_PARALLEL = int(os.environ.get("TTS_MAX_PARALLEL", 3))
+TTS_FRAME_BYTES = int(os.environ.get("TTS_FRAME_BYTES", 16384))
+TTS_FRAME_MAX_DELAY_SECONDS = int(os.environ.get("TTS_FRAME_MAX_DELAY_MS", 40)) / 1000
 
 # CORS setup
 origins = [
@@ -30,34 +101,145 @@ origins = [
     "http://127.0.0.1:3000",
     "https://production.com", 
 ]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-    
-@app.on_event("startup")
-async def startup_db_client():
+
+# Motor (and pymongo under it) is imported on first use; it is the heaviest import in the app
+def create_mongo_client(uri: str):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    # Keep a few connections open so the first requests after boot skip the handshake
+    return AsyncIOMotorClient(uri, minPoolSize=int(os.environ.get("MONGO_MIN_POOL_SIZE", 5)))
+
+async def startup_db_client(app: FastAPI):
+    global session_store, evaluation_store
     try:
-        app.mongodb_client = AsyncIOMotorClient(os.environ["MONGO_URI"])
+        app.mongodb_client = create_mongo_client(os.environ["MONGO_URI"])
         app.mongodb = app.mongodb_client["User"]
-        print("[DEBUG] MongoDB connection successful")
+        logger.info("MongoDB client created")
+        if os.environ.get("SESSION_STORE") == "mongo":
+            session_store = MongoSessionStore.from_env(app.mongodb["interview_sessions"])
+            await session_store.ensure_indexes()
+            logger.info("Using MongoDB session store")
+        start_problem_index(app, app.mongodb["solutions"])
+        event_writer.start(app.mongodb["interview_events"])
+        evaluation_store = app.mongodb["evaluations"]
     except Exception as e:
-        print(f"[ERROR] MongoDB initialization failed: {str(e)}")
+        logger.error("MongoDB initialization failed: %s", e)
         raise
-@app.on_event("shutdown")
-async def shutdown_db_client():
+
+async def shutdown_db_client(app: FastAPI):
     app.mongodb_client.close()
 
-@app.get("/")
+async def warm_up(app: FastAPI):
+    """
+    Waits for MongoDB to answer and opens pooled connections to the LLM and TTS upstreams,
+    then marks the app ready. Runs in the background so startup itself is not held up.
+
+    MongoDB is the only hard dependency. An upstream that cannot be pre-connected does not hold
+    readiness back (its first real call connects lazily), but it is logged and listed as degraded on /ready.
+    """
+    started = time.perf_counter()
+    while True:
+        try:
+            await app.mongodb_client.admin.command("ping")
+            break
+        except Exception as e:
+            logger.warning("MongoDB not reachable yet: %s", e)
+            await asyncio.sleep(1)
+    try:
+        await event_writer.ensure_indexes()
+    except Exception as e:
+        logger.warning("Could not ensure interview event indexes: %s", e)
+    try:
+        await ensure_solution_indexes(app.mongodb["solutions"])
+    except Exception as e:
+        logger.warning("Could not ensure solutions index: %s", e)
+    llm_ok, tts_ok = await asyncio.gather(llm_client.warm(), tts_http.warm(DEEPGRAM_BASE_URL))
+    app.degraded = [name for name, ok in (("llm", llm_ok), ("tts", tts_ok)) if not ok]
+    app.warmed_up = True
+    observe_stage("warmup", time.perf_counter() - started)
+    if app.degraded:
+        logger.warning(
+            "Warm-up finished in %.0fms, degraded: could not pre-connect to %s",
+            (time.perf_counter() - started) * 1000, ", ".join(app.degraded),
+        )
+    else:
+        logger.info("Warm-up finished in %.0fms", (time.perf_counter() - started) * 1000)
+
+# The app built by create_app() whose lifespan is running; see create_app()
+running_app: Optional[FastAPI] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global running_app
+    if running_app is not None:
+        raise RuntimeError("Another app from app.main is already running; its clients and queues are process-wide")
+    running_app = app
+    app.warmed_up = False
+    app.degraded = []
+    try:
+        await startup_db_client(app)
+    except BaseException:
+        running_app = None
+        raise
+    app.warmup_task = asyncio.create_task(warm_up(app))
+    evaluation_queue.start()
+    interview_channels.start()
+    try:
+        yield
+    finally:
+        app.warmup_task.cancel()
+        await evaluation_queue.close()
+        interview_channels.close()
+        task = getattr(app, "problem_index_task", None)
+        if task is not None:
+            task.cancel()
+        interview.analysis_engine.shutdown()
+        await llm_client.close()
+        await tts_http.close()
+        # Last writes go out before the Mongo client closes
+        await event_writer.close()
+        await shutdown_db_client(app)
+        running_app = None
+
+@router.get("/")
 def read_root():
     return {"message": "Welcome to the GetCooked AI backend!"}
 
 ################################################################################################################
 
-@app.get("/protected")
+@router.get("/metrics")
+def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+################################################################################################################
+
+READY_TIMEOUT_SECONDS = float(os.environ.get("READY_TIMEOUT_SECONDS", 1))
+
+"""
+ready: Readiness probe for the load balancer / orchestrator
+
+Returns 503 until the startup warm-up (MongoDB answering, upstream HTTP pools connected) has finished,
+and afterwards whenever MongoDB does not answer a ping within READY_TIMEOUT_SECONDS. Upstreams that could
+not be pre-connected during warm-up are listed under "degraded" without failing the probe.
+"""
+@router.get("/ready")
+async def ready(request: Request):
+    app = request.app
+    checks = {"warmup": bool(getattr(app, "warmed_up", False)), "mongo": False}
+    if checks["warmup"]:
+        try:
+            await asyncio.wait_for(app.mongodb_client.admin.command("ping"), READY_TIMEOUT_SECONDS)
+            checks["mongo"] = True
+        except Exception as e:
+            logger.warning("Readiness check: MongoDB ping failed: %s", e)
+    status = "ready" if all(checks.values()) else "not ready"
+    body = {"status": status, "checks": checks}
+    if getattr(app, "degraded", None):
+        body["degraded"] = app.degraded
+    return JSONResponse(body, status_code=200 if status == "ready" else 503)
+
+################################################################################################################
+
+@router.get("/protected")
 def protected_route(current_user=Depends(get_current_user)):
     return {"message": "Welcome, you are authenticated!", "user": current_user}
 
@@ -68,7 +250,7 @@ def protected_route(current_user=Depends(get_current_user)):
     question: str
 
 # Handle code evaluation requests
-@app.post("/api/evaluate-code")
+@router.post("/api/evaluate-code")
 async def evaluate_code(request: CodeRequest):
     response = openai.Completion.create(
         engine="gpt-4o-mini",
@@ -82,8 +264,8 @@ async def evaluate_code(request: CodeRequest):
     return {"result": response.choices[0].text.strip()} """
 
 ################################################################################################################
-# Temporary in-memory storage for sessions
-sessions: Dict[str, Dict] = {}
+# Interview session storage: in-process by default, shared through Mongo with SESSION_STORE=mongo
+session_store: SessionStore = InMemorySessionStore.from_env()
 
 class QuestionData(BaseModel):
     title: str
@@ -92,16 +274,13 @@ class QuestionData(BaseModel):
     output: str
     explanation: Optional[str]
     
-@app.post("/api/initialize-question")
+@router.post("/api/initialize-question")
 async def initialize_question(question_data: QuestionData):
-    session_id = str(uuid4()) 
-    sessions[session_id] = {
-        "question": question_data.dict(),
-        "code": "",
-        "transcript": "",
-        "feedback": ""
-    }
-    print(f"Initialized session {session_id} with question: {question_data.title}")
+    session = await session_store.create(question_data.dict())
+    session_id = session.session_id
+    if not await event_writer.put(session_id, "question", timeout=EVENT_PUT_TIMEOUT_SECONDS, question=session["question"]):
+        logger.warning("Event queue full, dropped the question event for session %s", session_id)
+    logger.info("Initialized session %s with question: %s", session_id, question_data.title)
     return {"session_id": session_id}
 
 ################################################################################################################
@@ -109,7 +288,7 @@ async def initialize_question(question_data: QuestionData):
 """ class TranscriptRequest(BaseModel):
     message: str
 
-@app.post("/api/transcript")
+@router.post("/api/transcript")
 async def handle_transcript(request: TranscriptRequest):
     transcript = request.message
     # TODO: prepare for combination with code evaluation
@@ -121,15 +300,49 @@ async def handle_transcript(request: TranscriptRequest):
 '''
 Update to Contextual Prompts method
 Essentailyl maintain the context of the interview session by summarizes the previous steps without including the entire transcript. This prompt can be used to provide context to the AI model while focusing on the current update. For example, include a brief summary of the previous steps and the latest incremental update.
+
+The summary is kept within SUMMARY_TOKEN_BUDGET tokens: once it grows past the budget, older segments are condensed
+by the LLM in the background (off the request path), and construct_prompt only ever sends the most recent budget's worth.
 '''
+SUMMARY_TOKEN_BUDGET = int(os.environ.get("SUMMARY_TOKEN_BUDGET", 600))
+
+async def condense_summary(text, target_tokens):
+    async with llm_admission.slot(BACKGROUND):
+        return await llm_client.chat(
+            messages=[
+                {"role": "system", "content": "Condense these notes from a technical interview into a brief third-person summary of the candidate's approach, decisions and open questions. Do not include code."},
+                {"role": "user", "content": text}
+            ],
+            max_tokens=target_tokens,
+            temperature=0.2,
+        )
+
+async def save_compacted_session(session_id, snapshot, replacement):
+    return await session_store.replace_summary_prefix(session_id, snapshot, replacement)
+
+summary_compactor = SummaryCompactor(condense_summary, save_compacted_session, budget=SUMMARY_TOKEN_BUDGET)
+
 def update_summary(session, new_update):
+    if not new_update:
+        return
     summary = session.get("summary", "")
     summary += f" {new_update}"
     session["summary"] = summary.strip()
 
+    # Keep a running token count so the whole summary is never re-tokenized on an update
+    summary_tokens = session.get("summary_tokens")
+    if summary_tokens is None:
+        summary_tokens = count_tokens(session["summary"])
+    else:
+        summary_tokens += count_tokens(new_update)
+    session["summary_tokens"] = summary_tokens
+    if summary_tokens > SUMMARY_TOKEN_BUDGET:
+        summary_compactor.schedule(session)
+
 # Construct the prompt using the summary and the latest update
 def construct_prompt(session, latest_update):
-    summary = session.get("summary", "")
+    # Hard cap in case a compaction is still running or failed
+    summary = tail_tokens(session.get("summary", ""), SUMMARY_TOKEN_BUDGET)
     system_message = """
         You are a Technical Interviewer for a Software Engineer role. Given the coding challenge, your task is to facilitate a real technical interview scenario to the user based on their current solution and thought process. Do not provide any type of solutions or hints, only feedback for the user's current solution based on the code and user's thought process. Responses should be professional, constructive and concise. Only reply with a sentence or two at a time for feedback and a short sentence for the next prompt.
     """
@@ -142,129 +355,575 @@ def construct_prompt(session, latest_update):
     """
     return {"system_message": system_message.strip(), "user_prompt": user_prompt.strip()}
 
+# Replaces code[start:end] of the base version with text
+class CodeEdit(BaseModel):
+    start: int
+    end: int
+    text: str = ""
+
+"""
+FeedbackRequest carries code either as the full buffer (`code`) or, in delta mode, as `edits` against
+the stored buffer at `base_version`. Every accepted change bumps the session's code_version, which is
+returned to the client; a stale or conflicting delta gets a 409 and the client resyncs with full `code`.
+"""
 class FeedbackRequest(BaseModel):
     session_id: str
     code: Optional[str] = None
+    base_version: Optional[int] = None
+    edits: Optional[List[CodeEdit]] = None
     transcript: Optional[str] = None
     status: str    
     
+# Apply a FeedbackRequest's code/transcript to the session and return the latest update text
+def apply_feedback_update(session, request: FeedbackRequest) -> str:
+    if request.status != 'Thinking':
+        logger.debug("Status for session %s is %r, not 'Thinking'", request.session_id, request.status)
+
+    # Update the code and/or transcript in the session
+    if request.code:
+        session["code"] = request.code 
+        session["code_version"] += 1
+        event_writer.record(request.session_id, "code", code_version=session["code_version"], code=request.code)
+        logger.debug("Received full code for session %s (v%d, %d chars)", request.session_id, session["code_version"], len(request.code))
+    elif request.edits is not None:
+        if request.base_version != session["code_version"]:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Stale code version, resend full code.", "code_version": session["code_version"]},
+            )
+        try:
+            session["code"] = apply_edits(session["code"], request.edits)
+        except DeltaConflict as e:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": f"{e}, resend full code.", "code_version": session["code_version"]},
+            )
+        session["code_version"] += 1
+        event_writer.record(
+            request.session_id, "code_edits", code_version=session["code_version"], edits=[edit.dict() for edit in request.edits]
+        )
+        logger.debug("Applied %d code edits for session %s (v%d)", len(request.edits), request.session_id, session["code_version"])
+    if request.transcript:
+        logger.debug("Received transcript update for session %s (%d chars)", request.session_id, len(request.transcript))
+        session["transcript"] += f" {request.transcript}" 
+        event_writer.record(request.session_id, "transcript", text=request.transcript)
+        
+    # Only the transcript goes into the rolling summary; the prompt carries just the latest code snapshot
+    update_summary(session, f"Transcript: {request.transcript}" if request.transcript else "")
+    return build_latest_update(session, [request.transcript] if request.transcript else [])
+
+# The latest code snapshot plus every transcript segment not yet answered
+def build_latest_update(session, transcripts: List[str]) -> str:
+    latest_update = f"Code: {session['code']}" if session["code"] else ""
+    latest_update += f" Transcript: {' '.join(transcripts)}" if transcripts else ""
+    return latest_update.strip()
+
+# Issues the next feedback sequence number for the session; only feedback for the latest one is kept
+def next_feedback_seq(session) -> int:
+    session["feedback_seq"] += 1
+    return session["feedback_seq"]
+
+async def store_feedback(session, seq: int, feedback: str, **fields) -> bool:
+    """
+    Writes feedback to the session unless a newer update was accepted after `seq` was issued.
+    The check and the write are one conditional update in the store, so a newer update saved by
+    another request (or worker) in between is never overwritten.
+    """
+    if not await session_store.update_fields(session.session_id, {"feedback": feedback, **fields}, expect={"feedback_seq": seq}):
+        logger.debug("Discarding feedback #%d for session %s, superseded by a newer update", seq, session.session_id)
+        return False
+    event_writer.record(session.session_id, "feedback", feedback_seq=seq, feedback=feedback, code_version=session["code_version"])
+    return True
+
+def prompt_messages(prompt):
+    return [
+        {"role": "system", "content": prompt["system_message"]},
+        {"role": "user", "content": prompt["user_prompt"]}
+    ]
+
+# Updates for a session arriving within this window are merged into a single completion; a session that keeps
+# updating still gets a completion started at least every FEEDBACK_MAX_WAIT_MS
+FEEDBACK_DEBOUNCE_SECONDS = int(os.environ.get("FEEDBACK_DEBOUNCE_MS", 150)) / 1000
+FEEDBACK_MAX_WAIT_SECONDS = int(os.environ.get("FEEDBACK_MAX_WAIT_MS", 1000)) / 1000
+feedback_coalescer = FeedbackCoalescer(debounce=FEEDBACK_DEBOUNCE_SECONDS, max_wait=FEEDBACK_MAX_WAIT_SECONDS)
+
+# Feedback for an already-seen state (same question, same code modulo formatting/comments, same transcript)
+feedback_cache = TTLCache(
+    ttl=int(os.environ.get("FEEDBACK_CACHE_TTL_SECONDS", 600)),
+    maxsize=int(os.environ.get("FEEDBACK_CACHE_MAX_ENTRIES", 2048)),
+)
+
 """
 incremental_feedback: Processes interview feedback requests and generates responses
 
 Data Flow:
 1. Validates session and updates session data (code/transcript)
-2. Constructs prompt with user's solution and thought process
-3. Generates feedback using GPT-4
-4. Stores feedback in session for TTS processing
-5. Returns feedback response to client
+2. Answers straight from feedback_cache if this exact state was seen before and nothing is pending for the session
+3. Otherwise waits out the debounce window (at most FEEDBACK_MAX_WAIT_MS) merging newer updates for the session into
+   the same completion; an update arriving while a completion runs is answered by one follow-up completion
+4. Constructs prompt with the latest solution and every unanswered transcript segment, and generates feedback using
+   GPT-4 through the pooled async LLM client (never blocks the event loop) unless the merged state is cached
+5. Stores feedback in session for TTS processing, unless a newer update has superseded it
+6. Returns feedback response to client; every request merged into a completion receives the same feedback and feedback_seq
 
 Args:
     request (FeedbackRequest): Contains session_id, code, transcript, and status
 Returns:
-    dict: Contains generated feedback
+    dict: Contains generated feedback, its feedback_seq (monotonic per session) and the session's current code_version
 """
-@app.post("/api/incremental-feedback")
+@router.post("/api/incremental-feedback")
 async def incremental_feedback(request: FeedbackRequest):
-    print("Received a request at /api/incremental-feedback")
-    print(f"Session ID received: {request.session_id}")
+    return await run_incremental_feedback(request)
 
-    session = sessions.get(request.session_id)
+# Shared by the HTTP endpoint and the interview WebSocket; errors are raised as HTTPException / Overloaded
+async def run_incremental_feedback(request: FeedbackRequest) -> Dict[str, Any]:
+    logger.debug("Incremental feedback request for session %s", request.session_id, extra={"sample": "feedback_request"})
+
+    session = await session_store.get(request.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found.")
-    
-    if request.status != 'Thinking':
-        print("Skipping feedback generation since status is not 'Thinking'")
 
-    # Update the code and/or transcript in the session
-    if request.code:
-        print(f"Received code update for session {request.session_id}:\n{request.code}")
-        session["code"] = request.code 
-    if request.transcript:
-        print(f"Received transcript update for session {request.session_id}:\n{request.transcript}")
-        session["transcript"] += f" {request.transcript}" 
-        
-    # Update the summary with the latest transcript
-    latest_update = f"Code: {request.code}" if request.code else ""
-    latest_update += f" Transcript: {request.transcript}" if request.transcript else ""
-    update_summary(session, latest_update)
-    
-    prompt = construct_prompt(session, latest_update)
+    apply_feedback_update(session, request)
+    next_feedback_seq(session)
+    await session_store.save(session)
+    # Read after saving: a save that raced another update is rebased onto it and may get a later number
+    seq = session["feedback_seq"]
+
+    missed_key = None
+    if not feedback_coalescer.is_pending(request.session_id):
+        key = feedback_cache_key(session["question"], session["code"], request.transcript or "")
+        hit, feedback = feedback_cache.get(key)
+        if hit:
+            await store_feedback(session, seq, feedback)
+            return {"feedback": feedback, "feedback_seq": seq, "code_version": session["code_version"]}
+        missed_key = key
+
+    async def generate(transcripts: List[str]) -> str:
+        key = feedback_cache_key(session["question"], session["code"], " ".join(transcripts))
+        # Nothing else was merged in: the fast path above already looked this state up (and counted the miss)
+        hit, feedback = (False, None) if key == missed_key else feedback_cache.get(key)
+        if not hit:
+            prompt = construct_prompt(session, build_latest_update(session, transcripts))
+            async with llm_admission.slot(LIVE):
+                feedback = await llm_client.chat(
+                    messages=prompt_messages(prompt),
+                    max_tokens=200,
+                    temperature=0.5,
+                )
+            feedback_cache.set(key, feedback)
+        await store_feedback(session, seq, feedback)
+        return feedback
 
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": prompt["system_message"]},
-                {"role": "user", "content": prompt["user_prompt"]}
-            ],
-            max_tokens=200,
-            temperature=0.5,
-        )
-        feedback = response.choices[0].message.content.strip()
-        session["feedback"] = feedback
-        print(f"Feedback for session {request.session_id}: {feedback}")
-        return {"feedback": feedback}
+        feedback_seq, feedback = await feedback_coalescer.submit(request.session_id, seq, request.transcript, generate)
+        logger.debug("Feedback #%d for session %s: %s", feedback_seq, request.session_id, feedback)
+        return {"feedback": feedback, "feedback_seq": feedback_seq, "code_version": session["code_version"]}
+    except Overloaded:
+        raise
     except Exception as e:
-        print("Error generating feedback:", e)
+        logger.error("Error generating feedback for session %s: %s", request.session_id, e)
         raise HTTPException(status_code=500, detail="Failed to generate feedback.")
 
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+"""
+stream_feedback_events: Streams feedback tokens as Server-Sent Events while the completion is generated
+
+Events:
+- token: {"token": str} for every content delta from the model
+- done: {"feedback": str, "feedback_seq": int, "code_version": int, "ttft_ms": float, "total_ms": float} once the stream
+  ends; the feedback is also written to the session so /ws/tts can pick it up, unless a newer update superseded it
+- error: {"detail": str} if the upstream call fails; {"detail": str, "retry_after": int} if it was not admitted in time
+"""
+async def stream_feedback_events(session_id: str, session, seq: int, prompt):
+    started = time.perf_counter()
+    first_token_at = None
+    parts: List[str] = []
+    try:
+        async with llm_admission.slot(LIVE):
+            async for token in llm_client.stream_chat(
+                messages=prompt_messages(prompt),
+                max_tokens=200,
+                temperature=0.5,
+            ):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(token)
+                event = format_sse("token", {"token": token})
+                bytes_streamed.inc("feedback_sse", amount=len(event))
+                yield event
+    except Overloaded as e:
+        logger.warning("Feedback stream for session %s not admitted: %s", session_id, e)
+        yield format_sse("error", {"detail": "Too many requests, retry later.", "retry_after": e.retry_after})
+        return
+    except Exception as e:
+        logger.error("Error streaming feedback for session %s: %s", session_id, e)
+        yield format_sse("error", {"detail": "Failed to generate feedback."})
+        return
+
+    finished = time.perf_counter()
+    feedback = "".join(parts).strip()
+    timings = {
+        "ttft_ms": round(((first_token_at or finished) - started) * 1000, 1),
+        "total_ms": round((finished - started) * 1000, 1),
+    }
+    await store_feedback(session, seq, feedback, last_generation=timings)
+    logger.info("Streamed feedback for session %s (ttft=%sms, total=%sms)", session_id, timings["ttft_ms"], timings["total_ms"])
+    yield format_sse("done", {"feedback": feedback, "feedback_seq": seq, "code_version": session["code_version"], **timings})
+
+"""
+incremental_feedback_stream: Streaming variant of /api/incremental-feedback
+
+Applies the same session update, then forwards the model's tokens to the client as they arrive
+(text/event-stream) instead of waiting for the whole completion.
+
+Args:
+    request (FeedbackRequest): Contains session_id, code, transcript, and status
+Returns:
+    StreamingResponse: token/done/error Server-Sent Events
+"""
+@router.post("/api/incremental-feedback/stream")
+async def incremental_feedback_stream(request: FeedbackRequest):
+    session = await session_store.get(request.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found.")
+    # Once the response starts a rejection can only be an error event, so refuse up front while the queue is full
+    llm_admission.check()
+
+    latest_update = apply_feedback_update(session, request)
+    next_feedback_seq(session)
+    await session_store.save(session)
+    # Read after saving: a save that raced another update is rebased onto it and may get a later number
+    seq = session["feedback_seq"]
+    prompt = construct_prompt(session, latest_update)
+    return StreamingResponse(
+        stream_feedback_events(request.session_id, session, seq, prompt),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+class TTSContentTypeError(Exception):
+    pass
+
+# Synthesizes text with Deepgram in the given format (the default voice and MP3 if none) and yields the audio as it arrives
+async def synthesize_speech(text: str, tts_format: Optional[TTSFormat] = None):
+    import aiohttp
+
+    tts_format = tts_format or DEFAULT_TTS_FORMAT
+
+    headers = {
+        "Authorization": f"Token {deepgram_api_key}",
+        "Content-Type": "application/json"
+    }
+    payload = {"text": text}
+
+    timeout = aiohttp.ClientTimeout(total=TTS_TIMEOUT_SECONDS, sock_read=TTS_READ_TIMEOUT_SECONDS)
+    started = time.perf_counter()
+    async with tts_admission.slot(LIVE):
+        with track_stage("tts"):
+            async with tts_http.session().post(
+                deepgram_url, params=tts_format.query(), headers=headers, json=payload, timeout=timeout
+            ) as response:
+                logger.debug("Deepgram responded %s (%s)", response.status, response.headers.get("Content-Type"))
+                if not tts_format.accepts(response.headers.get("Content-Type")):
+                    raise TTSContentTypeError(response.headers.get("Content-Type"))
+
+                first_chunk = True
+                # Whatever the socket has buffered; frames are regrouped for the client by coalesce_frames
+                async for chunk in response.content.iter_any():
+                    if first_chunk:
+                        observe_stage("tts_first_byte", time.perf_counter() - started)
+                        first_chunk = False
+                    yield chunk
+
+def negotiate_tts_format(encoding=None, sample_rate=None, bitrate=None, model=None) -> TTSFormat:
+    return TTSFormat.negotiate(model or DEEPGRAM_MODEL, encoding or DEEPGRAM_ENCODING, sample_rate, bitrate, models=TTS_MODELS)
+
+# Synthesized (or cached) audio for a feedback text, in sentence order, regrouped into frames for a WebSocket
+def feedback_audio_frames(feedback: str, tts_format: TTSFormat):
+    def sentence_audio(sentence):
+        cache_key = audio_cache_key(sentence, tts_format.model, tts_format.cache_tag)
+        return audio_cache.stream(cache_key, lambda: synthesize_speech(sentence, tts_format))
+
+    sentences = split_sentences(feedback) if tts_format.segmentable else [feedback.strip()]
+    return coalesce_frames(
+        stream_in_order(sentences, sentence_audio, TTS_MAX_PARALLEL),
+        frame_bytes=TTS_FRAME_BYTES,
+        max_delay=TTS_FRAME_MAX_DELAY_SECONDS,
+    )
+
 """
 websocket_tts_endpoint: Streams TTS audio for interview feedback in real-time over WebSocket
 Note: https://developers.deepgram.com/docs/streaming-text-to-speech
 
 Data Flow:
 1. Accept WebSocket Connection: The WebSocket connection is accepted.
-2. Retrieve Session Data: Fetches the session data, including the feedback text, based on session_id.
-3. TTS API Request: Sends the feedback text to the Deepgram API for TTS conversion, with response headers expecting binary audio data (audio/mpeg format).
-4. Chunked Audio Streaming: Reads the Deepgram API response in 1024-byte chunks and streams each 5. chunk over the WebSocket using websocket.send_bytes(chunk).
-5. Handle Disconnects: If the WebSocket disconnects, stops streaming and closes the connection.
+2. Negotiate Format: encoding, sample_rate, bitrate and model are checked against the allow-lists in services/tts_format.py
+   (TTS_MODELS for voices); an unsupported choice closes the socket with 1003 and the reason.
+3. Retrieve Session Data: Fetches the session data, including the feedback text, based on session_id.
+4. Sentence Split: The feedback is split into sentences, each synthesized separately so the first audio only waits for the first sentence.
+   Formats with a container header (wav, opus in Ogg) cannot be sent back to back, so their feedback is synthesized as one clip.
+5. Audio Cache Lookup: Each sentence's audio is keyed by hash of (sentence, voice model, encoding + sample rate + bitrate). A cached clip starts streaming immediately;
+   a clip already being synthesized for another connection is shared instead of requested again.
+6. TTS API Request: On a miss, sends the sentence to the Deepgram API for TTS conversion, with response headers expecting binary audio data in the negotiated format.
+   Up to TTS_MAX_PARALLEL sentences are synthesized concurrently; their audio is forwarded strictly in sentence order.
+7. Framed Audio Streaming: Audio is regrouped into frames of about TTS_FRAME_BYTES (sent early after TTS_FRAME_MAX_DELAY_MS) and sent with
+   websocket.send_bytes(frame). Reading ahead pauses while the client is slow to receive.
+8. Admission: Deepgram calls go through tts_admission; if one is not admitted in time the socket is closed with 1013 (Try Again Later).
+9. Handle Disconnects: If the WebSocket disconnects, stops streaming and closes the connection. Synthesis already started still finishes into the cache.
 
 Args:
     websocket (WebSocket): Client WebSocket connection
     session_id (str): Session identifier for feedback retrieval
+    encoding (str): mp3 (default), opus, linear16 (raw PCM), wav or mulaw
+    sample_rate (int): Output sample rate, for linear16, wav and mulaw
+    bitrate (int): Output bit rate, for mp3 and opus
+    model (str): Deepgram voice, e.g. aura-asteria-en
 """
-@app.websocket("/ws/tts")
-async def websocket_tts_endpoint(websocket: WebSocket, session_id: str):
+@router.websocket("/ws/tts")
+async def websocket_tts_endpoint(
+    websocket: WebSocket,
+    session_id: str,
+    encoding: Optional[str] = None,
+    sample_rate: Optional[int] = None,
+    bitrate: Optional[int] = None,
+    model: Optional[str] = None,
+):
     await websocket.accept()
-    
-    session = sessions.get(session_id)
-    if not session or "feedback" not in session:
+
+    try:
+        tts_format = negotiate_tts_format(encoding, sample_rate, bitrate, model)
+    except UnsupportedFormat as e:
+        # Close reasons are capped at 123 bytes
+        await websocket.close(code=1003, reason=str(e)[:120])
+        return
+
+    session = await session_store.get(session_id)
+    if not session or not session["feedback"]:
         await websocket.close(code=1000, reason="No feedback available for this session.")
         return
 
-    feedback_text = session["feedback"]
-    
-    headers = {
-        "Authorization": f"Token {deepgram_api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {"text": feedback_text}
-
-    async with aiohttp.ClientSession() as session:
-        async with session.post(deepgram_url, headers=headers, json=payload, timeout=None) as response:
-            
-            print(f"Response Status: {response.status}")
-            print(f"Response Headers: {response.headers}")
-            if response.headers.get("Content-Type") not in ["audio/mpeg", "audio/wav"]:
-                print("Unexpected content-type received. Expected binary audio data.")
-                await websocket.close(code=1003, reason="Unexpected content-type")
-                return
-            
+    started = time.perf_counter()
+    frames = feedback_audio_frames(session["feedback"], tts_format)
+    try:
+        # Stream audio frames to the WebSocket client
+        async for frame in frames:
+            if started is not None:
+                observe_stage("tts_first_frame", time.perf_counter() - started)
+                started = None
+            logger.debug("Sending audio frame of size %d bytes", len(frame), extra={"sample": "tts_chunk"})
+            await websocket.send_bytes(frame)
+            bytes_streamed.inc("tts_audio", amount=len(frame))
+    except TTSContentTypeError:
+        logger.warning("Unexpected content-type received. Expected binary audio data.")
+        await websocket.close(code=1003, reason="Unexpected content-type")
+        return
+    except Overloaded as e:
+        logger.warning("TTS for session %s not admitted: %s", session_id, e)
+        # 1013 Try Again Later; a close frame has no headers, so the delay travels in the reason
+        await websocket.close(code=1013, reason=f"Overloaded, retry after {e.retry_after}s")
+        return
+    except WebSocketDisconnect:
+        logger.info("TTS WebSocket disconnected for session %s", session_id)
+        return
+    except Exception as e:
+        logger.error("Error in streaming audio data: %s", e)
+    finally:
+        await frames.aclose()
+
+    await websocket.close()
+    logger.debug("TTS streaming complete for session %s", session_id)
+
+# Interview sockets: heartbeat cadence, how long a silent client is kept, and how long a dropped one can resume
+WS_HEARTBEAT_SECONDS = float(os.environ.get("WS_HEARTBEAT_SECONDS", 20))
+WS_IDLE_TIMEOUT_SECONDS = float(os.environ.get("WS_IDLE_TIMEOUT_SECONDS", 60))
+interview_channels = ChannelRegistry(
+    resume_ttl=float(os.environ.get("WS_RESUME_TTL_SECONDS", 120)),
+    replay_frames=int(os.environ.get("WS_REPLAY_FRAMES", 1024)),
+    # Audio frames are up to TTS_FRAME_BYTES each; this caps what one interview can pin for resumes
+    replay_bytes=int(os.environ.get("WS_REPLAY_BYTES", 1024 * 1024)),
+    sweep_interval=float(os.environ.get("WS_SWEEP_INTERVAL_SECONDS", 30)),
+)
+
+async def send_heartbeats(channel: InterviewChannel):
+    while True:
+        await asyncio.sleep(WS_HEARTBEAT_SECONDS)
+        await channel.send_control({"type": "ping", "seq": channel.seq})
+
+async def stream_feedback_audio(channel: InterviewChannel, feedback_seq: int, feedback: str, tts_format: TTSFormat):
+    await channel.send_json({"type": "audio_start", "feedback_seq": feedback_seq, "content_type": tts_format.media_type})
+    frames = feedback_audio_frames(feedback, tts_format)
+    try:
+        async for frame in frames:
+            await channel.send_audio(frame)
+            bytes_streamed.inc("tts_audio", amount=len(frame))
+    except asyncio.CancelledError:
+        # Newer feedback interrupts audio that is still playing
+        await channel.send_json({"type": "audio_end", "feedback_seq": feedback_seq, "interrupted": True})
+        raise
+    except Overloaded as e:
+        await channel.send_json({"type": "error", "status": 429, "detail": "TTS overloaded, retry later.", "retry_after": e.retry_after})
+        return
+    except Exception as e:
+        logger.error("Error in streaming audio for session %s: %s", channel.session_id, e)
+        await channel.send_json({"type": "error", "status": 502, "detail": "Failed to synthesize feedback audio."})
+        return
+    finally:
+        await frames.aclose()
+    await channel.send_json({"type": "audio_end", "feedback_seq": feedback_seq})
+
+async def handle_interview_update(channel: InterviewChannel, request: FeedbackRequest, tts_format: Optional[TTSFormat]):
+    try:
+        result = await run_incremental_feedback(request)
+    except HTTPException as e:
+        await channel.send_json({"type": "error", "status": e.status_code, "detail": e.detail})
+        return
+    except Overloaded as e:
+        await channel.send_json({"type": "error", "status": 429, "detail": "Too many requests, retry later.", "retry_after": e.retry_after})
+        return
+
+    # Updates merged by the coalescer all resolve to the same feedback; send it once
+    if result["feedback_seq"] <= channel.feedback_seq:
+        return
+    channel.feedback_seq = result["feedback_seq"]
+    await channel.send_json({"type": "feedback", **result})
+    if tts_format is not None and result["feedback"]:
+        if channel.audio_task is not None:
+            channel.audio_task.cancel()
+        channel.audio_task = channel.spawn(
+            stream_feedback_audio(channel, result["feedback_seq"], result["feedback"], tts_format)
+        )
+
+"""
+interview_socket: One long-lived, authenticated WebSocket per interview carrying updates in and feedback + audio out
+
+Replaces a POST to /api/incremental-feedback plus a new /ws/tts handshake per turn. The user is authenticated once
+at connect (get_current_user; Authorization header or `token` query param), and LLM and Deepgram calls reuse the
+app-wide pooled connections (llm_client, tts_http).
+
+Client -> server (JSON text frames):
+- {"type": "update", "code" | "edits" + "base_version", "transcript", "status"}: same fields as FeedbackRequest
+- {"type": "resume", "last_seq": int}: resend buffered frames numbered after last_seq
+- {"type": "ping"} / {"type": "pong"}: keep-alive; any frame resets the idle timeout
+
+Server -> client:
+- numbered JSON frames: feedback (as returned by /api/incremental-feedback), audio_start / audio_end, error
+  ({"status", "detail"} as the HTTP endpoint would return, plus "retry_after" when overloaded)
+- numbered binary frames: 4-byte big-endian sequence number followed by audio in the negotiated format
+- unnumbered control frames: welcome {"seq", "feedback_seq", "code_version"}, ping every WS_HEARTBEAT_SECONDS,
+  pong, resync (the frames after last_seq are gone; refetch state and resend full code), and error for a malformed frame
+
+A dropped client reconnects with ?last_seq=N (or sends resume) within WS_RESUME_TTL_SECONDS; work still running
+for the interview keeps buffering frames meanwhile, up to WS_REPLAY_FRAMES frames and WS_REPLAY_BYTES bytes.
+A second socket for the same interview and user replaces the first (closed with 4000); another user is refused
+with 1008. A client silent for WS_IDLE_TIMEOUT_SECONDS is disconnected.
+
+Args:
+    websocket (WebSocket): Client WebSocket connection
+    session_id (str): Interview session
+    audio (bool): Stream spoken feedback (default true)
+    encoding, sample_rate, bitrate, model: Audio format, as for /ws/tts
+    last_seq (int): Resume after this frame
+    token (str): Clerk JWT, if not sent in the Authorization header
+"""
+@router.websocket("/ws/interview")
+async def interview_socket(
+    websocket: WebSocket,
+    session_id: str,
+    audio: bool = True,
+    encoding: Optional[str] = None,
+    sample_rate: Optional[int] = None,
+    bitrate: Optional[int] = None,
+    model: Optional[str] = None,
+    last_seq: Optional[int] = None,
+):
+    await websocket.accept()
+    try:
+        user = await get_current_user(websocket)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail)[:120])
+        return
+    try:
+        tts_format = negotiate_tts_format(encoding, sample_rate, bitrate, model) if audio else None
+    except UnsupportedFormat as e:
+        await websocket.close(code=1003, reason=str(e)[:120])
+        return
+    session = await session_store.get(session_id)
+    if not session:
+        await websocket.close(code=1008, reason="Session not found.")
+        return
+
+    channel = interview_channels.get(session_id)
+    # The first user to attach owns the interview; nobody else may take over its socket or replay its frames
+    if channel.owner is None:
+        channel.owner = user.get("sub")
+    elif channel.owner != user.get("sub"):
+        await websocket.close(code=1008, reason="Session belongs to another user.")
+        return
+    previous = channel.attach(websocket)
+    if previous is not None:
+        try:
+            await previous.close(code=4000, reason="Replaced by a newer connection.")
+        except Exception:
+            pass
+
+    async def resume(after: int):
+        if not await channel.replay(after):
+            # The session read at connect is stale once updates have been applied
+            current = await session_store.get(session_id)
+            code_version = current["code_version"] if current else session["code_version"]
+            await channel.send_control({"type": "resync", "seq": channel.seq, "code_version": code_version})
+
+    await channel.send_control({
+        "type": "welcome", "seq": channel.seq, "feedback_seq": channel.feedback_seq, "code_version": session["code_version"],
+    })
+    if last_seq is not None:
+        await resume(last_seq)
+
+    heartbeat = asyncio.create_task(send_heartbeats(channel))
+    try:
+        while True:
+            received = await asyncio.wait_for(websocket.receive(), WS_IDLE_TIMEOUT_SECONDS)
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            if received.get("text") is None:
+                await channel.send_control({"type": "error", "status": 400, "detail": "Binary frames are not accepted; send JSON text frames."})
+                continue
             try:
-                # Stream response chunks to the WebSocket client
-                async for chunk in response.content.iter_chunked(1024):
-                    if chunk:
-                        print(f"Sending audio chunk of size {len(chunk)} bytes.")
-                        await websocket.send_bytes(chunk)
-            except WebSocketDisconnect:
-                print("WebSocket disconnected.")
-            except Exception as e:
-                print(f"Error in streaming audio data: {e}")
-            finally:
-                await websocket.close()
-
-    print("TTS streaming complete.")
+                message = json.loads(received["text"])
+                kind = message.pop("type")
+            except (ValueError, AttributeError, KeyError):
+                await channel.send_control({"type": "error", "status": 400, "detail": "Expected a JSON object with a type."})
+                continue
+
+            if kind == "update":
+                # Clients may echo the HTTP FeedbackRequest's session_id; it must name this socket's session
+                if message.pop("session_id", session_id) != session_id:
+                    await channel.send_control({"type": "error", "status": 400, "detail": "session_id does not match this socket."})
+                    continue
+                try:
+                    request = FeedbackRequest(session_id=session_id, **{"status": "Thinking", **message})
+                except (ValidationError, TypeError) as e:
+                    detail = e.errors() if isinstance(e, ValidationError) else str(e)
+                    await channel.send_control({"type": "error", "status": 422 if isinstance(e, ValidationError) else 400, "detail": detail})
+                    continue
+                channel.spawn(handle_interview_update(channel, request, tts_format))
+            elif kind == "resume" and isinstance(message.get("last_seq"), int):
+                await resume(message["last_seq"])
+            elif kind == "ping":
+                await channel.send_control({"type": "pong", "seq": channel.seq})
+            elif kind != "pong":
+                await channel.send_control({"type": "error", "status": 400, "detail": f"Unknown frame type {kind!r}."})
+    except asyncio.TimeoutError:
+        logger.info("Interview socket for session %s idle, closing", session_id)
+        await websocket.close(code=1000, reason="Idle timeout.")
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the socket was replaced and closed underneath us
+        logger.info("Interview socket disconnected for session %s", session_id)
+    finally:
+        heartbeat.cancel()
+        channel.detach(websocket)
     
 ################################################################################################################
 class EvaluationResult(BaseModel):
@@ -276,66 +935,271 @@ class EvaluationResult(BaseModel):
 class Feedback(BaseModel):
     session_id: str 
 
+"""
+End-of-interview evaluation runs as a background job: POST /api/evaluate queues it and returns immediately,
+GET /api/evaluation/{session_id} polls it. EVALUATION_WORKERS evaluations run at once; the rest wait in a
+priority queue (EVALUATION_QUEUE_MAX deep), so an end-of-event spike is worked off instead of timing out.
+A session has at most one evaluation queued or running, and a finished one is reused until the session changes.
+Submitting after the code changed updates a queued evaluation, or supersedes a running one, rather than returning it.
+Job status and results are stored in the `evaluations` collection, so polling survives restarts.
+"""
+EVALUATION_PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+EVALUATION_TRANSCRIPT_TOKENS = int(os.environ.get("EVALUATION_TRANSCRIPT_TOKENS", 1500))
+evaluation_store = None
+
+def parse_evaluation(text: str) -> EvaluationResult:
+    # Models sometimes wrap the JSON in prose or code fences
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in evaluation response")
+    result = EvaluationResult.parse_obj(json.loads(text[start:end + 1]))
+    result.code_correctness = min(max(result.code_correctness, 0), 100)
+    return result
+
+async def run_evaluation(payload: Dict[str, Any]) -> Dict[str, Any]:
+    session = await session_store.get(payload["session_id"])
+    if not session:
+        # Deleted since it was queued; retrying will not bring it back
+        raise PermanentError("Session not found")
+    question = session["question"]
+    system_message = (
+        "You are a Technical Interviewer writing the final evaluation of a coding interview. Reply with only a JSON object "
+        'with the keys "code_correctness" (integer 0-100), "thought_process_feedback", "areas_of_excellence" and '
+        '"areas_for_improvement" (strings, two or three sentences each).'
+    )
+    user_prompt = (
+        f"Question: {question.get('title', '')}\n{question.get('description', '')}\n\n"
+        f"Summary of the interview:\n{tail_tokens(session.get('summary', ''), SUMMARY_TOKEN_BUDGET)}\n\n"
+        f"Latest transcript:\n{tail_tokens(session.get('transcript', ''), EVALUATION_TRANSCRIPT_TOKENS)}\n\n"
+        f"Final code:\n{session['code']}"
+    )
+    # Queued behind live interview traffic; a rejection is retried by evaluation_queue
+    async with llm_admission.slot(BACKGROUND):
+        response = await llm_client.chat(
+            messages=prompt_messages({"system_message": system_message, "user_prompt": user_prompt}),
+            max_tokens=600,
+            temperature=0.2,
+            timeout=float(os.environ.get("EVALUATION_TIMEOUT_SECONDS", 120)),
+        )
+    return parse_evaluation(response).dict()
+
+async def record_evaluation(job):
+    if job.finished and not await event_writer.put(
+        job.key, "evaluation", timeout=EVENT_PUT_TIMEOUT_SECONDS,
+        status=job.status, code_version=job.payload["code_version"], result=job.result, error=job.error,
+    ):
+        logger.warning("Event queue full, dropped the evaluation event for session %s", job.key)
+    if evaluation_store is None:
+        return
+    document = {
+        "job_id": job.job_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error,
+        "code_version": job.payload["code_version"],
+        "updated_at": datetime.now(timezone.utc),
+    }
+    await evaluation_store.replace_one({"_id": job.key}, document, upsert=True)
+
+evaluation_queue = JobQueue(
+    run_evaluation,
+    workers=int(os.environ.get("EVALUATION_WORKERS", 4)),
+    max_pending=int(os.environ.get("EVALUATION_QUEUE_MAX", 1000)),
+    max_retries=int(os.environ.get("EVALUATION_MAX_RETRIES", 2)),
+    on_update=record_evaluation,
+)
+
+def evaluation_response(session_id: str, job) -> Dict[str, Any]:
+    return {"session_id": session_id, "job_id": job.job_id, "status": job.status, "attempts": job.attempts,
+            "result": job.result, "error": job.error}
+
+"""
+submit_evaluation: Queues the end-of-interview evaluation for a session
+
+Args:
+    request (Feedback): Contains session_id
+    priority (str): high, normal (default) or low; lower-priority jobs wait while higher ones are queued
+Returns:
+    202 with the job status; poll /api/evaluation/{session_id} for the EvaluationResult
+"""
+@router.post("/api/evaluate", status_code=202)
+async def submit_evaluation(request: Feedback, priority: str = "normal"):
+    if priority not in EVALUATION_PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"priority must be one of {', '.join(EVALUATION_PRIORITIES)}")
+    session = await session_store.get(request.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found.")
+
+    existing = evaluation_queue.get(request.session_id)
+    if existing is not None and existing.status == DONE and existing.payload["code_version"] == session["code_version"]:
+        return evaluation_response(request.session_id, existing)
+    try:
+        job = await evaluation_queue.submit(
+            request.session_id,
+            {"session_id": request.session_id, "code_version": session["code_version"]},
+            priority=EVALUATION_PRIORITIES[priority],
+            replace=existing is not None and existing.payload["code_version"] != session["code_version"],
+        )
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Evaluation queue is full, retry later.", headers={"Retry-After": "30"})
+    return evaluation_response(request.session_id, job)
+
+@router.get("/api/evaluation/{session_id}")
+async def get_evaluation(session_id: str):
+    job = evaluation_queue.get(session_id)
+    if job is not None:
+        return evaluation_response(session_id, job)
+    # Evaluated before a restart, or by another worker
+    document = await evaluation_store.find_one({"_id": session_id}) if evaluation_store is not None else None
+    if document is None:
+        raise HTTPException(status_code=404, detail="No evaluation for this session.")
+    return {"session_id": session_id, **{key: document.get(key) for key in ("job_id", "status", "attempts", "result", "error")}}
+
 #############################################################################################################
 class ProblemQuery(BaseModel):
     problem_name: Optional[str]
 
-@app.post("/api/get-solutions", response_model=List[Dict[str, Any]])
-async def get_solutions(query: ProblemQuery):
+# Formatted /api/get-solutions responses by normalized problem name; solutions are read-mostly
+solutions_cache = TTLCache(
+    ttl=float(os.environ.get("SOLUTIONS_CACHE_TTL_SECONDS", 300)),
+    maxsize=int(os.environ.get("SOLUTIONS_CACHE_MAX_ENTRIES", 1024)),
+)
+
+"""
+get_solutions: Returns the stored solutions for a problem name (case-insensitive exact match)
+
+The lookup is an equality match on problem_name under a case-insensitive collation, backed by an index with the
+same collation (created by the startup warm-up, never on the request path), and only projects the returned fields.
+Formatted responses are cached in-process for SOLUTIONS_CACHE_TTL_SECONDS; call /api/invalidate-solutions-cache
+after changing the collection.
+"""
+@router.post("/api/get-solutions", response_model=List[Dict[str, Any]])
+async def get_solutions(query: ProblemQuery, request: Request):
+    if not query.problem_name or not query.problem_name.strip():
+        logger.warning("No problem name provided")
+        raise HTTPException(status_code=400, detail="Problem name is required")
+
+    key = solutions_cache_key(query.problem_name)
+    hit, cached = solutions_cache.get(key)
+    if hit:
+        return cached
+
     try:
-        print("[DEBUG] Checking MongoDB client connection...")
-        if not hasattr(app, "mongodb") or app.mongodb is None:
-            print("[ERROR] MongoDB client not initialized")
+        mongodb = getattr(request.app, "mongodb", None)
+        if mongodb is None:
+            logger.error("MongoDB client not initialized")
             raise HTTPException(status_code=500, detail="Database connection not initialized")
-        
-        print("[DEBUG] Attempting to access MongoDB collection")
-        solutions_collection = app.mongodb["solutions"]
-        print("[DEBUG] Successfully connected to MongoDB collection")
-
-        if not query.problem_name:
-            print("[ERROR] No problem name provided")
-            raise HTTPException(status_code=400, detail="Problem name is required")
-
-        # Build the query filter with case-insensitive search
-        query_filter = {
-            "problem_name": {"$regex": f"^{query.problem_name}$", "$options": "i"}
-        }
-        print(f"[DEBUG] Query filter: {query_filter}")
-        print(f"[DEBUG] Looking for problem_name: {query.problem_name}")
-
-        # Retrieve documents based on the filter
-        print("[DEBUG] Executing find operation")
-        solutions_cursor = solutions_collection.find(query_filter)
-        solutions = await solutions_cursor.to_list(length=None)
-        print(f"[DEBUG] Number of solutions found: {len(solutions)}")
-
-        if not solutions:
-            print(f"[DEBUG] No solutions found for problem: {query.problem_name}")
-            return []
-
-        # Format the solutions
-        formatted_solutions = []
-        for solution in solutions:
-            formatted_solution = {
-                "_id": str(solution["_id"]),
-                "problem_name": solution.get("problem_name"),
-                "solutions": [
-                    {
-                        "approach": sol.get("approach", ""),
-                        "code": sol.get("code", ""),
-                        "time_complexity": sol.get("time_complexity", ""),
-                        "space_complexity": sol.get("space_complexity", "")
-                    } for sol in solution.get("solutions", [])
-                ]
-            }
-            formatted_solutions.append(formatted_solution)
-        print("[DEBUG] Formatted Solutions:")
-        pprint.pprint(formatted_solutions)
+
+        solutions_collection = mongodb["solutions"]
+        logger.debug("Looking for problem_name: %s", query.problem_name)
+        solutions = await find_solutions(solutions_collection, query.problem_name)
+        logger.debug("Number of solutions found: %d", len(solutions))
+
+        formatted_solutions = [format_solution(solution) for solution in solutions]
+        solutions_cache.set(key, formatted_solutions)
         return formatted_solutions
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"[ERROR] Failed to retrieve solutions: {str(e)}")
+        logger.error("Failed to retrieve solutions: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve solutions: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/api/invalidate-solutions-cache")
+async def invalidate_solutions_cache(query: ProblemQuery, current_user=Depends(get_current_user)):
+    # Without a problem name every cached response is dropped
+    solutions_cache.invalidate(solutions_cache_key(query.problem_name) if query.problem_name else None)
+    return {"message": "Solutions cache invalidated"}
+
+#############################################################################################################
+# In-memory problem name index for search/autocomplete, built at startup and kept fresh in the background
+problem_index = ProblemNameIndex()
+
+def swap_problem_index(rebuilt):
+    global problem_index
+    problem_index = rebuilt
+
+def start_problem_index(app: FastAPI, collection):
+    app.problem_index_task = asyncio.create_task(keep_index_fresh(
+        problem_index,
+        collection,
+        interval=float(os.environ.get("PROBLEM_INDEX_REFRESH_SECONDS", 30)),
+        full_rebuild_interval=float(os.environ.get("PROBLEM_INDEX_REBUILD_SECONDS", 3600)),
+        on_swap=swap_problem_index,
+    ))
+
+"""
+search_solutions: Ranked prefix/fuzzy matches of problem names for autocomplete
+
+Served entirely from the in-memory index (never touches MongoDB); pass a match's problem_name to /api/get-solutions.
+
+Args:
+    q (str): Partial or misspelled problem name
+    limit (int): Maximum number of matches
+Returns:
+    dict: results ordered by score, best first
+"""
+@router.get("/api/search-solutions")
+async def search_solutions(q: str, limit: int = 10):
+    return {"results": problem_index.search(q, limit=min(max(limit, 0), 50))}
+
+# Scrape-time gauges for state tracked by the caches and stores themselves
+metrics_registry.callback_counter("viewee_tts_cache_hits_total", "TTS audio cache hits.", lambda: audio_cache.hits)
+metrics_registry.callback_counter("viewee_tts_cache_misses_total", "TTS audio cache misses.", lambda: audio_cache.misses)
+metrics_registry.callback_counter("viewee_solutions_cache_hits_total", "Solutions response cache hits.", lambda: solutions_cache.hits)
+metrics_registry.callback_counter("viewee_solutions_cache_misses_total", "Solutions response cache misses.", lambda: solutions_cache.misses)
+metrics_registry.callback_counter("viewee_feedback_cache_hits_total", "Incremental feedback cache hits.", lambda: feedback_cache.hits)
+metrics_registry.callback_counter("viewee_feedback_cache_misses_total", "Incremental feedback cache misses.", lambda: feedback_cache.misses)
+metrics_registry.callback_gauge("viewee_event_queue_depth", "Interview events waiting to be written.", lambda: len(event_writer))
+metrics_registry.callback_counter("viewee_events_written_total", "Interview events written to MongoDB.", lambda: event_writer.written)
+metrics_registry.callback_counter("viewee_events_dropped_total", "Interview events dropped because the queue was full.", lambda: event_writer.dropped)
+metrics_registry.callback_gauge("viewee_evaluation_queue_depth", "Evaluations waiting for a worker.", lambda: len(evaluation_queue))
+metrics_registry.callback_counter("viewee_evaluations_completed_total", "Evaluations completed.", lambda: evaluation_queue.completed)
+metrics_registry.callback_counter("viewee_evaluations_failed_total", "Evaluations that failed after all retries.", lambda: evaluation_queue.failed)
+metrics_registry.callback_gauge("viewee_llm_admission_active", "LLM calls holding an admission slot.", lambda: llm_admission.active)
+metrics_registry.callback_gauge("viewee_llm_admission_waiting", "LLM calls waiting for an admission slot.", lambda: len(llm_admission))
+metrics_registry.callback_counter("viewee_llm_admission_rejected_total", "LLM calls rejected as overloaded.", lambda: llm_admission.rejected)
+metrics_registry.callback_gauge("viewee_tts_admission_active", "TTS calls holding an admission slot.", lambda: tts_admission.active)
+metrics_registry.callback_gauge("viewee_tts_admission_waiting", "TTS calls waiting for an admission slot.", lambda: len(tts_admission))
+metrics_registry.callback_counter("viewee_tts_admission_rejected_total", "TTS calls rejected as overloaded.", lambda: tts_admission.rejected)
+metrics_registry.callback_gauge("viewee_interview_sockets", "Interview WebSockets currently connected.", lambda: interview_channels.connected())
+metrics_registry.callback_gauge("viewee_interview_replay_bytes", "Bytes held in interview socket replay buffers.", lambda: interview_channels.buffered_bytes())
+metrics_registry.callback_gauge("viewee_problem_index_size", "Problem names in the search index.", lambda: len(problem_index))
+
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests, retry later."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+def create_app() -> FastAPI:
+    """
+    Builds the ASGI app. Nothing here touches the network; connections are opened by the lifespan
+    handler, and /ready reports when they are warm.
+
+    This is not an isolating factory: the clients, caches, queues and session store are module
+    globals shared by every app built here, and the lifespan closes them on shutdown. Only one app
+    may be running per process, and the lifespan refuses to start a second. Tests build a fresh app
+    per case to get a clean lifespan, one after another.
+    """
+    app = FastAPI()
+    app.router.lifespan_context = lifespan
+    app.add_exception_handler(Overloaded, overloaded_handler)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
+    app.include_router(interview.router)
+    return app
+
+app = create_app()
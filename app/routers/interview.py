@@ -1,21 +1,55 @@
-from fastapi import APIRouter, WebSocket
-from app.services.feedback_service import provide_real_time_feedback
+import asyncio
+import logging
+import os
+import time
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.services.feedback_service import CodeAnalysisEngine, summarize_analysis
 
 router = APIRouter(
     prefix="/interview",
     tags=["interview"],
 )
 
+logger = logging.getLogger(__name__)
+
+analysis_engine = CodeAnalysisEngine()
+
+# Wait for a pause in typing before analyzing, but never longer than the max wait
+DEBOUNCE_SECONDS = float(os.environ.get("CODE_SESSION_DEBOUNCE_MS", 300)) / 1000
+MAX_WAIT_SECONDS = float(os.environ.get("CODE_SESSION_MAX_WAIT_MS", 1500)) / 1000
+
+async def receive_latest(websocket: WebSocket, data: str) -> str:
+    """
+    Keeps replacing `data` with newer messages until the client pauses for DEBOUNCE_SECONDS.
+    """
+    deadline = time.monotonic() + MAX_WAIT_SECONDS
+    while True:
+        timeout = min(DEBOUNCE_SECONDS, deadline - time.monotonic())
+        if timeout <= 0:
+            return data
+        try:
+            data = await asyncio.wait_for(websocket.receive_text(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return data
+
 @router.websocket("/code-session")
 async def code_session(websocket: WebSocket):
     await websocket.accept()
     try:
         while True:
-            # Receive code from the client
+            # Receive code from the client, skipping intermediate keystrokes
             data = await websocket.receive_text()
-            # Provide real-time feedback on the code
-            feedback = provide_real_time_feedback(data)
-            # Send feedback to the client
-            await websocket.send_text(feedback)
-    except Exception as e:
-        await websocket.close()
+            data = await receive_latest(websocket, data)
+            # Analyze off the event loop and send feedback to the client
+            analysis = await analysis_engine.analyze(data)
+            await websocket.send_json({"feedback": summarize_analysis(analysis), "analysis": analysis})
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        logger.exception("Code session analysis failed")
+        try:
+            await websocket.send_json({"error": "Code analysis failed."})
+            await websocket.close(code=1011)
+        except Exception:
+            # The client is already gone
+            pass
@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+
+# Lower values are admitted first
+LIVE = 0
+BACKGROUND = 1
+
+
+class Overloaded(Exception):
+    """
+    Raised when a call is not admitted: the wait queue is full or the caller's deadline passed.
+    `retry_after` is a whole number of seconds suitable for a Retry-After header.
+    """
+
+    def __init__(self, name: str, reason: str, retry_after: int):
+        super().__init__(f"{name} overloaded: {reason}")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Admission control in front of one upstream (LLM completions, TTS streams).
+
+    At most `max_concurrency` calls hold a slot at once, and when `rate` is set a token bucket
+    (refilled at `rate` per second, holding up to `burst`) bounds how fast new calls start. Calls
+    that cannot start immediately wait in a priority queue, LIVE before BACKGROUND and first come
+    first served within a priority. The queue holds at most `max_waiting` calls; beyond that, or
+    once a call has waited `timeout` seconds, Overloaded is raised so the caller can answer 429
+    (or close a WebSocket with 1013) instead of piling more work onto a saturated upstream.
+
+    Everything runs on the event loop thread, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 64,
+        rate: float = 0.0,
+        burst: Optional[int] = None,
+        max_waiting: int = 256,
+        timeout: float = 10.0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst or max(1, math.ceil(rate))
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    def _refill(self):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _token_wait(self) -> float:
+        # Seconds until the bucket holds a whole token; 0 if it already does
+        if not self.rate:
+            return 0.0
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def _take(self):
+        self.active += 1
+        self.admitted += 1
+        if self.rate:
+            self._tokens -= 1
+
+    def retry_after(self) -> int:
+        """
+        Rough number of seconds until a new call would be admitted.
+        """
+        if self.rate:
+            estimate = (len(self._waiters) + 1) / self.rate
+        else:
+            estimate = self.timeout * (len(self._waiters) + 1) / max(self.max_waiting, 1)
+        return max(1, math.ceil(estimate))
+
+    def _reject(self, reason: str) -> Overloaded:
+        self.rejected += 1
+        return Overloaded(self.name, reason, self.retry_after())
+
+    def check(self):
+        """
+        Raises Overloaded if a call made now would be rejected straight away.
+        """
+        if len(self._waiters) >= self.max_waiting:
+            raise self._reject("wait queue is full")
+
+    def _dispatch(self):
+        self._timer = None
+        while self._waiters and self.active < self.max_concurrency:
+            wait = self._token_wait()
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self._take()
+            waiter.set_result(None)
+
+    async def acquire(self, priority: int = LIVE, timeout: Optional[float] = None):
+        """
+        Waits for a slot. Every successful acquire must be paired with `release`.
+        """
+        if not self._waiters and self.active < self.max_concurrency and self._token_wait() == 0:
+            self._take()
+            return
+        self.check()
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._order), waiter)
+        heapq.heappush(self._waiters, entry)
+        if self._timer is None:
+            self._dispatch()
+        try:
+            await asyncio.wait_for(waiter, self.timeout if timeout is None else timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as the wait ended
+                self.release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("timed out waiting for a slot") from None
+            raise
+
+    def release(self):
+        self.active -= 1
+        if self._waiters and self._timer is None:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = LIVE, timeout: Optional[float] = None):
+        await self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
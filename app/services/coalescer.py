@@ -0,0 +1,110 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _Flight(Generic[T]):
+    __slots__ = ("latest_seq", "task", "waiter", "pending", "generate", "first_at", "last_at")
+
+    def __init__(self):
+        self.latest_seq = 0
+        self.task: Optional[asyncio.Task] = None
+        # Resolved by the next generation to start; None while nothing is waiting for one
+        self.waiter: Optional[asyncio.Future] = None
+        self.pending: List[T] = []
+        self.generate = None
+        self.first_at = 0.0
+        self.last_at = 0.0
+
+
+class FeedbackCoalescer(Generic[T, R]):
+    """
+    Per-session single flight for feedback generation.
+
+    Each submitted update is queued for its session and a generation starts after a `debounce`
+    pause, or `max_wait` after the oldest waiting update if the updates never pause. A generation
+    that has started is never cancelled: its callers get its result, tagged with the newest sequence
+    number it covered, and updates that arrived meanwhile are merged into one follow-up generation.
+    So a client sending updates faster than the model answers still hears back at least every
+    `max_wait` plus one generation, and every completion that is paid for is used.
+    """
+
+    def __init__(self, debounce: float = 0.15, max_wait: float = 1.0):
+        self.debounce = debounce
+        self.max_wait = max(max_wait, debounce)
+        self._flights: Dict[str, _Flight[T]] = {}
+
+    def is_pending(self, session_id: str) -> bool:
+        return session_id in self._flights
+
+    def is_latest(self, session_id: str, seq: int) -> bool:
+        flight = self._flights.get(session_id)
+        return flight is not None and flight.latest_seq == seq
+
+    async def submit(
+        self,
+        session_id: str,
+        seq: int,
+        update: Optional[T],
+        generate: Callable[[List[T]], Awaitable[R]],
+    ) -> Tuple[int, R]:
+        """
+        Queues `update` and waits for the next generation that covers it.
+        `generate` receives every update merged since the last successful generation; the newest
+        submission's `generate` is the one called.
+        """
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(session_id)
+        if flight is None:
+            flight = self._flights[session_id] = _Flight()
+
+        now = loop.time()
+        flight.latest_seq = seq
+        flight.generate = generate
+        flight.last_at = now
+        if update is not None:
+            flight.pending.append(update)
+        if flight.waiter is None:
+            flight.waiter = loop.create_future()
+            flight.first_at = now
+        waiter = flight.waiter
+        if flight.task is None or flight.task.done():
+            flight.task = loop.create_task(self._run(session_id, flight))
+
+        # Shielded so a disconnecting client does not cancel the result other callers wait on
+        return await asyncio.shield(waiter)
+
+    async def _debounce(self, flight: _Flight[T]):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a pause in updates, but never past max_wait since the oldest one
+            deadline = min(flight.last_at + self.debounce, flight.first_at + self.max_wait)
+            delay = deadline - loop.time()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def _run(self, session_id: str, flight: _Flight[T]):
+        waiter = None
+        try:
+            while flight.waiter is not None:
+                await self._debounce(flight)
+                waiter, seq, generate = flight.waiter, flight.latest_seq, flight.generate
+                merged = list(flight.pending)
+                # Updates from here on wait for the follow-up generation
+                flight.waiter = None
+                try:
+                    result = await generate(merged)
+                except Exception as e:
+                    waiter.set_exception(e)
+                else:
+                    del flight.pending[:len(merged)]
+                    waiter.set_result((seq, result))
+        finally:
+            for pending in (waiter, flight.waiter):
+                if pending is not None and not pending.done():
+                    pending.cancel()
+            if self._flights.get(session_id) is flight:
+                del self._flights[session_id]
@@ -0,0 +1,27 @@
+from typing import Iterable
+
+
+class DeltaConflict(Exception):
+    """
+    Raised when edits cannot be applied to the stored buffer; the client should resend the full code.
+    """
+
+
+def apply_edits(code: str, edits: Iterable) -> str:
+    """
+    Applies text edits to `code`.
+
+    Each edit replaces `code[start:end]` with `text`. Offsets are character positions in the
+    base version the client edited, so edits must not overlap; they are applied back to front
+    so earlier offsets stay valid.
+    """
+    ordered = sorted(edits, key=lambda edit: (edit.start, edit.end))
+    previous_end = 0
+    for edit in ordered:
+        if edit.start < previous_end or edit.start > edit.end or edit.end > len(code):
+            raise DeltaConflict(f"Edit [{edit.start}, {edit.end}) does not fit the base buffer")
+        previous_end = edit.end
+
+    for edit in reversed(ordered):
+        code = code[:edit.start] + edit.text + code[edit.end:]
+    return code
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _only_duplicates(error: Exception) -> bool:
+    """
+    True for a bulk write error caused only by events a previous, partly failed attempt already wrote.
+    """
+    details = getattr(error, "details", None)
+    write_errors = details.get("writeErrors") if isinstance(details, dict) else None
+    return bool(write_errors) and all(write_error.get("code") == 11000 for write_error in write_errors)
+
+
+class EventWriter:
+    """
+    Write-behind persistence of interview events (transcript segments, code snapshots, feedback).
+
+    `record` only appends to an in-memory queue, so the request path never waits on MongoDB. A
+    background task flushes the queue with `insert_many` once `max_batch` events are waiting or
+    `flush_interval` seconds have passed, whichever comes first. The queue is bounded by
+    `max_queue`: hot-path producers use `record`, which drops the event and counts it when the queue
+    is full; events that must not be lost (session and evaluation lifecycle) use `put`, which waits
+    up to a timeout for the writer to make room. `close` flushes whatever is left.
+
+    Events recorded before `start` are buffered and written once a collection is attached.
+    Everything runs on the event loop thread, so the queue needs no locking.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 50000,
+        retry_interval: float = 1.0,
+    ):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.retry_interval = retry_interval
+        self.collection = None
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._wake: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def record(self, session_id: str, kind: str, **fields) -> bool:
+        """
+        Queues one event without waiting. Returns False (and counts a drop) if the queue is full.
+        """
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return False
+        fields.update(session_id=session_id, type=kind, at=datetime.now(timezone.utc))
+        self._queue.append(fields)
+        if len(self._queue) >= self.max_batch and self._wake is not None:
+            self._wake.set()
+        return True
+
+    async def put(self, session_id: str, kind: str, timeout: Optional[float] = None, **fields) -> bool:
+        """
+        Queues one event, waiting up to `timeout` seconds (indefinitely if None) for the writer to
+        make room while the queue is full. Returns False, and counts a drop, if there is still none.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while len(self._queue) >= self.max_queue and self._space is not None:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            self._wake.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self.record(session_id, kind, **fields)
+
+    def start(self, collection):
+        if self._task is not None:
+            self._task.cancel()
+        self.collection = collection
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if self._queue:
+            self._wake.set()
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("session_id", 1), ("at", 1)])
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not await self.flush():
+                await asyncio.sleep(self.retry_interval)
+
+    async def flush(self) -> bool:
+        """
+        Writes everything queued so far in batches of `max_batch`. On a failed write the batch is
+        put back at the front of the queue and False is returned; the writer retries later.
+        """
+        while self._queue and self.collection is not None:
+            batch: List[Dict[str, Any]] = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+            self._space.set()
+            self._space = asyncio.Event()
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+            except Exception as e:
+                if not _only_duplicates(e):
+                    self.failed_flushes += 1
+                    logger.error("Failed to persist %d interview events: %s", len(batch), e)
+                    # insert_many has set _id on every event, so a retry skips the ones already written
+                    room = max(self.max_queue - len(self._queue), 0)
+                    self.dropped += len(batch) - min(room, len(batch))
+                    self._queue.extendleft(reversed(batch[:room]))
+                    return False
+            self.written += len(batch)
+        return True
+
+    async def close(self, timeout: float = 5.0):
+        """
+        Stops the background task and flushes what is left, giving up after `timeout` seconds.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.error("Gave up flushing %d interview events at shutdown", len(self._queue))
@@ -0,0 +1,50 @@
+import ast
+import hashlib
+import io
+import json
+import tokenize
+from functools import lru_cache
+from typing import Any, Dict
+
+_SKIPPED_TOKENS = (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER)
+
+
+def _token_stream(code: str) -> str:
+    """
+    Token strings without comments or layout, up to the first point the tokenizer gives up
+    (an unclosed bracket mid-edit); anything after that is kept as whitespace-collapsed text.
+    """
+    strings = []
+    lines = io.StringIO(code)
+    try:
+        for token in tokenize.generate_tokens(lines.readline):
+            if token.type not in _SKIPPED_TOKENS:
+                strings.append(token.string)
+    except (tokenize.TokenError, SyntaxError):
+        strings.extend(lines.read().split())
+    return " ".join(strings)
+
+
+@lru_cache(maxsize=512)
+def code_fingerprint(code: str) -> str:
+    """
+    Hash of the code with formatting and comments stripped, so reformatting or commenting a
+    solution maps to the same cache entry.
+
+    Valid Python is fingerprinted by its AST dump. Code that does not parse (mid-edit, or another
+    language) falls back to its token stream, then to the whitespace-collapsed text.
+    """
+    try:
+        normalized = ast.dump(ast.parse(code))
+    except (SyntaxError, ValueError):
+        normalized = _token_stream(code)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def feedback_cache_key(question: Dict[str, Any], code: str, transcript: str) -> str:
+    """
+    Identifies an interview state: the question, the normalized code and the unanswered transcript.
+    """
+    question_text = json.dumps(question, sort_keys=True, default=str)
+    parts = (question_text, code_fingerprint(code), " ".join(transcript.split()))
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
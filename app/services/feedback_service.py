@@ -1,5 +1,263 @@
+import ast
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import textwrap
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+_LOOPS = (ast.For, ast.AsyncFor, ast.While)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+
+
+def _loop_depth(node: ast.AST, depth: int = 0) -> int:
+    """
+    Deepest loop nesting under `node`; each comprehension generator counts as a loop.
+    Nested function definitions are analyzed on their own.
+    """
+    deepest = depth
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, _SCOPES):
+            continue
+        if isinstance(child, _LOOPS):
+            deepest = max(deepest, _loop_depth(child, depth + 1))
+        elif isinstance(child, _COMPREHENSIONS):
+            deepest = max(deepest, _loop_depth(child, depth + len(child.generators)))
+        else:
+            deepest = max(deepest, _loop_depth(child, depth))
+    return deepest
+
+
+def _calls(node: ast.AST) -> List[str]:
+    names = []
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            if isinstance(child.func, ast.Name):
+                names.append(child.func.id)
+            elif isinstance(child.func, ast.Attribute):
+                names.append(child.func.attr)
+    return names
+
+
+def _recurses(nodes: List[ast.AST], name: str) -> bool:
+    return any(name in _calls(node) for node in nodes)
+
+
+def _returns(nodes: List[ast.AST]) -> bool:
+    return any(isinstance(child, ast.Return) for node in nodes for child in ast.walk(node))
+
+
+def _has_base_case(function: ast.AST, name: str) -> bool:
+    """
+    A recursive function has a base case if some branch leaves it without recursing: one that
+    returns without calling the function again, or that skips the call its sibling branch makes.
+    A branch that only raises does not count, and neither does a try around the recursive call.
+    """
+    for child in ast.walk(function):
+        if isinstance(child, ast.If):
+            branches = [child.body, child.orelse]
+        elif isinstance(child, ast.IfExp):
+            branches = [[child.body], [child.orelse]]
+        elif isinstance(child, ast.Match):
+            branches = [case.body for case in child.cases]
+        else:
+            continue
+        recursing = [branch for branch in branches if _recurses(branch, name)]
+        clean = [
+            branch for branch in branches
+            if not _recurses(branch, name) and not any(isinstance(node, ast.Raise) for node in branch)
+        ]
+        if (recursing and clean) or any(_returns(branch) for branch in clean):
+            return True
+    return False
+
+
+def _unused_variables(function: ast.AST) -> List[str]:
+    assigned: Dict[str, int] = {}
+    loaded = set()
+    declared = set()
+    for child in ast.walk(function):
+        if isinstance(child, ast.Name):
+            if isinstance(child.ctx, ast.Store):
+                assigned.setdefault(child.id, child.lineno)
+            else:
+                loaded.add(child.id)
+        elif isinstance(child, (ast.Global, ast.Nonlocal)):
+            declared.update(child.names)
+    return sorted(
+        (name for name in assigned if name not in loaded and name not in declared and not name.startswith("_")),
+        key=assigned.get,
+    )
+
+
+def _complexity(loop_depth: int, sorts: bool, recursive: bool) -> str:
+    if loop_depth == 0:
+        estimate = "O(n log n)" if sorts else "O(1)"
+    elif loop_depth == 1:
+        estimate = "O(n log n)" if sorts else "O(n)"
+    else:
+        estimate = f"O(n^{loop_depth})"
+    if recursive:
+        estimate += " per call (recursive)"
+    return estimate
+
+
+@lru_cache(maxsize=1024)
+def analyze_unit(source: str) -> Dict[str, Any]:
+    """
+    Analyzes one top-level function, class or the module-level statements. Cached by source text,
+    so functions the candidate is not touching are not re-analyzed between keystrokes.
+    """
+    tree = ast.parse(textwrap.dedent(source))
+    node = tree
+    if len(tree.body) == 1 and isinstance(tree.body[0], (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        node = tree.body[0]
+    name = getattr(node, "name", "<module>")
+    functions = [node] if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) else [
+        child for child in ast.walk(node) if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+
+    issues: List[str] = []
+    recursive = False
+    for function in functions:
+        if function.name in _calls(function):
+            recursive = True
+            if not _has_base_case(function, function.name):
+                issues.append(f"`{function.name}` calls itself without an obvious base case.")
+        for variable in _unused_variables(function):
+            issues.append(f"`{variable}` is assigned in `{function.name}` but never used.")
+
+    loop_depth = max([_loop_depth(node)] + [_loop_depth(function) for function in functions])
+    sorts = any(call in ("sort", "sorted") for call in _calls(node))
+    return {
+        "name": name,
+        "loop_depth": loop_depth,
+        "recursive": recursive,
+        "complexity": _complexity(loop_depth, sorts, recursive),
+        "issues": issues,
+    }
+
+
+TOO_NESTED = "code is nested too deeply to analyze"
+
+
+def _unparsable(line: Optional[int], message: str) -> Dict[str, Any]:
+    return {
+        "syntax_error": {"line": line, "message": message},
+        "units": [],
+        "loop_depth": 0,
+        "issues": [],
+    }
+
+
+def analyze_source(source: str) -> Dict[str, Any]:
+    """
+    Full analysis of a code buffer. CPU-bound; run it through CodeAnalysisEngine, not on the event loop.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return _unparsable(e.lineno, e.msg)
+    except (RecursionError, MemoryError):
+        # A deeply nested paste overflows the parser's recursion
+        return _unparsable(None, TOO_NESTED)
+
+    units = []
+    module_lines: List[str] = []
+    try:
+        for node in tree.body:
+            segment = ast.get_source_segment(source, node, padded=True)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                decorators = "".join(f"@{ast.get_source_segment(source, d)}\n" for d in node.decorator_list)
+                units.append(analyze_unit(decorators + segment))
+            elif segment:
+                module_lines.append(segment)
+        if module_lines:
+            units.append(analyze_unit("\n".join(module_lines)))
+    except (RecursionError, MemoryError):
+        # Parsed, but too deep for the visitors
+        return _unparsable(None, TOO_NESTED)
+
+    return {
+        "syntax_error": None,
+        "units": units,
+        "loop_depth": max((unit["loop_depth"] for unit in units), default=0),
+        "issues": [issue for unit in units for issue in unit["issues"]],
+    }
+
+
+def summarize_analysis(analysis: Dict[str, Any]) -> str:
+    if analysis.get("syntax_error"):
+        error = analysis["syntax_error"]
+        if error["line"] is None:
+            return f"Could not analyze the code: {error['message']}."
+        return f"Syntax error on line {error['line']}: {error['message']}."
+    messages = []
+    for unit in analysis["units"]:
+        if unit["loop_depth"] >= 2:
+            messages.append(
+                f"Nested loops (depth {unit['loop_depth']}) in `{unit['name']}` suggest {unit['complexity']} time."
+            )
+    messages.extend(analysis["issues"])
+    if not messages:
+        if analysis["loop_depth"] == 1:
+            return "Looks like you're using a loop!"
+        return "No issues detected, keep coding!"
+    return " ".join(messages)
+
+
 def provide_real_time_feedback(code: str) -> str:
-    # Dummy feedback logic (replace with AI-driven feedback)
-    if "for" in code or "while" in code:
-        return "Looks like you're using a loop!"
-    return "No loop detected, keep coding!"
+    return summarize_analysis(analyze_source(code))
+
+
+class CodeAnalysisEngine:
+    """
+    Runs analyze_source in a process pool so a large paste cannot block other sockets.
+    Results for identical buffers are cached in this process; per-function results are cached
+    inside each worker by analyze_unit.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, cache_size: int = 256):
+        self.max_workers = max_workers or int(os.environ.get("CODE_ANALYSIS_WORKERS", 2))
+        self.cache_size = cache_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: a forked child would inherit the event loop, the logging queue
+            # thread and the aiohttp pools, possibly with their locks held
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def analyze(self, source: str) -> Dict[str, Any]:
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            return cached
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._executor(), analyze_source, source)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge paste); start a fresh pool and retry once
+            self._pool = None
+            result = await loop.run_in_executor(self._executor(), analyze_source, source)
+
+        self._results[key] = result
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        return result
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPPool:
+    """
+    Keep-alive aiohttp session shared by every call to one upstream, so TLS connections are
+    reused instead of renegotiated per request. The session is bound to the loop that created it
+    and rebuilt if the running loop changes (e.g. a fresh TestClient portal).
+
+    aiohttp is imported on first use to keep it out of the app's import time.
+    """
+
+    def __init__(self, limit: int = 100, keepalive_timeout: float = 30.0):
+        self.limit = limit
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def session(self) -> "aiohttp.ClientSession":
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    async def warm(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 5.0) -> bool:
+        """
+        Opens a pooled connection to `url`'s host ahead of real traffic. Any HTTP status counts as
+        success; only a failure to connect returns False.
+        """
+        import aiohttp
+
+        try:
+            async with self.session().head(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)):
+                return True
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            logger.warning("Could not pre-connect to %s: %s", url, e)
+            return False
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import struct
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple, Union
+
+# Binary frames start with the frame's sequence number as a big-endian uint32
+AUDIO_HEADER = struct.Struct(">I")
+
+Frame = Union[str, bytes]
+
+
+class InterviewChannel:
+    """
+    Outbound side of one interview's multiplexed WebSocket.
+
+    Every feedback/audio frame gets the next sequence number and is kept in a ring buffer of at
+    most `replay_frames` frames and `replay_bytes` bytes, so a client that reconnects can ask for
+    everything after the last sequence number it saw. JSON frames carry it as "seq"; binary audio
+    frames carry it in a 4-byte header (AUDIO_HEADER). Control frames (welcome, ping, pong, resync) are not numbered or kept.
+
+    The channel outlives its socket: work started for the interview keeps running while the client
+    is away and its frames are buffered for the resume. Only one socket is attached at a time.
+    """
+
+    def __init__(self, session_id: str, replay_frames: int = 1024, replay_bytes: int = 1024 * 1024):
+        self.session_id = session_id
+        # `sub` of the user who first attached; only they may attach again
+        self.owner: Optional[str] = None
+        self.seq = 0
+        self.feedback_seq = 0
+        self.websocket = None
+        self.detached_at: Optional[float] = time.monotonic()
+        self.audio_task: Optional[asyncio.Task] = None
+        self.tasks: Set[asyncio.Task] = set()
+        self.replay_frames = replay_frames
+        self.replay_bytes = replay_bytes
+        self._frames: Deque[Tuple[int, Frame]] = deque()
+        self._buffered_bytes = 0
+        self._lock = asyncio.Lock()
+
+    def attach(self, websocket):
+        """
+        Makes `websocket` the live socket and returns the one it replaced, if any.
+        """
+        previous, self.websocket = self.websocket, websocket
+        self.detached_at = None
+        return previous
+
+    def detach(self, websocket):
+        if self.websocket is websocket:
+            self.websocket = None
+            self.detached_at = time.monotonic()
+
+    def _buffer(self, seq: int, frame: Frame):
+        self._frames.append((seq, frame))
+        self._buffered_bytes += len(frame)
+        # The newest frame is always kept, even if it alone exceeds the byte budget
+        while len(self._frames) > 1 and (len(self._frames) > self.replay_frames or self._buffered_bytes > self.replay_bytes):
+            _, dropped = self._frames.popleft()
+            self._buffered_bytes -= len(dropped)
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._buffered_bytes
+
+    def spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def _deliver(self, frame: Frame):
+        websocket = self.websocket
+        if websocket is None:
+            return
+        try:
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+        except Exception:
+            # The receive loop notices the disconnect; the frame stays buffered for a resume
+            self.detach(websocket)
+
+    async def send_json(self, message: Dict[str, Any]) -> int:
+        async with self._lock:
+            self.seq += 1
+            frame = json.dumps({"seq": self.seq, **message})
+            self._buffer(self.seq, frame)
+            await self._deliver(frame)
+            return self.seq
+
+    async def send_audio(self, data: bytes) -> int:
+        async with self._lock:
+            self.seq += 1
+            frame = AUDIO_HEADER.pack(self.seq) + data
+            self._buffer(self.seq, frame)
+            await self._deliver(frame)
+            return self.seq
+
+    async def send_control(self, message: Dict[str, Any]):
+        async with self._lock:
+            await self._deliver(json.dumps(message))
+
+    def frames_after(self, last_seq: int) -> Optional[List[Frame]]:
+        """
+        Buffered frames numbered above `last_seq`, or None if some of them have already been
+        dropped from the ring buffer and the client has to resync instead.
+        """
+        oldest = self._frames[0][0] if self._frames else self.seq + 1
+        if last_seq + 1 < oldest:
+            return None
+        return [frame for seq, frame in self._frames if seq > last_seq]
+
+    async def replay(self, last_seq: int) -> bool:
+        async with self._lock:
+            frames = self.frames_after(last_seq)
+            if frames is None:
+                return False
+            for frame in frames:
+                await self._deliver(frame)
+            return True
+
+    def cancel(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+
+class ChannelRegistry:
+    """
+    In-process map of session_id -> InterviewChannel. A channel with no socket attached is kept
+    for `resume_ttl` seconds so the client can reconnect and resume, then dropped and its work
+    cancelled. Expired channels are swept on every `get` and, once `start` has been called, by a
+    background task every `sweep_interval` seconds, so their replay buffers are freed without waiting
+    for the next connection.
+    """
+
+    def __init__(
+        self,
+        resume_ttl: float = 120.0,
+        replay_frames: int = 1024,
+        replay_bytes: int = 1024 * 1024,
+        sweep_interval: float = 30.0,
+    ):
+        self.resume_ttl = resume_ttl
+        self.replay_frames = replay_frames
+        self.replay_bytes = replay_bytes
+        self.sweep_interval = sweep_interval
+        self._channels: Dict[str, InterviewChannel] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def connected(self) -> int:
+        return sum(1 for channel in self._channels.values() if channel.websocket is not None)
+
+    def get(self, session_id: str) -> InterviewChannel:
+        self.sweep()
+        channel = self._channels.get(session_id)
+        if channel is None:
+            channel = self._channels[session_id] = InterviewChannel(session_id, self.replay_frames, self.replay_bytes)
+        return channel
+
+    def sweep(self):
+        now = time.monotonic()
+        expired = [
+            session_id for session_id, channel in self._channels.items()
+            if channel.websocket is None and channel.detached_at is not None and now - channel.detached_at > self.resume_ttl
+        ]
+        for session_id in expired:
+            self._channels.pop(session_id).cancel()
+
+    def buffered_bytes(self) -> int:
+        return sum(channel.buffered_bytes for channel in self._channels.values())
+
+    def start(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+
+    def close(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        for channel in self._channels.values():
+            channel.cancel()
+        self._channels.clear()
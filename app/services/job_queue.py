@@ -0,0 +1,209 @@
+import asyncio
+import itertools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    """
+    Raised by JobQueue.submit when `max_pending` jobs are already waiting.
+    """
+
+
+class PermanentError(Exception):
+    """
+    Raised by a handler for a failure that retrying cannot fix; the job fails without further attempts.
+    """
+
+
+class Job:
+    __slots__ = (
+        "job_id", "key", "payload", "priority", "status", "attempts",
+        "result", "error", "created_at", "finished_at", "_done",
+    )
+
+    def __init__(self, key: str, payload: Any, priority: int):
+        self.job_id = str(uuid4())
+        self.key = key
+        self.payload = payload
+        self.priority = priority
+        self.status = QUEUED
+        self.attempts = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    async def wait(self):
+        await self._done.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "key": self.key,
+            "status": self.status,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    In-process priority job queue drained by a fixed pool of `workers` tasks, so a burst of
+    submissions queues up instead of running (and timing out) all at once.
+
+    - Lower `priority` values run first; equal priorities run in submission order.
+    - Jobs are deduplicated by `key`: submitting a key that is queued or running returns that job,
+      unless `replace=True`, in which case a queued job takes the new payload and a running one is
+      superseded by a new job. A superseded job's outcome is not reported, so it cannot overwrite its successor's.
+    - A failing job is retried up to `max_retries` times with jittered exponential backoff;
+      PermanentError fails it at once.
+    - `on_update(job)` is awaited on every status change, e.g. to persist results.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[Any]],
+        workers: int = 4,
+        max_pending: int = 1000,
+        max_retries: int = 2,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        on_update: Optional[Callable[[Job], Awaitable[None]]] = None,
+        keep_finished: int = 1000,
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.on_update = on_update
+        self.keep_finished = keep_finished
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._order = itertools.count()
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._retries: set = set()
+        self.completed = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    def get(self, key: str) -> Optional[Job]:
+        return self._jobs.get(key)
+
+    async def submit(self, key: str, payload: Any, priority: int = 1, replace: bool = False) -> Job:
+        """
+        Queues a job, or returns the queued/running job already registered for `key`. With `replace`,
+        that job is brought up to date with `payload` instead (see the class docstring).
+        """
+        existing = self._jobs.get(key)
+        if existing is not None and not existing.finished:
+            if not replace:
+                return existing
+            if existing.status == QUEUED:
+                # Not started yet (or waiting out a retry backoff): it just runs with the new payload
+                existing.payload = payload
+                await self._notify(existing)
+                return existing
+        if self._queue is None:
+            raise RuntimeError("JobQueue.start() has not been called")
+        if self._queue.qsize() >= self.max_pending:
+            raise QueueFull(f"{self._queue.qsize()} jobs already pending")
+
+        job = Job(key, payload, priority)
+        self._jobs[key] = job
+        self._forget_finished()
+        await self._notify(job)
+        self._queue.put_nowait((priority, next(self._order), job))
+        return job
+
+    def _forget_finished(self):
+        if len(self._jobs) <= self.keep_finished:
+            return
+        finished = [key for key, job in self._jobs.items() if job.finished]
+        for key in finished[: len(self._jobs) - self.keep_finished]:
+            del self._jobs[key]
+
+    def _superseded(self, job: Job) -> bool:
+        return self._jobs.get(job.key) is not job
+
+    async def _notify(self, job: Job):
+        if self.on_update is None or self._superseded(job):
+            return
+        try:
+            await self.on_update(job)
+        except Exception as e:
+            logger.error("Could not record job %s (%s): %s", job.job_id, job.status, e)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _requeue_later(self, job: Job, delay: float):
+        await asyncio.sleep(delay)
+        self._queue.put_nowait((job.priority, next(self._order), job))
+
+    async def _work(self):
+        while True:
+            _, _, job = await self._queue.get()
+            job.status = RUNNING
+            job.attempts += 1
+            await self._notify(job)
+            try:
+                job.result = await self.handler(job.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.error = str(e)
+                retryable = not isinstance(e, PermanentError) and not self._superseded(job)
+                if job.attempts <= self.max_retries and retryable:
+                    logger.warning("Job %s failed (attempt %d), retrying: %s", job.key, job.attempts, e)
+                    job.status = QUEUED
+                    await self._notify(job)
+                    # The worker moves on; the job rejoins the queue after its backoff
+                    retry = asyncio.create_task(self._requeue_later(job, self._backoff(job.attempts - 1)))
+                    self._retries.add(retry)
+                    retry.add_done_callback(self._retries.discard)
+                    continue
+                logger.error("Job %s failed after %d attempts: %s", job.key, job.attempts, e)
+                job.status = FAILED
+                self.failed += 1
+            else:
+                job.status = DONE
+                job.error = None
+                self.completed += 1
+            job.finished_at = time.time()
+            job._done.set()
+            await self._notify(job)
+
+    async def close(self):
+        for task in self._tasks + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
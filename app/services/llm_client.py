@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+from .metrics import observe_stage, track_stage
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Upstream statuses worth another attempt; anything else is returned to the caller as-is
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """
+    Raised when a completion could not be produced after all retries.
+    """
+
+
+class LLMClient:
+    """
+    Async client for OpenAI-compatible chat completion APIs.
+
+    One pooled aiohttp session is shared by every call so TLS connections stay warm,
+    and a semaphore bounds how many completions are in flight at once. Point
+    `base_url` at a local stub server to run without the real API. aiohttp is imported
+    on first use, keeping it out of the app's import time.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = OPENAI_BASE_URL,
+        model: str = DEFAULT_MODEL,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        max_concurrency: int = 256,
+        pool_size: int = 100,
+        keepalive_timeout: float = 30.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "LLMClient":
+        return cls(
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            base_url=os.environ.get("OPENAI_BASE_URL", OPENAI_BASE_URL),
+            model=os.environ.get("OPENAI_MODEL", DEFAULT_MODEL),
+            timeout=float(os.environ.get("LLM_TIMEOUT_SECONDS", 30)),
+            max_retries=int(os.environ.get("LLM_MAX_RETRIES", 2)),
+            max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 256)),
+            pool_size=int(os.environ.get("LLM_POOL_SIZE", 100)),
+        )
+
+    def _ensure_session(self) -> "aiohttp.ClientSession":
+        import aiohttp
+
+        # Sessions and semaphores are bound to the loop that created them, so rebuild them
+        # if we are now running on a different loop (e.g. a fresh TestClient portal).
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps retries from many sessions from arriving in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _payload(self, messages, model, max_tokens, temperature, stream=False) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": model or self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    @asynccontextmanager
+    async def _completion(self, payload: Dict[str, Any], timeout: Optional[float]) -> AsyncIterator["aiohttp.ClientResponse"]:
+        """
+        POSTs to the completions endpoint with retries and yields the unread 200 response.
+        Each attempt holds a concurrency slot only while it talks to the API, so a call waiting
+        out its backoff does not keep fresh calls from starting; the successful attempt keeps
+        its slot until the caller is done with the response.
+        """
+        import aiohttp
+
+        session = self._ensure_session()
+        semaphore = self._semaphore
+        client_timeout = aiohttp.ClientTimeout(
+            total=timeout or self.timeout, sock_connect=self.connect_timeout
+        )
+        url = f"{self.base_url}/chat/completions"
+
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with semaphore:
+                try:
+                    response = await session.post(
+                        url, headers=self._headers(), json=payload, timeout=client_timeout
+                    )
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    last_error = e
+                else:
+                    if response.status == 200:
+                        async with response:
+                            yield response
+                        return
+                    body = await response.text()
+                    response.release()
+                    last_error = LLMError(f"Upstream returned {response.status}: {body[:200]}")
+                    if response.status not in RETRYABLE_STATUSES:
+                        raise last_error
+                    retry_after = response.headers.get("Retry-After")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        raise LLMError(f"Completion failed after {self.max_retries + 1} attempts: {last_error}")
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.5,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Runs a chat completion and returns the stripped message content.
+        """
+        import aiohttp
+
+        self._ensure_session()
+        payload = self._payload(messages, model, max_tokens, temperature)
+        async with track_stage("llm"), self._completion(payload, timeout) as response:
+            try:
+                data = await response.json()
+                return data["choices"][0]["message"]["content"].strip()
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                raise LLMError(f"Failed reading completion: {e}") from e
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise LLMError(f"Malformed completion response: {e}") from e
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.5,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Runs a streaming chat completion and yields content deltas as they arrive.
+        Retries only happen before the first byte; a broken stream raises LLMError.
+        """
+        import aiohttp
+
+        self._ensure_session()
+        payload = self._payload(messages, model, max_tokens, temperature, stream=True)
+        started = time.perf_counter()
+        first_token = True
+        async with track_stage("llm_stream"), self._completion(payload, timeout) as response:
+            try:
+                async for raw_line in response.content:
+                    line = raw_line.strip()
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[len(b"data:"):].strip()
+                    if data == b"[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        if first_token:
+                            observe_stage("llm_first_token", time.perf_counter() - started)
+                            first_token = False
+                        yield delta
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                raise LLMError(f"Completion stream interrupted: {e}") from e
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise LLMError(f"Malformed completion chunk: {e}") from e
+
+    async def warm(self) -> bool:
+        """
+        Opens a pooled connection to the API before the first completion needs it.
+        Any HTTP answer counts; returns False only if the API could not be reached.
+        """
+        import aiohttp
+
+        session = self._ensure_session()
+        try:
+            async with session.get(
+                f"{self.base_url}/models",
+                headers=self._headers(),
+                timeout=aiohttp.ClientTimeout(total=self.connect_timeout),
+            ) as response:
+                await response.read()
+                return True
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            logger.warning("Could not pre-connect to %s: %s", self.base_url, e)
+            return False
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,261 @@
+"""
+Prometheus-style instruments for per-stage latency.
+
+Recording happens on the event loop thread only, so instruments are plain dicts and lists with no
+locks: an observation is a dict lookup plus a couple of in-place increments. A scrape racing a
+recording can at worst see one observation in a bucket but not yet in the sum.
+"""
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Seconds; spans a cache hit up to a slow completion
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        self._values[labels] = value
+
+
+class CallbackGauge(_Metric):
+    """
+    Gauge read at scrape time, for values already tracked elsewhere (queue depths, cache sizes).
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, callback: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return self._header() + [f"{self.name} {_format_value(self.callback())}"]
+
+
+class CallbackCounter(CallbackGauge):
+    """
+    Counter read at scrape time, for monotonic totals already tracked elsewhere (hits, drops).
+    """
+
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), list(counts)):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, label_names=()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, label_names=()) -> Gauge:
+        return self._register(Gauge(name, help_text, label_names))
+
+    def callback_gauge(self, name, help_text, callback) -> CallbackGauge:
+        return self._register(CallbackGauge(name, help_text, callback))
+
+    def callback_counter(self, name, help_text, callback) -> CallbackCounter:
+        return self._register(CallbackCounter(name, help_text, callback))
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_latency = registry.histogram(
+    "viewee_stage_duration_seconds", "Latency of external calls by stage.", ("stage",)
+)
+stage_in_flight = registry.gauge(
+    "viewee_stage_in_flight", "External calls currently running by stage.", ("stage",)
+)
+stage_errors = registry.counter(
+    "viewee_stage_errors_total", "Failed external calls by stage.", ("stage",)
+)
+bytes_streamed = registry.counter(
+    "viewee_bytes_streamed_total", "Bytes streamed to clients by stream type.", ("stream",)
+)
+http_latency = registry.histogram(
+    "viewee_http_request_duration_seconds", "HTTP request latency by handler.", ("method", "handler", "status")
+)
+http_in_flight = registry.gauge(
+    "viewee_http_requests_in_flight", "HTTP requests currently being served."
+)
+
+
+class track_stage:
+    """
+    Times one external call: `with track_stage("llm"): ...` (or `async with`). Records latency,
+    in-flight count and errors; cancellations are not counted as errors.
+    """
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started = 0.0
+
+    def __enter__(self):
+        stage_in_flight.inc(self.stage)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stage_latency.observe(time.perf_counter() - self.started, self.stage)
+        stage_in_flight.dec(self.stage)
+        if exc_type is not None and not issubclass(exc_type, (asyncio.CancelledError, GeneratorExit)):
+            stage_errors.inc(self.stage)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def observe_stage(stage: str, seconds: float):
+    """
+    Records a latency measured by hand, e.g. time-to-first-token inside a stream.
+    """
+    stage_latency.observe(seconds, stage)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and in-flight count for every HTTP request, labelled by
+    the matched endpoint name rather than the raw path so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            endpoint = scope.get("endpoint")
+            handler = getattr(endpoint, "__name__", "unmatched")
+            http_latency.observe(time.perf_counter() - started, scope["method"], handler, str(status["code"]))
+            http_in_flight.dec()
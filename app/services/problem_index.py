@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ProblemNameIndex:
+    """
+    In-memory search index over problem names.
+
+    Sorted keys and sorted (word, key) pairs answer prefix and word-prefix queries by bisection;
+    a trigram posting index answers fuzzy queries (typos, partial words). Nothing here touches
+    the database, so lookups stay well under a millisecond for thousands of names.
+    """
+
+    def __init__(self, min_similarity: float = 0.3):
+        self.min_similarity = min_similarity
+        self._names: Dict[str, str] = {}
+        self._sorted_keys: List[str] = []
+        self._sorted_words: List[Tuple[str, str]] = []
+        self._postings: Dict[str, Set[str]] = {}
+        self._key_trigrams: Dict[str, Set[str]] = {}
+        self.last_id: Any = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str):
+        key = _key(name)
+        if not key or key in self._names:
+            return
+        self._names[key] = name
+        insort(self._sorted_keys, key)
+        for word in set(key.split()):
+            insort(self._sorted_words, (word, key))
+        trigrams = _trigrams(key)
+        self._key_trigrams[key] = trigrams
+        for trigram in trigrams:
+            self._postings.setdefault(trigram, set()).add(key)
+
+    def _keys_with_prefix(self, prefix: str):
+        keys = self._sorted_keys
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield keys[i]
+            i += 1
+
+    def _words_with_prefix(self, prefix: str):
+        words = self._sorted_words
+        i = bisect_left(words, (prefix,))
+        while i < len(words) and words[i][0].startswith(prefix):
+            yield words[i]
+            i += 1
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Ranked matches: exact, then whole-name prefix, then word prefix, then trigram similarity.
+        """
+        q = _key(query)
+        if not q or limit <= 0:
+            return []
+        scores: Dict[str, float] = {}
+
+        if q in self._names:
+            scores[q] = 3.0
+        for key in self._keys_with_prefix(q):
+            # Shorter completions rank first
+            scores.setdefault(key, 2.0 + len(q) / len(key))
+        for word, key in self._words_with_prefix(q):
+            scores.setdefault(key, 1.0 + len(q) / len(word))
+
+        query_trigrams = _trigrams(q)
+        overlaps = Counter()
+        for trigram in query_trigrams:
+            for key in self._postings.get(trigram, ()):
+                overlaps[key] += 1
+        for key, overlap in overlaps.items():
+            if key in scores:
+                continue
+            similarity = 2 * overlap / (len(query_trigrams) + len(self._key_trigrams[key]))
+            if similarity >= self.min_similarity:
+                scores[key] = similarity
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{"problem_name": self._names[key], "score": round(score, 3)} for key, score in ranked]
+
+    async def load(self, collection, full: bool = False) -> int:
+        """
+        Loads problem names from the solutions collection. Incremental by default: only
+        documents with an `_id` above the last one seen are read.
+        """
+        query_filter: Dict[str, Any] = {}
+        if self.last_id is not None and not full:
+            query_filter["_id"] = {"$gt": self.last_id}
+        cursor = collection.find(query_filter, {"problem_name": 1}).sort("_id", 1)
+        documents = await cursor.to_list(length=None)
+        for document in documents:
+            if document.get("problem_name"):
+                self.add(document["problem_name"])
+            self.last_id = document["_id"]
+        return len(documents)
+
+
+async def keep_index_fresh(
+    index: ProblemNameIndex,
+    collection,
+    interval: float = 30,
+    full_rebuild_interval: float = 3600,
+    on_swap=None,
+):
+    """
+    Background loop: delta-loads new documents every `interval` seconds and periodically rebuilds
+    from scratch (picking up renames and deletions) into a fresh index handed to `on_swap`.
+    """
+    last_full = time.monotonic()
+    while True:
+        try:
+            if time.monotonic() - last_full >= full_rebuild_interval and on_swap is not None:
+                rebuilt = ProblemNameIndex(index.min_similarity)
+                await rebuilt.load(collection, full=True)
+                index = rebuilt
+                on_swap(rebuilt)
+                last_full = time.monotonic()
+            else:
+                await index.load(collection)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Problem index refresh failed: %s", e)
+        await asyncio.sleep(interval)
@@ -0,0 +1,353 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from .summary import count_tokens
+
+
+class InterviewSession:
+    """
+    State of one interview. Slotted to keep thousands of live sessions compact; item access
+    (`session["code"]`, `session.get("summary", "")`) is kept for the prompt helpers.
+    """
+
+    __slots__ = (
+        "session_id",
+        "question",
+        "code",
+        "code_version",
+        "transcript",
+        "feedback",
+        "feedback_seq",
+        "summary",
+        "summary_tokens",
+        "last_generation",
+        "created_at",
+        "last_access",
+        "_question_bytes",
+        "_version",
+        "_base",
+    )
+
+    # Fields persisted by shared stores; everything else is process-local bookkeeping
+    FIELDS = (
+        "session_id",
+        "question",
+        "code",
+        "code_version",
+        "transcript",
+        "feedback",
+        "feedback_seq",
+        "summary",
+        "summary_tokens",
+        "last_generation",
+        "created_at",
+    )
+    # Concurrent increments add up, and these text fields only ever grow by appending (see `rebase`)
+    COUNTERS = ("code_version", "feedback_seq", "summary_tokens")
+    APPEND_ONLY = ("transcript", "summary")
+
+    def __init__(
+        self,
+        session_id: str,
+        question: Optional[Dict[str, Any]] = None,
+        code: str = "",
+        code_version: int = 0,
+        transcript: str = "",
+        feedback: str = "",
+        feedback_seq: int = 0,
+        summary: str = "",
+        summary_tokens: int = 0,
+        last_generation: Optional[Dict[str, float]] = None,
+        created_at: Optional[float] = None,
+    ):
+        self.session_id = session_id
+        self.question = question or {}
+        self.code = code
+        self.code_version = code_version
+        self.transcript = transcript
+        self.feedback = feedback
+        self.feedback_seq = feedback_seq
+        self.summary = summary
+        self.summary_tokens = summary_tokens
+        self.last_generation = last_generation
+        self.created_at = created_at or time.time()
+        self.last_access = time.monotonic()
+        self._question_bytes = len(json.dumps(self.question))
+        # Store revision this copy was loaded at, and its fields as loaded; only versioned stores use them
+        self._version = 0
+        self._base: Optional[Dict[str, Any]] = None
+
+    def _check_key(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Any:
+        self._check_key(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        self._check_key(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory footprint, dominated by the growing text fields.
+        """
+        return (
+            self._question_bytes
+            + len(self.code)
+            + len(self.transcript)
+            + len(self.feedback)
+            + len(self.summary)
+            + 256
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InterviewSession":
+        session = cls(**{field: data[field] for field in cls.FIELDS if field in data})
+        session._version = data.get("version") or 0
+        session._base = session.to_dict()
+        return session
+
+    def rebase(self, current: "InterviewSession"):
+        """
+        Re-applies the changes made to this copy since it was loaded on top of `current`, a newer
+        copy of the same session: counters add their increments, appended text is appended again,
+        and any other field changed here overwrites the newer value.
+        """
+        base = self._base or {}
+        for field in self.FIELDS:
+            mine, was, theirs = getattr(self, field), base.get(field), getattr(current, field)
+            if mine == was:
+                value = theirs
+            elif field in self.COUNTERS:
+                value = theirs + mine - (was or 0)
+            elif field in self.APPEND_ONLY and was is not None and mine.startswith(was):
+                value = theirs + mine[len(was):]
+            else:
+                value = mine
+            setattr(self, field, value)
+        self._question_bytes = len(json.dumps(self.question))
+        self._version = current._version
+        self._base = current._base
+
+
+class SessionStore(ABC):
+    """
+    Where interview sessions live. Handlers mutate the session returned by `get` and then call
+    `save`, so shared backends see every update.
+    """
+
+    async def create(self, question: Dict[str, Any]) -> InterviewSession:
+        session = InterviewSession(str(uuid4()), question=question)
+        await self.save(session)
+        return session
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        ...
+
+    @abstractmethod
+    async def save(self, session: InterviewSession):
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    async def update_fields(self, session_id: str, fields: Dict[str, Any], expect: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Sets only `fields`, and only if the stored session still has the values in `expect`.
+        Returns False if it did not (or the session is gone).
+        """
+
+    @abstractmethod
+    async def replace_summary_prefix(self, session_id: str, snapshot: str, replacement: str) -> bool:
+        """
+        Swaps the leading `snapshot` of the session's summary for `replacement`, keeping whatever
+        was appended since, and writes only `summary` and `summary_tokens`. Returns False if the
+        summary no longer starts with `snapshot` (or the session is gone).
+        """
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local store. Sessions idle longer than `idle_ttl` seconds are evicted, and the least
+    recently used sessions go first once the total footprint exceeds `max_bytes`.
+    """
+
+    def __init__(self, idle_ttl: float = 2 * 60 * 60, max_bytes: int = 256 * 1024 * 1024):
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, InterviewSession]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+
+    @classmethod
+    def from_env(cls) -> "InMemorySessionStore":
+        return cls(
+            idle_ttl=float(os.environ.get("SESSION_IDLE_TTL_SECONDS", 2 * 60 * 60)),
+            max_bytes=int(os.environ.get("SESSION_STORE_MAX_BYTES", 256 * 1024 * 1024)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _remove(self, session_id: str):
+        self._sessions.pop(session_id, None)
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+
+    def _evict_idle(self):
+        # Sessions are kept in access order, so expired ones are always at the front
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_access > cutoff:
+                break
+            self._remove(session_id)
+
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        self._evict_idle()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_access = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    async def save(self, session: InterviewSession):
+        session_id = session.session_id
+        size = session.nbytes()
+        self._total_bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+        session.last_access = time.monotonic()
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+
+        self._evict_idle()
+        while self._total_bytes > self.max_bytes and len(self._sessions) > 1:
+            oldest_id = next(iter(self._sessions))
+            self._remove(oldest_id)
+
+    async def delete(self, session_id: str):
+        self._remove(session_id)
+
+    async def update_fields(self, session_id: str, fields: Dict[str, Any], expect: Optional[Dict[str, Any]] = None) -> bool:
+        session = self._sessions.get(session_id)
+        if session is None or any(session[field] != value for field, value in (expect or {}).items()):
+            return False
+        for field, value in fields.items():
+            session[field] = value
+        await self.save(session)
+        return True
+
+    async def replace_summary_prefix(self, session_id: str, snapshot: str, replacement: str) -> bool:
+        session = self._sessions.get(session_id)
+        if session is None or not session["summary"].startswith(snapshot):
+            return False
+        session["summary"] = f"{replacement}{session['summary'][len(snapshot):]}".strip()
+        session["summary_tokens"] = count_tokens(session["summary"])
+        await self.save(session)
+        return True
+
+
+class SessionConflict(Exception):
+    """
+    Raised when a save keeps losing to concurrent writers.
+    """
+
+
+class MongoSessionStore(SessionStore):
+    """
+    Shared store on the app's Motor connection, so every worker and node sees the same
+    interviews. A TTL index on `last_access` lets Mongo expire idle sessions.
+
+    Each document carries a `version`. `save` only replaces the revision its copy was loaded at;
+    if another request or worker saved in between, the copy is rebased onto the newer document
+    (InterviewSession.rebase) and the save is retried, so concurrent updates are not lost.
+    """
+
+    def __init__(self, collection, idle_ttl: float = 2 * 60 * 60, max_conflict_retries: int = 5):
+        self.collection = collection
+        self.idle_ttl = idle_ttl
+        self.max_conflict_retries = max_conflict_retries
+
+    @classmethod
+    def from_env(cls, collection) -> "MongoSessionStore":
+        return cls(collection, idle_ttl=float(os.environ.get("SESSION_IDLE_TTL_SECONDS", 2 * 60 * 60)))
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("last_access", expireAfterSeconds=int(self.idle_ttl))
+
+    async def get(self, session_id: str) -> Optional[InterviewSession]:
+        document = await self.collection.find_one({"_id": session_id})
+        if document is None:
+            return None
+        return InterviewSession.from_dict(document)
+
+    async def save(self, session: InterviewSession):
+        for _ in range(self.max_conflict_retries + 1):
+            document = session.to_dict()
+            document["version"] = session._version + 1
+            document["last_access"] = datetime.now(timezone.utc)
+            # Documents written before versioning have no `version`, which {"version": None} matches
+            query = {"_id": session.session_id, "version": session._version or None}
+            try:
+                await self.collection.replace_one(query, document, upsert=True)
+            except Exception as e:
+                # The upsert collides with the existing _id: someone else saved a newer version
+                if getattr(e, "code", None) != 11000:
+                    raise
+            else:
+                session._version += 1
+                session._base = session.to_dict()
+                return
+            current = await self.get(session.session_id)
+            if current is None:
+                # Deleted meanwhile; the next attempt recreates it
+                session._version = 0
+            else:
+                session.rebase(current)
+        raise SessionConflict(f"Could not save session {session.session_id} after {self.max_conflict_retries + 1} attempts")
+
+    async def delete(self, session_id: str):
+        await self.collection.delete_one({"_id": session_id})
+
+    async def update_fields(self, session_id: str, fields: Dict[str, Any], expect: Optional[Dict[str, Any]] = None) -> bool:
+        result = await self.collection.update_one(
+            {"_id": session_id, **(expect or {})},
+            {"$set": {**fields, "last_access": datetime.now(timezone.utc)}, "$inc": {"version": 1}},
+        )
+        return result.matched_count > 0
+
+    async def replace_summary_prefix(self, session_id: str, snapshot: str, replacement: str) -> bool:
+        for _ in range(self.max_conflict_retries + 1):
+            document = await self.collection.find_one({"_id": session_id}, {"summary": 1})
+            current = (document or {}).get("summary", "")
+            if document is None or not current.startswith(snapshot):
+                return False
+            summary = f"{replacement}{current[len(snapshot):]}".strip()
+            # Conditional on the summary read above, so text appended meanwhile is never lost
+            if await self.update_fields(
+                session_id, {"summary": summary, "summary_tokens": count_tokens(summary)}, expect={"summary": current}
+            ):
+                return True
+        return False
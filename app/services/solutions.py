@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .metrics import track_stage
+
+# Case-insensitive (strength 2) collation; queries must use the same collation as the index to hit it
+PROBLEM_NAME_COLLATION = {"locale": "en", "strength": 2}
+
+# Only the fields the API returns
+SOLUTION_PROJECTION = {
+    "problem_name": 1,
+    "solutions.approach": 1,
+    "solutions.code": 1,
+    "solutions.time_complexity": 1,
+    "solutions.space_complexity": 1,
+}
+
+def normalize_problem_name(problem_name: str) -> str:
+    """
+    Canonical lookup form: surrounding and repeated whitespace collapsed.
+    """
+    return " ".join(problem_name.split())
+
+
+def cache_key(problem_name: str) -> str:
+    return normalize_problem_name(problem_name).casefold()
+
+
+async def ensure_solution_indexes(collection):
+    """
+    Creates the collated problem_name index. Called once from the startup warm-up; it is a
+    no-op if the index already exists, but can block for a full build on a large collection.
+    """
+    await collection.create_index(
+        "problem_name", name="problem_name_ci", collation=PROBLEM_NAME_COLLATION
+    )
+
+
+async def find_solutions(collection, problem_name: str) -> List[Dict[str, Any]]:
+    with track_stage("mongo_solutions"):
+        cursor = collection.find(
+            {"problem_name": normalize_problem_name(problem_name)},
+            SOLUTION_PROJECTION,
+            collation=PROBLEM_NAME_COLLATION,
+        )
+        return await cursor.to_list(length=None)
+
+
+def format_solution(solution: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "_id": str(solution["_id"]),
+        "problem_name": solution.get("problem_name"),
+        "solutions": [
+            {
+                "approach": sol.get("approach", ""),
+                "code": sol.get("code", ""),
+                "time_complexity": sol.get("time_complexity", ""),
+                "space_complexity": sol.get("space_complexity", "")
+            } for sol in solution.get("solutions", [])
+        ]
+    }
+
+
+class TTLCache:
+    """
+    Small LRU with per-entry expiry for read-mostly responses.
+    """
+
+    def __init__(self, ttl: float = 300, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+            del self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Drops one entry, or everything when no key is given.
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import re
+from functools import lru_cache
+from typing import Awaitable, Callable, Set
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and individual punctuation marks; close enough to BPE token counts for budgeting
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """
+    Approximate token count. Cached because the same segments are counted on every update.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def tail_tokens(text: str, budget: int) -> str:
+    """
+    Returns the shortest suffix of `text` holding at most `budget` tokens.
+    """
+    if budget <= 0:
+        return ""
+    matches = list(_TOKEN_PATTERN.finditer(text))
+    if len(matches) <= budget:
+        return text
+    return text[matches[-budget].start():]
+
+
+def split_at_tokens(text: str, keep: int):
+    """
+    Splits `text` into (older, recent) where `recent` holds the last `keep` tokens.
+    """
+    recent = tail_tokens(text, keep)
+    return text[: len(text) - len(recent)], recent
+
+
+class SummaryCompactor:
+    """
+    Keeps a session's rolling summary within `budget` tokens.
+
+    When the summary grows past the budget, a background task condenses everything but the most
+    recent half of the budget through `condense(text, target_tokens)`, then hands the result to
+    `on_compacted(session_id, snapshot, replacement)`, which should swap the summary's leading
+    `snapshot` for `replacement` in the store (SessionStore.replace_summary_prefix). The session
+    object itself is never saved: it may be a stale copy by the time the condense call returns,
+    and updates appended meanwhile are kept by the store.
+    """
+
+    def __init__(
+        self,
+        condense: Callable[[str, int], Awaitable[str]],
+        on_compacted: Callable[[str, str, str], Awaitable[bool]],
+        budget: int = 600,
+    ):
+        self.condense = condense
+        self.on_compacted = on_compacted
+        self.budget = budget
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def schedule(self, session):
+        """
+        Starts compaction off the request path unless one is already running for this session.
+        """
+        session_id = session.get("session_id") or str(id(session))
+        if session_id in self._running:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._running.add(session_id)
+        task = loop.create_task(self._run(session_id, session))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, session_id: str, session):
+        try:
+            await self.compact(session)
+        except Exception as e:
+            logger.error("Summary compaction failed for session %s: %s", session_id, e)
+        finally:
+            self._running.discard(session_id)
+
+    async def compact(self, session):
+        snapshot = session.get("summary", "")
+        older, recent = split_at_tokens(snapshot, self.budget // 2)
+        if not older.strip():
+            return
+
+        target = max(self.budget // 4, 1)
+        try:
+            condensed = (await self.condense(older, target)).strip()
+        except Exception as e:
+            logger.warning("Condensing summary failed, truncating instead: %s", e)
+            condensed = ""
+        # A condensed form that is no smaller than the budget slice is useless; fall back to truncation
+        if not condensed or count_tokens(condensed) > target:
+            condensed = tail_tokens(older, target).strip()
+
+        replacement = f"{condensed} {recent.strip()}".strip()
+        if not await self.on_compacted(session.get("session_id"), snapshot, replacement):
+            logger.info("Summary for session %s changed under compaction, skipped", session.get("session_id"))
+
@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+AudioProducer = Callable[[], AsyncIterator[bytes]]
+
+
+def audio_cache_key(text: str, model: str, encoding: str) -> str:
+    """
+    Content address of a synthesized clip: same text, voice and encoding -> same audio.
+    """
+    material = json.dumps([text, model, encoding], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class _InflightSynthesis:
+    """
+    Audio being produced by one upstream request; any number of readers can follow it live.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def append(self, chunk: bytes):
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def follow(self) -> AsyncIterator[bytes]:
+        index = 0
+        while True:
+            changed = self._changed
+            if index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            elif self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            else:
+                await changed.wait()
+
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized TTS audio.
+
+    Clips live in an in-memory LRU bounded by `max_bytes`. When `spill_dir` is set, clips evicted
+    from memory (or too large for it) are written there and later served through mmap, bounded
+    by `disk_max_bytes`; a clip stays readable from memory until its spill has finished. Concurrent requests for a key that is still being synthesized share the
+    single upstream request and receive its chunks as they arrive.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        spill_dir: Optional[str] = None,
+        disk_max_bytes: int = 1024 * 1024 * 1024,
+        chunk_size: int = 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.chunk_size = chunk_size
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        # Clips evicted from memory whose spill to disk has not finished yet
+        self._spilling: Dict[str, bytes] = {}
+        self._inflight: Dict[str, _InflightSynthesis] = {}
+        self._tasks: set = set()
+        self.hits = 0
+        self.misses = 0
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @classmethod
+    def from_env(cls) -> "AudioCache":
+        return cls(
+            max_bytes=int(os.environ.get("TTS_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+            spill_dir=os.environ.get("TTS_CACHE_DIR") or None,
+            disk_max_bytes=int(os.environ.get("TTS_CACHE_DISK_MAX_BYTES", 1024 * 1024 * 1024)),
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.audio")
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.spill_dir):
+            if name.endswith(".audio"):
+                stat = os.stat(os.path.join(self.spill_dir, name))
+                entries.append((stat.st_mtime, name[: -len(".audio")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        # The budget may have shrunk since the files were written
+        self._evict_disk()
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.disk_max_bytes:
+            old_key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._memory or key in self._spilling or key in self._disk
+
+    async def _store(self, key: str, audio: bytes):
+        if not audio:
+            return
+        if len(audio) > self.max_bytes:
+            await self._spill([(key, audio)])
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        evicted = []
+        while self._memory_bytes > self.max_bytes:
+            old_key, old_audio = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_audio)
+            evicted.append((old_key, old_audio))
+        await self._spill(evicted)
+
+    async def _spill(self, clips: List[Tuple[str, bytes]]):
+        clips = [
+            (key, audio) for key, audio in clips
+            if self.spill_dir and key not in self._disk and len(audio) <= self.disk_max_bytes
+        ]
+        # Registered before the first write so a request arriving meanwhile is still a hit
+        for key, audio in clips:
+            self._spilling[key] = audio
+        try:
+            for key, audio in clips:
+                # File writes go to a worker thread; the index is only touched on the event loop
+                await asyncio.to_thread(_write_atomic, self._path(key), audio)
+                self._disk[key] = len(audio)
+                self._disk_bytes += len(audio)
+                self._spilling.pop(key, None)
+                self._evict_disk()
+        finally:
+            for key, _ in clips:
+                self._spilling.pop(key, None)
+
+    def _stream_memory(self, audio: bytes) -> AsyncIterator[bytes]:
+        async def gen():
+            view = memoryview(audio)
+            for start in range(0, len(view), self.chunk_size):
+                yield bytes(view[start:start + self.chunk_size])
+        return gen()
+
+    def _stream_disk(self, key: str, producer: AudioProducer) -> AsyncIterator[bytes]:
+        self._disk.move_to_end(key)
+
+        async def gen():
+            # Opened on first read, so a stream that is never iterated holds no file handle
+            try:
+                f = open(self._path(key), "rb")
+            except FileNotFoundError:
+                # Removed behind the index's back: forget it and synthesize again
+                if key in self._disk:
+                    self._disk_bytes -= self._disk.pop(key)
+                async for chunk in self.stream(key, producer):
+                    yield chunk
+                return
+            # Pages are faulted in lazily as slices are read, so large clips never sit in the heap
+            with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for start in range(0, len(mapped), self.chunk_size):
+                    yield mapped[start:start + self.chunk_size]
+        return gen()
+
+    async def _produce(self, key: str, inflight: _InflightSynthesis, producer: AudioProducer):
+        try:
+            async for chunk in producer():
+                if chunk:
+                    inflight.append(chunk)
+        except BaseException as e:
+            inflight.finish(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        else:
+            inflight.finish()
+            # Keep the finished in-flight entry visible until the clip is stored
+            await self._store(key, b"".join(inflight.chunks))
+        finally:
+            self._inflight.pop(key, None)
+
+    def stream(self, key: str, producer: AudioProducer) -> AsyncIterator[bytes]:
+        """
+        Streams the clip for `key`, calling `producer` only if it is neither cached nor already
+        being synthesized. Synthesis keeps running if the requesting client goes away, so the
+        result still lands in the cache.
+        """
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._stream_memory(audio)
+
+        audio = self._spilling.get(key)
+        if audio is not None:
+            self.hits += 1
+            return self._stream_memory(audio)
+
+        if key in self._disk:
+            self.hits += 1
+            return self._stream_disk(key, producer)
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            self.misses += 1
+            inflight = _InflightSynthesis()
+            self._inflight[key] = inflight
+            task = asyncio.ensure_future(self._produce(key, inflight, producer))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self.hits += 1
+        return inflight.follow()
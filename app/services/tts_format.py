@@ -0,0 +1,141 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_MODEL = "aura-asteria-en"
+DEFAULT_ENCODING = "mp3"
+
+# Deepgram Aura voices; TTS_MODELS in the environment narrows or replaces this list
+DEFAULT_MODELS = (
+    "aura-asteria-en", "aura-luna-en", "aura-stella-en", "aura-athena-en",
+    "aura-hera-en", "aura-orion-en", "aura-arcas-en", "aura-perseus-en",
+    "aura-angus-en", "aura-orpheus-en", "aura-helios-en", "aura-zeus-en",
+)
+
+"""
+Client-facing encodings and what Deepgram accepts for each.
+
+- deepgram: the `encoding` (and `container`) sent upstream
+- content_types: response Content-Types accepted as audio in this encoding
+- sample_rates / bit_rates: allowed values; None means the upstream picks and the client may not override it
+- segmentable: clips can be sent back to back as one stream. True for headerless formats (raw PCM, mu-law)
+  and MP3 frames; False for containers with a header (WAV, Ogg), which are synthesized as a single clip
+"""
+ENCODINGS: Dict[str, Dict] = {
+    "mp3": {
+        "deepgram": {"encoding": "mp3"},
+        "content_types": ("audio/mpeg", "audio/mp3"),
+        "sample_rates": None,
+        "bit_rates": (32000, 48000),
+        "segmentable": True,
+    },
+    "opus": {
+        "deepgram": {"encoding": "opus", "container": "ogg"},
+        "content_types": ("audio/ogg", "audio/opus"),
+        "sample_rates": None,
+        "bit_rates": (12000, 16000, 24000, 32000, 48000, 64000),
+        "segmentable": False,
+    },
+    "linear16": {
+        "deepgram": {"encoding": "linear16", "container": "none"},
+        "content_types": ("audio/l16", "audio/pcm", "application/octet-stream"),
+        "sample_rates": (8000, 16000, 24000, 32000, 48000),
+        "bit_rates": None,
+        "segmentable": True,
+    },
+    "wav": {
+        "deepgram": {"encoding": "linear16", "container": "wav"},
+        "content_types": ("audio/wav", "audio/wave", "audio/x-wav"),
+        "sample_rates": (8000, 16000, 24000, 32000, 48000),
+        "bit_rates": None,
+        "segmentable": False,
+    },
+    "mulaw": {
+        "deepgram": {"encoding": "mulaw", "container": "none"},
+        "content_types": ("audio/basic", "audio/mulaw", "application/octet-stream"),
+        "sample_rates": (8000, 16000),
+        "bit_rates": None,
+        "segmentable": True,
+    },
+}
+
+
+class UnsupportedFormat(ValueError):
+    """
+    Raised for an encoding, sample rate, bit rate or voice outside the allow-list.
+    """
+
+
+class TTSFormat:
+    """
+    A validated voice + encoding choice for one TTS stream.
+    """
+
+    __slots__ = ("model", "encoding", "sample_rate", "bit_rate")
+
+    def __init__(self, model: str, encoding: str, sample_rate: Optional[int] = None, bit_rate: Optional[int] = None):
+        self.model = model
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.bit_rate = bit_rate
+
+    @classmethod
+    def negotiate(
+        cls,
+        model: Optional[str] = None,
+        encoding: Optional[str] = None,
+        sample_rate: Optional[int] = None,
+        bit_rate: Optional[int] = None,
+        models: Iterable[str] = DEFAULT_MODELS,
+    ) -> "TTSFormat":
+        """
+        Validates what the client asked for; anything left out gets Deepgram's default.
+        """
+        model = model or DEFAULT_MODEL
+        encoding = (encoding or DEFAULT_ENCODING).lower()
+        if model not in models:
+            raise UnsupportedFormat(f"Unsupported voice model {model!r}")
+        spec = ENCODINGS.get(encoding)
+        if spec is None:
+            raise UnsupportedFormat(f"Unsupported encoding {encoding!r}; use one of {', '.join(ENCODINGS)}")
+        for name, value, allowed in (
+            ("sample_rate", sample_rate, spec["sample_rates"]),
+            ("bitrate", bit_rate, spec["bit_rates"]),
+        ):
+            if value is not None and (allowed is None or value not in allowed):
+                options = ", ".join(map(str, allowed)) if allowed else "not configurable"
+                raise UnsupportedFormat(f"Unsupported {name} {value} for {encoding} ({options})")
+        return cls(model, encoding, sample_rate, bit_rate)
+
+    @property
+    def content_types(self) -> Tuple[str, ...]:
+        return ENCODINGS[self.encoding]["content_types"]
+
+    @property
+    def segmentable(self) -> bool:
+        return ENCODINGS[self.encoding]["segmentable"]
+
+    @property
+    def media_type(self) -> str:
+        return self.content_types[0]
+
+    def accepts(self, content_type: Optional[str]) -> bool:
+        # Ignore parameters such as "audio/ogg; codecs=opus"
+        return bool(content_type) and content_type.split(";")[0].strip().lower() in self.content_types
+
+    def query(self) -> Dict[str, str]:
+        """
+        Query parameters for Deepgram's /v1/speak.
+        """
+        params = {"model": self.model, **ENCODINGS[self.encoding]["deepgram"]}
+        if self.sample_rate is not None:
+            params["sample_rate"] = str(self.sample_rate)
+        if self.bit_rate is not None:
+            params["bit_rate"] = str(self.bit_rate)
+        return params
+
+    @property
+    def cache_tag(self) -> str:
+        """
+        Everything besides voice and text that changes the audio bytes, for audio_cache_key.
+        Plain "mp3" for the default format so clips cached before negotiation still hit.
+        """
+        return ":".join(str(part) for part in (self.encoding, self.sample_rate, self.bit_rate) if part is not None)
@@ -0,0 +1,130 @@
+import asyncio
+import re
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Iterable, List
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+_END = object()
+
+
+def split_sentences(text: str, min_chars: int = 16) -> List[str]:
+    """
+    Splits feedback into sentences for separate synthesis. Fragments shorter than `min_chars`
+    ("Okay.") are joined to the following sentence, since very short clips synthesize poorly.
+    """
+    sentences: List[str] = []
+    carry = ""
+    for part in _SENTENCE_END.split(text.strip()):
+        part = f"{carry} {part}".strip() if carry else part.strip()
+        if not part:
+            continue
+        if len(part) < min_chars:
+            carry = part
+            continue
+        sentences.append(part)
+        carry = ""
+    if carry:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {carry}"
+        else:
+            sentences.append(carry)
+    return sentences
+
+
+async def _aclose(stream):
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def stream_in_order(
+    items: Iterable[str],
+    open_stream: Callable[[str], AsyncIterator[bytes]],
+    max_parallel: int = 3,
+) -> AsyncIterator[bytes]:
+    """
+    Opens a stream per item, at most `max_parallel` at a time, and yields their chunks strictly
+    in item order. Streams that start work eagerly (like AudioCache.stream) synthesize ahead
+    while an earlier item is still being forwarded; the next item is opened as each one finishes.
+    """
+    remaining = iter(items)
+    window: Deque[AsyncIterator[bytes]] = deque()
+
+    def fill():
+        while len(window) < max(max_parallel, 1):
+            item = next(remaining, None)
+            if item is None:
+                return
+            window.append(open_stream(item))
+
+    try:
+        fill()
+        while window:
+            async for chunk in window[0]:
+                yield chunk
+            window.popleft()
+            fill()
+    finally:
+        for stream in window:
+            await _aclose(stream)
+
+
+async def coalesce_frames(
+    chunks: AsyncIterator[bytes],
+    frame_bytes: int = 16384,
+    max_delay: float = 0.04,
+    max_queued_chunks: int = 64,
+) -> AsyncIterator[bytes]:
+    """
+    Regroups small upstream chunks into frames of about `frame_bytes`. A frame is sent early once
+    `max_delay` seconds have passed since its first byte, so audio never waits long for a full frame.
+
+    Chunks are read ahead into a bounded queue; while the consumer is blocked sending a frame (a
+    slow WebSocket), the queue fills up and reading from upstream pauses.
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue" = asyncio.Queue(maxsize=max_queued_chunks)
+
+    async def pump():
+        try:
+            async for chunk in chunks:
+                if chunk:
+                    await queue.put(chunk)
+            await queue.put(_END)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await _aclose(chunks)
+
+    reader = asyncio.ensure_future(pump())
+    try:
+        finished = False
+        while not finished:
+            item = await queue.get()
+            frame = bytearray()
+            deadline = loop.time() + max_delay
+            while True:
+                if item is _END:
+                    finished = True
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                frame += item
+                timeout = deadline - loop.time()
+                if len(frame) >= frame_bytes or timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if frame:
+                yield bytes(frame)
+    finally:
+        reader.cancel()
+        try:
+            await reader
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,92 @@
+"""
+Local stand-ins for the upstream services, so benchmarks run offline and repeatably.
+
+- fake_openai_app: OpenAI-compatible /v1/chat/completions with configurable latency, plain and streaming
+- fake_deepgram_app: Deepgram-style /v1/speak that streams synthetic audio/mpeg
+- FakeMongoClient: in-process stand-in for the subset of Motor the app uses (tests/fake_mongo.py)
+"""
+import asyncio
+import json
+
+from aiohttp import web
+
+from tests.fake_mongo import FakeCollection, FakeCursor, FakeDatabase, FakeMongoClient  # noqa: F401
+
+FEEDBACK_WORDS = (
+    "Good start. Think about what happens when the input is empty, and walk me through "
+    "the time complexity of your current loop before optimizing it further."
+).split()
+
+
+def fake_openai_app(latency: float = 0.2, token_delay: float = 0.01, tokens: int = 30) -> web.Application:
+    """
+    `latency` is the time to the first token; every further token takes `token_delay`.
+    Each completion ends with a distinct word so downstream caches (TTS audio) see fresh text.
+    """
+    served = 0
+
+    async def completions(request: web.Request):
+        nonlocal served
+        served += 1
+        words = [FEEDBACK_WORDS[i % len(FEEDBACK_WORDS)] for i in range(tokens - 1)] + [f"#{served}"]
+        body = await request.json()
+        await asyncio.sleep(latency)
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * (len(words) - 1))
+            content = " ".join(words)
+            return web.json_response({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(token_delay)
+            chunk = {"choices": [{"delta": {"content": word if i == 0 else f" {word}"}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    return app
+
+
+FAKE_CONTENT_TYPES = {"opus": "audio/ogg", "mulaw": "audio/basic"}
+
+
+def fake_deepgram_app(
+    first_byte_delay: float = 0.1,
+    chunk_delay: float = 0.005,
+    bytes_per_char: int = 200,
+    chunk_size: int = 4096,
+) -> web.Application:
+    """
+    Streams `bytes_per_char` bytes of silence per character of input text, roughly a 32 kbps MP3.
+    """
+
+    async def speak(request: web.Request):
+        body = await request.json()
+        total = max(len(body.get("text", "")), 1) * bytes_per_char
+        encoding = request.query.get("encoding", "mp3")
+        if encoding == "linear16":
+            content_type = "audio/wav" if request.query.get("container", "wav") == "wav" else "audio/l16"
+        else:
+            content_type = FAKE_CONTENT_TYPES.get(encoding, "audio/mpeg")
+
+        response = web.StreamResponse(headers={"Content-Type": content_type})
+        await asyncio.sleep(first_byte_delay)
+        await response.prepare(request)
+        sent = 0
+        while sent < total:
+            size = min(chunk_size, total - sent)
+            await response.write(b"\x00" * size)
+            sent += size
+            if sent < total:
+                await asyncio.sleep(chunk_delay)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post("/v1/speak", speak)
+    return app
@@ -0,0 +1,265 @@
+"""
+Offline load test: runs the app against local fake upstreams and drives simulated interviews.
+
+    python -m benchmarks.run --interviews 200 --concurrency 50 --updates 8 --output bench_output.txt
+
+Each interview initializes a question, sends incremental updates (every --stream-every'th one over
+SSE), streams the feedback audio over /ws/tts and looks up solutions. The app, the fakes and the
+driver share one process and event loop (the Mongo stand-in must live in-process), so absolute
+numbers include driver overhead; compare runs on the same machine.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from .fakes import FakeMongoClient, fake_deepgram_app, fake_openai_app
+
+PROBLEMS = [
+    "Two Sum", "Valid Parentheses", "Merge Intervals", "Longest Substring Without Repeating Characters",
+    "Binary Tree Level Order Traversal", "Course Schedule", "LRU Cache", "Word Ladder",
+    "Median of Two Sorted Arrays", "Trapping Rain Water", "Number of Islands", "Coin Change",
+]
+
+CODE_LINES = [
+    "def two_sum(nums, target):",
+    "    seen = {}",
+    "    for i, n in enumerate(nums):",
+    "        if target - n in seen:",
+    "            return [seen[target - n], i]",
+    "        seen[n] = i",
+    "    return []",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, started: float, ok: bool = True):
+        self.latencies[name].append(time.perf_counter() - started)
+        if not ok:
+            self.errors[name] += 1
+
+    def summary(self, elapsed: float) -> List[Dict[str, float]]:
+        rows = []
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            rows.append({
+                "endpoint": name,
+                "count": len(values),
+                "errors": self.errors[name],
+                "rps": round(len(values) / elapsed, 1),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+            })
+        return rows
+
+
+def format_table(rows: List[Dict[str, float]]) -> str:
+    columns = ["endpoint", "count", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns}
+    lines = ["  ".join(column.ljust(widths[column]) for column in columns)]
+    for row in rows:
+        lines.append("  ".join(str(row[column]).ljust(widths[column]) for column in columns))
+    return "\n".join(lines)
+
+
+async def start_site(app: web.Application) -> Tuple[web.AppRunner, str]:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def wait_until_ready(base: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        while True:
+            try:
+                async with http.get(f"{base}/ready") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{base} did not become ready within {timeout}s")
+            await asyncio.sleep(0.01)
+
+
+async def post_json(http: aiohttp.ClientSession, recorder: Recorder, name: str, url: str, payload) -> Optional[dict]:
+    started = time.perf_counter()
+    try:
+        async with http.post(url, json=payload) as response:
+            body = await response.json()
+            recorder.record(name, started, ok=response.status == 200)
+            return body if response.status == 200 else None
+    except aiohttp.ClientError:
+        recorder.record(name, started, ok=False)
+        return None
+
+
+async def run_interview(http: aiohttp.ClientSession, base: str, recorder: Recorder, args, rng: random.Random):
+    problem = rng.choice(PROBLEMS)
+    body = await post_json(http, recorder, "POST /api/initialize-question", f"{base}/api/initialize-question", {
+        "title": problem,
+        "description": f"Solve {problem}.",
+        "input": "nums = [2, 7, 11, 15], target = 9",
+        "output": "[0, 1]",
+        "explanation": None,
+    })
+    if body is None:
+        return
+    session_id = body["session_id"]
+
+    for i in range(args.updates):
+        await asyncio.sleep(rng.uniform(0, args.think_ms / 1000))
+        payload = {
+            "session_id": session_id,
+            "code": "\n".join(CODE_LINES[:i % len(CODE_LINES) + 1]) + f"\n# step {i}",
+            "transcript": f"Step {i}: I'm keeping a map from value to index.",
+            "status": "Thinking",
+        }
+        if args.stream_every and (i + 1) % args.stream_every == 0:
+            name = "POST /api/incremental-feedback/stream"
+            started = time.perf_counter()
+            try:
+                async with http.post(f"{base}/api/incremental-feedback/stream", json=payload) as response:
+                    text = await response.text()
+                    recorder.record(name, started, ok=response.status == 200 and "event: done" in text)
+            except aiohttp.ClientError:
+                recorder.record(name, started, ok=False)
+        else:
+            # Code differs every step (and by comment only from the previous lap), exercising the feedback cache
+            await post_json(http, recorder, "POST /api/incremental-feedback", f"{base}/api/incremental-feedback", payload)
+
+    started = time.perf_counter()
+    received = 0
+    try:
+        async with http.ws_connect(f"{base}/ws/tts", params={"session_id": session_id, "encoding": args.tts_encoding}) as ws:
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.BINARY:
+                    received += len(message.data)
+        recorder.record("WS /ws/tts", started, ok=received > 0)
+    except aiohttp.ClientError:
+        recorder.record("WS /ws/tts", started, ok=False)
+
+    await post_json(http, recorder, "POST /api/get-solutions", f"{base}/api/get-solutions", {"problem_name": problem.lower()})
+    started = time.perf_counter()
+    async with http.get(f"{base}/api/search-solutions", params={"q": problem[:5].lower()}) as response:
+        await response.read()
+        recorder.record("GET /api/search-solutions", started, ok=response.status == 200)
+
+
+async def main(args) -> int:
+    openai_runner, openai_url = await start_site(fake_openai_app(args.llm_latency_ms / 1000, args.llm_token_ms / 1000))
+    deepgram_runner, deepgram_url = await start_site(fake_deepgram_app(args.tts_latency_ms / 1000))
+
+    os.environ.update({
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "OPENAI_API_KEY": "bench",
+        "DEEPGRAM_BASE_URL": deepgram_url,
+        "DEEPGRAM_API_KEY": "bench",
+        "MONGO_URI": "mongodb://bench",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    })
+    if args.debounce_ms is not None:
+        os.environ["FEEDBACK_DEBOUNCE_MS"] = str(args.debounce_ms)
+
+    mongo = FakeMongoClient(latency=args.mongo_latency_ms / 1000)
+    mongo["User"]["solutions"].seed(
+        {"problem_name": name, "solutions": [{"approach": "Hash map", "code": "...", "time_complexity": "O(n)", "space_complexity": "O(n)"}]}
+        for name in PROBLEMS
+    )
+
+    # Imported only now so the app reads the environment above
+    import uvicorn
+    from app import main as app_main
+    app_main.create_mongo_client = lambda *a, **k: mongo
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app_main.app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    server_task = asyncio.create_task(server.serve())
+    base = f"http://127.0.0.1:{port}"
+    await wait_until_ready(base)
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def one(http):
+        async with limit:
+            await run_interview(http, base, recorder, args, random.Random(rng.random()))
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=connector) as http:
+        await asyncio.gather(*(one(http) for _ in range(args.interviews)))
+    elapsed = time.perf_counter() - started
+
+    rows = recorder.summary(elapsed)
+    report = (
+        f"{args.interviews} interviews, concurrency {args.concurrency}, {args.updates} updates each, "
+        f"{elapsed:.1f}s wall\n" + format_table(rows)
+    )
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"elapsed_s": elapsed, "args": vars(args), "endpoints": rows}, f, indent=2)
+
+    server.should_exit = True
+    await server_task
+    await openai_runner.cleanup()
+    await deepgram_runner.cleanup()
+    return 1 if any(row["errors"] for row in rows) else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interviews", type=int, default=50, help="simulated interviews to run")
+    parser.add_argument("--concurrency", type=int, default=20, help="interviews running at once")
+    parser.add_argument("--updates", type=int, default=6, help="incremental feedback updates per interview")
+    parser.add_argument("--stream-every", type=int, default=3, help="send every Nth update over SSE (0 = never)")
+    parser.add_argument("--think-ms", type=float, default=200, help="max random pause between updates")
+    parser.add_argument("--debounce-ms", type=int, default=None, help="override FEEDBACK_DEBOUNCE_MS")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="fake LLM time to first token")
+    parser.add_argument("--llm-token-ms", type=float, default=10, help="fake LLM delay per further token")
+    parser.add_argument("--tts-latency-ms", type=float, default=150, help="fake Deepgram time to first byte")
+    parser.add_argument("--tts-encoding", default="mp3", help="encoding requested on /ws/tts (mp3, opus, linear16, wav, mulaw)")
+    parser.add_argument("--mongo-latency-ms", type=float, default=1, help="fake Mongo round trip")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the report here (e.g. bench_output.txt)")
+    parser.add_argument("--json", help="write machine-readable results here")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,121 @@
+"""
+Cold-start benchmark: how long a fresh process takes to import the app, finish startup and pass /ready.
+
+    python -m benchmarks.startup --runs 5 --output bench_output.txt
+
+Every run is a new interpreter against the same local fake upstreams as benchmarks.run, so the
+numbers cover import and boot only, not network or database latency. Reported per phase:
+    import_ms    `import app.main`
+    startup_ms   import done -> server accepting connections (lifespan startup complete)
+    ready_ms     import done -> first 200 from /ready (Mongo answered, upstream pools connected)
+    process_ms   process spawn -> ready, including interpreter start, as seen by the parent
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ["import_ms", "startup_ms", "ready_ms", "process_ms"]
+
+
+def free_port() -> int:
+    # Not imported from benchmarks.run: that module pulls in aiohttp, which would skew import_ms
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def child() -> dict:
+    openai_port, deepgram_port, app_port = free_port(), free_port(), free_port()
+    os.environ.update({
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "OPENAI_API_KEY": "bench",
+        "DEEPGRAM_BASE_URL": f"http://127.0.0.1:{deepgram_port}",
+        "DEEPGRAM_API_KEY": "bench",
+        "MONGO_URI": "mongodb://bench",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    })
+
+    started = time.perf_counter()
+    from app import main as app_main
+    imported = time.perf_counter()
+
+    # Everything below is benchmark scaffolding and is not counted in import_ms
+    import uvicorn
+    from aiohttp import web
+    from .fakes import FakeMongoClient, fake_deepgram_app, fake_openai_app
+    from .run import wait_until_ready
+
+    runners = []
+    for fake, port in ((fake_openai_app(), openai_port), (fake_deepgram_app(), deepgram_port)):
+        runner = web.AppRunner(fake)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        runners.append(runner)
+    mongo = FakeMongoClient()
+    app_main.create_mongo_client = lambda *a, **k: mongo
+
+    scaffolding = time.perf_counter() - imported
+    server = uvicorn.Server(uvicorn.Config(app_main.app, host="127.0.0.1", port=app_port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.001)
+    serving = time.perf_counter()
+    await wait_until_ready(f"http://127.0.0.1:{app_port}")
+    ready = time.perf_counter()
+
+    server.should_exit = True
+    await server_task
+    for runner in runners:
+        await runner.cleanup()
+    return {
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (serving - imported - scaffolding) * 1000,
+        "ready_ms": (ready - imported - scaffolding) * 1000,
+    }
+
+
+def run_once() -> dict:
+    spawned = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - spawned) * 1000
+    return result
+
+
+def main(args) -> int:
+    results = [run_once() for _ in range(args.runs)]
+    lines = [f"{args.runs} cold starts", f"{'phase':<12}{'median':>10}{'min':>10}{'max':>10}"]
+    for phase in PHASES:
+        values = [result[phase] for result in results]
+        lines.append(f"{phase:<12}{statistics.median(values):>10.1f}{min(values):>10.1f}{max(values):>10.1f}")
+    report = "\n".join(lines)
+    print(report)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(report + "\n")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to start")
+    parser.add_argument("--output", help="append the report here (e.g. bench_output.txt)")
+    parser.add_argument("--json", help="write per-run results here")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(child())))
+        sys.exit(0)
+    sys.exit(main(args))
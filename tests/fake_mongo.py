@@ -0,0 +1,204 @@
+"""
+In-process stand-in for the subset of Motor (MongoDB) the app uses.
+
+Shared by the unit tests and the offline benchmarks (benchmarks/fakes.py re-exports it), so it
+lives with the tests and has no dependency beyond pymongo/bson.
+"""
+import asyncio
+import copy
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+
+def _matches_value(value: Any, condition: Any, casefold: bool) -> bool:
+    if isinstance(condition, dict):
+        for operator, operand in condition.items():
+            if operator == "$gt" and not (value is not None and value > operand):
+                return False
+            if operator == "$gte" and not (value is not None and value >= operand):
+                return False
+            if operator == "$lt" and not (value is not None and value < operand):
+                return False
+            if operator == "$in" and not any(_matches_value(value, item, casefold) for item in operand):
+                return False
+        return True
+    if casefold and isinstance(value, str) and isinstance(condition, str):
+        return value.casefold() == condition.casefold()
+    return value == condition
+
+
+def _project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # Projections only narrow what is returned; returning the whole document is close enough here
+    return copy.deepcopy(document)
+
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]], latency: float):
+        self._documents = documents
+        self._latency = latency
+
+    def sort(self, key: str, direction: int = 1) -> "FakeCursor":
+        self._documents.sort(key=lambda document: document.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        await asyncio.sleep(self._latency)
+        return self._documents if length is None else self._documents[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in await self.to_list():
+            yield document
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int):
+        self.matched_count = matched_count
+        self.modified_count = matched_count
+
+
+class FakeCollection:
+    """
+    Dict-backed collection. Every operation sleeps `latency` seconds to model a network round trip.
+    Collated queries compare strings case-insensitively, like the strength-2 collation the app uses.
+    """
+
+    def __init__(self, latency: float = 0.001):
+        self.latency = latency
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: List[str] = []
+        self.operations = 0
+
+    def _select(self, query: Optional[Dict[str, Any]], collation: Optional[Dict[str, Any]] = None):
+        casefold = bool(collation) and collation.get("strength", 3) < 3
+        return [
+            document for document in self.documents.values()
+            if all(_matches_value(document.get(field), condition, casefold) for field, condition in (query or {}).items())
+        ]
+
+    async def _round_trip(self):
+        self.operations += 1
+        await asyncio.sleep(self.latency)
+
+    def seed(self, documents: Iterable[Dict[str, Any]]):
+        for document in documents:
+            document = dict(document)
+            document.setdefault("_id", ObjectId())
+            self.documents[document["_id"]] = document
+
+    async def create_index(self, keys, name: Optional[str] = None, **options) -> str:
+        await self._round_trip()
+        name = name or (keys if isinstance(keys, str) else "_".join(str(key) for key, _ in keys))
+        if name not in self.indexes:
+            self.indexes.append(name)
+        return name
+
+    def find(self, query=None, projection=None, collation=None, **options) -> FakeCursor:
+        self.operations += 1
+        documents = [_project(document, projection) for document in self._select(query, collation)]
+        return FakeCursor(documents, self.latency)
+
+    async def find_one(self, query=None, projection=None, **options) -> Optional[Dict[str, Any]]:
+        await self._round_trip()
+        documents = self._select(query, options.get("collation"))
+        return _project(documents[0], projection) if documents else None
+
+    async def insert_one(self, document: Dict[str, Any]):
+        await self._round_trip()
+        self.seed([document])
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True):
+        await self._round_trip()
+        self.seed(documents)
+
+    def _check_upsert(self, query: Dict[str, Any]):
+        # Like Mongo, an upsert whose filter misses but names an existing _id collides with it
+        if "_id" in query and query["_id"] in self.documents:
+            raise DuplicateKeyError("E11000 duplicate key error", code=11000)
+
+    async def replace_one(self, query: Dict[str, Any], document: Dict[str, Any], upsert: bool = False):
+        await self._round_trip()
+        existing = self._select(query)
+        if existing:
+            document = dict(document, _id=existing[0]["_id"])
+        elif not upsert:
+            return UpdateResult(0)
+        else:
+            self._check_upsert(query)
+            if "_id" in query and "_id" not in document:
+                document = dict(document, _id=query["_id"])
+        self.seed([document])
+        return UpdateResult(len(existing))
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        await self._round_trip()
+        existing = self._select(query)
+        if not existing and not upsert:
+            return UpdateResult(0)
+        if not existing:
+            self._check_upsert(query)
+        document = existing[0] if existing else {key: value for key, value in query.items() if not isinstance(value, dict)}
+        document.update(update.get("$set", {}))
+        for field, amount in update.get("$inc", {}).items():
+            document[field] = (document.get(field) or 0) + amount
+        if not existing:
+            document.update(update.get("$setOnInsert", {}))
+        self.seed([document])
+        return UpdateResult(len(existing[:1]))
+
+    async def delete_one(self, query: Dict[str, Any]):
+        await self._round_trip()
+        for document in self._select(query)[:1]:
+            del self.documents[document["_id"]]
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        await self._round_trip()
+        return len(self._select(query))
+
+
+class FakeDatabase:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self.latency)
+        return self._collections[name]
+
+    async def command(self, name: str, *args, **kwargs) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return {"ok": 1.0}
+
+
+class FakeMongoClient:
+    """
+    Drop-in for AsyncIOMotorClient(uri); databases and collections are created on first access.
+    """
+
+    def __init__(self, uri: str = "", latency: float = 0.001, **options):
+        self.latency = latency
+        self._databases: Dict[str, FakeDatabase] = {}
+        self.created_at = time.monotonic()
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        if name not in self._databases:
+            self._databases[name] = FakeDatabase(self.latency)
+        return self._databases[name]
+
+    @property
+    def admin(self) -> FakeDatabase:
+        return self["admin"]
+
+    def close(self):
+        pass
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.main import app, session_store
+from app.services.admission import BACKGROUND, LIVE, AdmissionController, Overloaded
+from app.services.session_store import InterviewSession
+
+@pytest.mark.asyncio
+async def test_limits_concurrency_and_prefers_live_traffic():
+    admission = AdmissionController("llm", max_concurrency=1, max_waiting=10, timeout=1)
+    order = []
+
+    async def call(name, priority):
+        async with admission.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await admission.acquire()
+    tasks = [
+        asyncio.create_task(call("evaluation", BACKGROUND)),
+        asyncio.create_task(call("feedback", LIVE)),
+    ]
+    await asyncio.sleep(0)
+    assert admission.active == 1 and len(admission) == 2
+    admission.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["feedback", "evaluation"]
+    assert admission.active == 0 and len(admission) == 0
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full_or_deadline_passes():
+    admission = AdmissionController("tts", max_concurrency=1, max_waiting=1, timeout=0.02)
+    await admission.acquire()
+    waiting = asyncio.create_task(admission.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(Overloaded) as full:
+        await admission.acquire()
+    assert full.value.retry_after >= 1
+    with pytest.raises(Overloaded):
+        await waiting
+    assert admission.rejected == 2 and len(admission) == 0
+    admission.release()
+    assert admission.active == 0
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_out_calls():
+    admission = AdmissionController("llm", max_concurrency=10, rate=50, burst=1, timeout=1)
+    loop = asyncio.get_running_loop()
+    started = []
+
+    async def call():
+        async with admission.slot():
+            started.append(loop.time())
+
+    await asyncio.gather(*(call() for _ in range(3)))
+    # One token up front, then one every 20ms
+    assert started[-1] - started[0] >= 0.035
+
+def test_http_rejection_is_429_with_retry_after():
+    asyncio.run(session_store.save(InterviewSession("busy_session", question={"title": "Busy"})))
+    saturated = AdmissionController("llm", max_concurrency=0, max_waiting=0)
+
+    with patch("app.main.llm_admission", new=saturated):
+        client = TestClient(app)
+        response = client.post("/api/incremental-feedback", json={"session_id": "busy_session", "code": "x = 1", "status": "Thinking"})
+        stream = client.post("/api/incremental-feedback/stream", json={"session_id": "busy_session", "status": "Thinking"})
+
+    assert response.status_code == stream.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+def test_websocket_rejection_closes_with_1013():
+    async def overloaded_synthesize(text, tts_format=None):
+        raise Overloaded("tts", "wait queue is full", 3)
+        yield b""
+
+    asyncio.run(session_store.save(InterviewSession("busy_tts_session", feedback="Upstream is saturated right now.")))
+
+    with patch("app.main.synthesize_speech", new=overloaded_synthesize):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/tts?session_id=busy_tts_session") as websocket:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_bytes()
+
+    assert closed.value.code == 1013
@@ -0,0 +1,96 @@
+import json
+import time
+import pytest
+import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+from app.auth import clerk_jwt
+from app.auth.clerk_jwt import CLERK_ISSUER, JWKSCache, configure_jwks, file_jwks_fetcher, verify_clerk_token
+
+def make_key(kid):
+    _, private_key = rsa.newkeys(1024)
+    pem = private_key.save_pkcs1().decode()
+    public_jwk = jwk.construct(pem, "RS256").public_key().to_dict()
+    public_jwk["kid"] = kid
+    return pem, public_jwk
+
+def make_token(pem, kid, exp_in=60):
+    claims = {"sub": "user_1", "aud": CLERK_ISSUER, "iss": CLERK_ISSUER, "exp": int(time.time()) + exp_in}
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+@pytest.fixture
+def jwks_file(tmp_path):
+    path = tmp_path / "jwks.json"
+
+    def write(*keys):
+        path.write_text(json.dumps({"keys": list(keys)}))
+        return str(path)
+    return write
+
+@pytest.mark.asyncio
+async def test_verify_uses_cached_keys_and_tokens(jwks_file):
+    pem, public_jwk = make_key("k1")
+    fetches = []
+    file_fetch = file_jwks_fetcher(jwks_file(public_jwk))
+
+    async def counting_fetch():
+        fetches.append(1)
+        return await file_fetch()
+
+    configure_jwks(counting_fetch)
+    token = make_token(pem, "k1")
+    assert (await verify_clerk_token(token))["sub"] == "user_1"
+    assert (await verify_clerk_token(make_token(pem, "k1", exp_in=120)))["sub"] == "user_1"
+    assert (await verify_clerk_token(token))["sub"] == "user_1"
+    assert len(fetches) == 1
+    assert clerk_jwt.verified_tokens.get(token) is not None
+
+@pytest.mark.asyncio
+async def test_unknown_kid_forces_refresh(jwks_file):
+    old_pem, old_jwk = make_key("old")
+    new_pem, new_jwk = make_key("new")
+    path = jwks_file(old_jwk)
+    configure_jwks(file_jwks_fetcher(path), min_refresh_interval=0)
+    await verify_clerk_token(make_token(old_pem, "old"))
+
+    # Issuer rotates its signing key
+    jwks_file(old_jwk, new_jwk)
+    assert (await verify_clerk_token(make_token(new_pem, "new")))["sub"] == "user_1"
+
+@pytest.mark.asyncio
+async def test_rejects_token_signed_with_unpublished_key(jwks_file):
+    _, public_jwk = make_key("k1")
+    rogue_pem, _ = make_key("k1")
+    configure_jwks(file_jwks_fetcher(jwks_file(public_jwk)))
+
+    with pytest.raises(HTTPException) as exc:
+        await verify_clerk_token(make_token(rogue_pem, "k1"))
+    assert exc.value.status_code == 401
+
+@pytest.mark.asyncio
+async def test_stale_keys_are_served_while_refreshing(jwks_file):
+    _, public_jwk = make_key("k1")
+    cache = JWKSCache(file_jwks_fetcher(jwks_file(public_jwk)), ttl=0, stale_ttl=60)
+    await cache.refresh()
+    fetched_at = cache._fetched_at
+
+    assert await cache.get_key("k1") == public_jwk
+    await cache._refresh_task
+    assert cache._fetched_at > fetched_at
+
+@pytest.mark.asyncio
+async def test_get_current_user_reads_websocket_token_param(monkeypatch):
+    from unittest.mock import AsyncMock
+    from starlette.requests import HTTPConnection
+    verify = AsyncMock(return_value={"sub": "user_1"})
+    monkeypatch.setattr(clerk_jwt, "verify_clerk_token", verify)
+
+    websocket = HTTPConnection({"type": "websocket", "headers": [], "query_string": b"session_id=s1&token=abc"})
+    assert await clerk_jwt.get_current_user(websocket) == {"sub": "user_1"}
+    verify.assert_awaited_once_with("abc")
+
+    # Plain HTTP requests still need the Authorization header
+    request = HTTPConnection({"type": "http", "headers": [], "query_string": b"token=abc"})
+    with pytest.raises(HTTPException) as error:
+        await clerk_jwt.get_current_user(request)
+    assert error.value.status_code == 401
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from app.services.coalescer import FeedbackCoalescer
+
+@pytest.mark.asyncio
+async def test_running_generation_finishes_and_newer_updates_get_one_follow_up():
+    coalescer = FeedbackCoalescer(debounce=0.01)
+    calls = []
+    release = asyncio.Event()
+
+    async def generate(updates):
+        calls.append(list(updates))
+        if len(calls) == 1:
+            await release.wait()
+        return " ".join(updates)
+
+    first = asyncio.create_task(coalescer.submit("s1", 1, "a", generate))
+    await asyncio.sleep(0.05)
+    second = asyncio.create_task(coalescer.submit("s1", 2, "b", generate))
+    third = asyncio.create_task(coalescer.submit("s1", 3, "c", generate))
+    await asyncio.sleep(0.05)
+    release.set()
+
+    # The first completion is not cancelled; the two later updates share one follow-up
+    assert await first == (1, "a")
+    assert await second == await third == (3, "b c")
+    assert calls == [["a"], ["b", "c"]]
+    assert not coalescer._flights
+
+@pytest.mark.asyncio
+async def test_steady_updates_faster_than_the_model_are_still_answered():
+    coalescer = FeedbackCoalescer(debounce=0.05, max_wait=0.2)
+    loop = asyncio.get_running_loop()
+    started = []
+
+    async def generate(updates):
+        started.append(loop.time())
+        await asyncio.sleep(0.25)
+        return len(updates)
+
+    async def request(seq):
+        submitted = loop.time()
+        await coalescer.submit("s1", seq, str(seq), generate)
+        return loop.time() - submitted
+
+    # An update every 80ms against a 250ms model, for well over a second
+    tasks = []
+    for seq in range(1, 16):
+        tasks.append(asyncio.create_task(request(seq)))
+        await asyncio.sleep(0.08)
+    waits = await asyncio.gather(*tasks)
+
+    # Answered within max_wait plus at most two generations, not after the updates stop
+    assert max(waits) < 0.2 + 2 * 0.25 + 0.1
+    assert len(started) <= 6
+
+@pytest.mark.asyncio
+async def test_updates_within_debounce_make_one_call():
+    coalescer = FeedbackCoalescer(debounce=0.05)
+    calls = []
+
+    async def generate(updates):
+        calls.append(list(updates))
+        return len(updates)
+
+    results = await asyncio.gather(*(coalescer.submit("s1", seq, str(seq), generate) for seq in range(1, 4)))
+    assert results == [(3, 3)] * 3
+    assert calls == [["1", "2", "3"]]
+
+@pytest.mark.asyncio
+async def test_sessions_are_independent_and_errors_propagate():
+    coalescer = FeedbackCoalescer(debounce=0)
+
+    async def fail(updates):
+        raise RuntimeError("upstream down")
+
+    async def ok(updates):
+        return "ok"
+
+    results = await asyncio.gather(
+        coalescer.submit("s1", 1, "a", fail),
+        coalescer.submit("s2", 1, "a", ok),
+        return_exceptions=True,
+    )
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == (1, "ok")
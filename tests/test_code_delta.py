@@ -0,0 +1,24 @@
+import pytest
+from app.main import CodeEdit
+from app.services.code_delta import DeltaConflict, apply_edits
+
+def test_apply_edits_uses_base_offsets():
+    code = "def f(x):\n    return x\n"
+    edits = [
+        CodeEdit(start=6, end=7, text="n"),
+        CodeEdit(start=21, end=22, text="n * 2"),
+    ]
+    assert apply_edits(code, edits) == "def f(n):\n    return n * 2\n"
+
+def test_apply_edits_inserts_and_deletes():
+    assert apply_edits("abc", [CodeEdit(start=3, end=3, text="d")]) == "abcd"
+    assert apply_edits("abcd", [CodeEdit(start=1, end=3)]) == "ad"
+
+@pytest.mark.parametrize("edits", [
+    [CodeEdit(start=0, end=5, text="x")],
+    [CodeEdit(start=2, end=1, text="x")],
+    [CodeEdit(start=0, end=2, text="x"), CodeEdit(start=1, end=3, text="y")],
+])
+def test_apply_edits_rejects_conflicts(edits):
+    with pytest.raises(DeltaConflict):
+        apply_edits("abcd", edits)
@@ -1,25 +1,82 @@
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock
-from app.main import startup_db_client, shutdown_db_client, app
+from unittest.mock import patch, MagicMock, AsyncMock
+from fastapi.testclient import TestClient
+from app.main import startup_db_client, shutdown_db_client, app, create_app, event_writer
 
-@patch("app.main.AsyncIOMotorClient")
+@patch("app.main.create_mongo_client")
 @pytest.mark.asyncio
 async def test_startup_db_client(mock_motor_client):
     mock_client = MagicMock()
     mock_motor_client.return_value = mock_client
 
-    await startup_db_client()
+    await startup_db_client(app)
 
     mock_motor_client.assert_called_once()
     assert hasattr(app, "mongodb_client")
+    app.problem_index_task.cancel()
+    await event_writer.close()
 
-@patch("app.main.AsyncIOMotorClient")
+@patch("app.main.create_mongo_client")
 @pytest.mark.asyncio
 async def test_shutdown_db_client(mock_motor_client):
     mock_client = MagicMock()
     mock_motor_client.return_value = mock_client
     app.mongodb_client = mock_client
 
-    await shutdown_db_client()
+    await shutdown_db_client(app)
 
     mock_client.close.assert_called_once()
+
+def test_ready_after_warm_up():
+    mock_client = MagicMock()
+    mock_client.admin.command = AsyncMock(return_value={"ok": 1.0})
+    collection = mock_client.__getitem__.return_value.__getitem__.return_value
+    collection.create_index = AsyncMock()
+
+    with patch("app.main.create_mongo_client", return_value=mock_client), \
+            patch("app.main.llm_client.warm", new_callable=AsyncMock), \
+            patch("app.main.tts_http.warm", new_callable=AsyncMock):
+        with TestClient(create_app()) as client:
+            for _ in range(50):
+                response = client.get("/ready")
+                if response.status_code == 200:
+                    break
+                client.portal.call(asyncio.sleep, 0.01)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready", "checks": {"warmup": True, "mongo": True}}
+    assert "problem_name_ci" in [call.kwargs.get("name") for call in collection.create_index.await_args_list]
+
+def test_ready_lists_upstreams_that_could_not_be_warmed():
+    mock_client = MagicMock()
+    mock_client.admin.command = AsyncMock(return_value={"ok": 1.0})
+
+    with patch("app.main.create_mongo_client", return_value=mock_client), \
+            patch("app.main.llm_client.warm", new_callable=AsyncMock, return_value=True), \
+            patch("app.main.tts_http.warm", new_callable=AsyncMock, return_value=False):
+        with TestClient(create_app()) as client:
+            for _ in range(50):
+                response = client.get("/ready")
+                if response.status_code == 200:
+                    break
+                client.portal.call(asyncio.sleep, 0.01)
+
+            # A second app would share and then close the first one's clients
+            with pytest.raises(RuntimeError):
+                with TestClient(create_app()):
+                    pass
+
+    assert response.status_code == 200
+    assert response.json()["degraded"] == ["tts"]
+
+def test_not_ready_when_mongo_stops_answering():
+    fresh_app = create_app()
+    fresh_app.warmed_up = True
+    fresh_app.mongodb_client = MagicMock()
+    fresh_app.mongodb_client.admin.command = AsyncMock(side_effect=ConnectionError("down"))
+
+    response = TestClient(fresh_app).get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["checks"] == {"warmup": True, "mongo": False}
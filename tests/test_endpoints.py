@@ -1,7 +1,9 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
-from app.main import app, sessions
+import asyncio
+from app.main import app, feedback_cache, session_store
+from app.services.session_store import InterviewSession
 
 client = TestClient(app)
 
@@ -24,21 +26,18 @@ def test_initialize_question():
     assert response.status_code == 200
     data = response.json()
     assert "session_id" in data
+    session = asyncio.run(session_store.get(data["session_id"]))
+    assert session["question"]["title"] == "Sample Question"
 
 @pytest.mark.asyncio
-@patch("app.main.openai.ChatCompletion.create")
-async def test_incremental_feedback(mock_openai):
-    mock_response = MagicMock()
-    mock_response.choices = [MagicMock()]
-    mock_response.choices[0].message.content = "Mock feedback"
-    mock_openai.return_value = mock_response
-
-    sessions["mock_session"] = {
-        "question": {"title": "Test Question", "description": "", "input": "", "output": ""},
-        "code": "",
-        "transcript": "",
-        "feedback": ""
-    }
+@patch("app.main.llm_client.chat", new_callable=AsyncMock)
+async def test_incremental_feedback(mock_chat):
+    mock_chat.return_value = "Mock feedback"
+
+    await session_store.save(InterviewSession(
+        "mock_session",
+        question={"title": "Test Question", "description": "", "input": "", "output": ""},
+    ))
 
     response = client.post(
         "/api/incremental-feedback",
@@ -46,3 +45,122 @@ async def test_incremental_feedback(mock_openai):
     )
     assert response.status_code == 200
     assert response.json()["feedback"] == "Mock feedback"
+    assert response.json()["feedback_seq"] == 1
+    assert (await session_store.get("mock_session"))["feedback"] == "Mock feedback"
+
+@patch("app.main.llm_client.chat", new_callable=AsyncMock)
+def test_incremental_feedback_reuses_cached_state(mock_chat):
+    mock_chat.return_value = "Consider the empty input."
+    asyncio.run(session_store.save(InterviewSession("cache_session", question={"title": "Cached Question"})))
+
+    hits, misses = feedback_cache.hits, feedback_cache.misses
+    payload = {"session_id": "cache_session", "code": "def f(xs):\n    return xs[0]\n", "status": "Thinking"}
+    first = client.post("/api/incremental-feedback", json=payload)
+    # One lookup per request: an uncached request counts a single miss
+    assert (feedback_cache.hits - hits, feedback_cache.misses - misses) == (0, 1)
+    payload["code"] = "def f(xs):\n    # first element\n    return xs[0]\n"
+    second = client.post("/api/incremental-feedback", json=payload)
+
+    assert first.json()["feedback"] == second.json()["feedback"] == "Consider the empty input."
+    assert second.json()["feedback_seq"] == 2
+    assert (feedback_cache.hits - hits, feedback_cache.misses - misses) == (1, 1)
+    mock_chat.assert_awaited_once()
+
+def test_incremental_feedback_stream():
+    async def fake_stream(*args, **kwargs):
+        for token in ["Good ", "start", "."]:
+            yield token
+
+    asyncio.run(session_store.save(InterviewSession(
+        "stream_session",
+        question={"title": "Test Question", "description": "", "input": "", "output": ""},
+    )))
+
+    with patch("app.main.llm_client.stream_chat", new=fake_stream):
+        response = client.post(
+            "/api/incremental-feedback/stream",
+            json={"session_id": "stream_session", "transcript": "I'll use a hash map", "status": "Thinking"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert events[0] == 'event: token\ndata: {"token": "Good "}'
+    assert events[-1].startswith("event: done")
+    session = asyncio.run(session_store.get("stream_session"))
+    assert session["feedback"] == "Good start."
+    assert "ttft_ms" in session["last_generation"]
+
+@patch("app.main.llm_client.chat", new_callable=AsyncMock)
+def test_incremental_feedback_code_deltas(mock_chat):
+    mock_chat.return_value = "Mock feedback"
+    asyncio.run(session_store.save(InterviewSession("delta_session", question={"title": "Test Question"})))
+
+    response = client.post(
+        "/api/incremental-feedback",
+        json={"session_id": "delta_session", "code": "x = 1", "status": "Thinking"}
+    )
+    assert response.json()["code_version"] == 1
+
+    response = client.post(
+        "/api/incremental-feedback",
+        json={
+            "session_id": "delta_session",
+            "base_version": 1,
+            "edits": [{"start": 4, "end": 5, "text": "42"}],
+            "status": "Thinking"
+        }
+    )
+    assert response.status_code == 200
+    assert response.json()["code_version"] == 2
+    assert asyncio.run(session_store.get("delta_session"))["code"] == "x = 42"
+
+    # A delta against an old version must be rejected so the client resyncs
+    response = client.post(
+        "/api/incremental-feedback",
+        json={
+            "session_id": "delta_session",
+            "base_version": 1,
+            "edits": [{"start": 0, "end": 1, "text": "y"}],
+            "status": "Thinking"
+        }
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"]["code_version"] == 2
+
+def test_get_solutions_uses_collated_lookup_and_cache():
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{
+        "_id": "abc123",
+        "problem_name": "Two Sum",
+        "solutions": [{"approach": "Hash map", "code": "...", "time_complexity": "O(n)", "space_complexity": "O(n)"}]
+    }])
+    collection = MagicMock()
+    collection.find.return_value = cursor
+    collection.create_index = AsyncMock()
+    with patch.object(app, "mongodb", {"solutions": collection}, create=True):
+        first = client.post("/api/get-solutions", json={"problem_name": "two  sum "})
+        second = client.post("/api/get-solutions", json={"problem_name": "TWO SUM"})
+
+    assert first.status_code == 200
+    assert first.json()[0]["solutions"][0]["approach"] == "Hash map"
+    assert second.json() == first.json()
+    collection.find.assert_called_once()
+    # Index creation belongs to the warm-up, not the request path
+    collection.create_index.assert_not_called()
+    query_filter = collection.find.call_args.args[0]
+    assert query_filter == {"problem_name": "two sum"}
+    assert collection.find.call_args.kwargs["collation"]["strength"] == 2
+
+def test_get_solutions_requires_problem_name():
+    response = client.post("/api/get-solutions", json={"problem_name": " "})
+    assert response.status_code == 400
+
+def test_search_solutions():
+    with patch("app.main.problem_index") as mock_index:
+        mock_index.search.return_value = [{"problem_name": "Two Sum", "score": 3.0}]
+        response = client.get("/api/search-solutions", params={"q": "two", "limit": 5})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["problem_name"] == "Two Sum"
+    mock_index.search.assert_called_once_with("two", limit=5)
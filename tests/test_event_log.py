@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.services.event_log import EventWriter
+
+def collection():
+    mock = AsyncMock()
+    mock.written = []
+    async def insert_many(batch, ordered=True):
+        mock.written.append([event["type"] for event in batch])
+    mock.insert_many.side_effect = insert_many
+    return mock
+
+@pytest.mark.asyncio
+async def test_flushes_on_batch_size():
+    events = collection()
+    writer = EventWriter(max_batch=3, flush_interval=60)
+    writer.start(events)
+    for kind in ("question", "code", "transcript"):
+        assert writer.record("s1", kind)
+    await asyncio.sleep(0.01)
+
+    assert events.written == [["question", "code", "transcript"]]
+    assert writer.written == 3 and len(writer) == 0
+    await writer.close()
+
+@pytest.mark.asyncio
+async def test_flushes_on_interval_and_at_close():
+    events = collection()
+    writer = EventWriter(max_batch=100, flush_interval=0.02)
+    writer.record("s1", "question")  # buffered before start
+    writer.start(events)
+    await asyncio.sleep(0.05)
+    assert events.written == [["question"]]
+
+    writer.record("s1", "feedback", feedback="ok", feedback_seq=1)
+    await writer.close()
+    assert events.written[-1] == ["feedback"]
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_or_waits():
+    writer = EventWriter(max_batch=10, flush_interval=60, max_queue=2)
+    assert writer.record("s1", "code")
+    assert writer.record("s1", "code")
+    assert not writer.record("s1", "code")
+    assert writer.dropped == 1
+
+    events = collection()
+    writer.start(events)
+    # put blocks until the writer frees space, then queues the event
+    await asyncio.wait_for(writer.put("s1", "transcript"), 1)
+    await writer.close()
+    assert sum(len(batch) for batch in events.written) == 3
+
+@pytest.mark.asyncio
+async def test_put_gives_up_after_timeout_when_writer_is_stalled():
+    events = collection()
+    stalled = asyncio.Event()
+    async def hang(batch, ordered=True):
+        await stalled.wait()
+    events.insert_many.side_effect = hang
+    writer = EventWriter(max_batch=1, flush_interval=60, max_queue=1)
+    writer.start(events)
+    assert writer.record("s1", "code")
+    await asyncio.sleep(0.01)  # first event is being written, forever
+    assert writer.record("s1", "code")
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert not await writer.put("s1", "question", timeout=0.05)
+    assert 0.04 <= loop.time() - started < 0.5 and writer.dropped == 1
+    stalled.set()
+    await writer.close()
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried():
+    events = collection()
+    attempts = []
+    async def flaky(batch, ordered=True):
+        attempts.append(len(batch))
+        if len(attempts) == 1:
+            raise ConnectionError("primary stepped down")
+    events.insert_many.side_effect = flaky
+    writer = EventWriter(max_batch=10, flush_interval=0.01, retry_interval=0.01)
+    writer.record("s1", "code")
+    writer.record("s1", "transcript")
+    writer.start(events)
+    await asyncio.sleep(0.1)
+
+    assert attempts[:2] == [2, 2]
+    assert writer.written == 2 and writer.failed_flushes == 1
+    await writer.close()
+
+@pytest.mark.asyncio
+async def test_retry_after_partial_write_counts_duplicates_as_written():
+    class DuplicateKeys(Exception):
+        details = {"writeErrors": [{"code": 11000}]}
+
+    events = collection()
+    events.insert_many.side_effect = DuplicateKeys()
+    writer = EventWriter(max_batch=10, flush_interval=60)
+    writer.record("s1", "code")
+    writer.start(events)
+    await writer.close()
+
+    assert writer.written == 1 and writer.failed_flushes == 0 and len(writer) == 0
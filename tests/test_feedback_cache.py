@@ -0,0 +1,20 @@
+from app.services.feedback_cache import code_fingerprint, feedback_cache_key
+
+def test_fingerprint_ignores_formatting_and_comments():
+    original = "def f(x):\n    return x + 1\n"
+    reformatted = "def f( x ):\n\n    # add one\n    return x+1   # done\n"
+    assert code_fingerprint(original) == code_fingerprint(reformatted)
+    assert code_fingerprint(original) != code_fingerprint("def f(x):\n    return x + 2\n")
+
+def test_fingerprint_handles_unparseable_code():
+    partial = "def f(x):\n    return (x +  # unfinished\n"
+    assert code_fingerprint(partial) == code_fingerprint("def f(x):\n    return (x +\n")
+    java = "int f(int x) {  return x + 1; }"
+    assert code_fingerprint(java) == code_fingerprint("int f(int x) {\n    return x + 1;\n}")
+
+def test_cache_key_includes_question_and_transcript():
+    question = {"title": "Two Sum"}
+    base = feedback_cache_key(question, "x = 1", "")
+    assert base == feedback_cache_key({"title": "Two Sum"}, "x=1", "")
+    assert base != feedback_cache_key({"title": "Three Sum"}, "x = 1", "")
+    assert base != feedback_cache_key(question, "x = 1", "I'll use a hash map")
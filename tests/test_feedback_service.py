@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+from starlette.websockets import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.feedback_service import CodeAnalysisEngine, analyze_source, provide_real_time_feedback
+
+NESTED = """
+def two_sum(nums, target):
+    unused = 0
+    for i in range(len(nums)):
+        for j in range(i + 1, len(nums)):
+            if nums[i] + nums[j] == target:
+                return [i, j]
+"""
+
+def test_detects_nested_loops_and_unused_variables():
+    analysis = analyze_source(NESTED)
+    unit = analysis["units"][0]
+    assert unit["name"] == "two_sum"
+    assert unit["loop_depth"] == 2
+    assert unit["complexity"] == "O(n^2)"
+    assert "`unused` is assigned in `two_sum` but never used." in analysis["issues"]
+
+def test_flags_recursion_without_base_case():
+    analysis = analyze_source("def f(n):\n    return f(n - 1) + 1\n")
+    assert analysis["units"][0]["recursive"]
+    assert "`f` calls itself without an obvious base case." in analysis["issues"]
+
+    analysis = analyze_source("def f(n):\n    if n == 0:\n        return 0\n    return f(n - 1) + 1\n")
+    assert analysis["issues"] == []
+
+@pytest.mark.parametrize("source", [
+    "def f(n):\n    if n < 0:\n        raise ValueError(n)\n    return f(n - 1)\n",
+    "def f(n):\n    try:\n        return f(n - 1)\n    except ValueError:\n        raise\n",
+])
+def test_raising_guard_or_try_is_not_a_base_case(source):
+    assert "`f` calls itself without an obvious base case." in analyze_source(source)["issues"]
+
+def test_guarded_recursive_call_is_a_base_case():
+    assert analyze_source("def walk(node):\n    if node.left:\n        walk(node.left)\n")["issues"] == []
+    assert analyze_source("def f(n):\n    return 1 if n <= 1 else n * f(n - 1)\n")["issues"] == []
+
+def test_comprehensions_count_as_loops():
+    analysis = analyze_source("pairs = [(a, b) for a in xs for b in ys]\n")
+    assert analysis["loop_depth"] == 2
+
+def test_syntax_errors_are_reported():
+    assert provide_real_time_feedback("def f(:\n").startswith("Syntax error on line 1")
+    assert provide_real_time_feedback("for x in xs:\n    print(x)\n") == "Looks like you're using a loop!"
+
+@pytest.mark.asyncio
+async def test_engine_runs_in_process_pool_and_caches():
+    engine = CodeAnalysisEngine(max_workers=1)
+    try:
+        first = await engine.analyze(NESTED)
+        second = await engine.analyze(NESTED)
+        start_method = engine._pool._mp_context.get_start_method()
+    finally:
+        engine.shutdown()
+    assert first["loop_depth"] == 2
+    assert second is first
+    # Workers must not fork the running event loop and its threads
+    assert start_method == "spawn"
+
+def test_code_session_websocket():
+    with TestClient(app) as client:
+        with client.websocket_connect("/interview/code-session") as websocket:
+            websocket.send_text("x = 1")
+            websocket.send_text(NESTED)
+            message = websocket.receive_json()
+    assert "Nested loops (depth 2)" in message["feedback"]
+    assert message["analysis"]["units"][0]["name"] == "two_sum"
+
+def test_too_deeply_nested_code_is_reported_not_raised():
+    deep = "x = " + "+".join(["1"] * 20000) + "\n"
+    assert analyze_source(deep)["syntax_error"]["line"] is None
+    assert provide_real_time_feedback(deep).startswith("Could not analyze the code")
+
+def test_code_session_reports_analysis_failures_before_closing():
+    with patch("app.routers.interview.analysis_engine.analyze", new_callable=AsyncMock, side_effect=RuntimeError("pool broke")):
+        with TestClient(app) as client:
+            with client.websocket_connect("/interview/code-session") as websocket:
+                websocket.send_text("x = 1")
+                message = websocket.receive_json()
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    websocket.receive_json()
+    assert message == {"error": "Code analysis failed."}
+    assert closed.value.code == 1011
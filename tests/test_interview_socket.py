@@ -0,0 +1,124 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.main import app, session_store
+from app.services.interview_channel import AUDIO_HEADER, InterviewChannel
+from app.services.session_store import InterviewSession
+
+@pytest.mark.asyncio
+async def test_channel_replays_buffered_frames_or_asks_for_resync():
+    channel = InterviewChannel("s1", replay_frames=3)
+    await channel.send_json({"type": "feedback", "feedback": "a"})  # no socket attached: only buffered
+
+    websocket = MagicMock(send_text=AsyncMock(), send_bytes=AsyncMock())
+    channel.attach(websocket)
+    await channel.send_audio(b"\x01\x02")
+    await channel.send_json({"type": "audio_end"})
+    assert websocket.send_bytes.await_args.args[0] == AUDIO_HEADER.pack(2) + b"\x01\x02"
+
+    assert await channel.replay(1)
+    assert json.loads(websocket.send_text.await_args.args[0]) == {"seq": 3, "type": "audio_end"}
+
+    await channel.send_json({"type": "audio_start"})
+    # Frame 1 has fallen out of the three-frame buffer
+    assert channel.frames_after(1) is not None and channel.frames_after(0) is None
+    assert not await channel.replay(0)
+
+def test_interview_socket_requires_auth():
+    asyncio.run(session_store.save(InterviewSession("socket_auth_session")))
+    client = TestClient(app)
+    with client.websocket_connect("/ws/interview?session_id=socket_auth_session") as websocket:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_text()
+    assert closed.value.code == 1008
+
+def test_interview_socket_update_feedback_audio_and_resume():
+    async def fake_synthesize(text, tts_format=None):
+        yield text.encode()
+
+    asyncio.run(session_store.save(InterviewSession("socket_session", question={"title": "Socket Question"})))
+
+    with patch("app.main.get_current_user", new_callable=AsyncMock, return_value={"sub": "user_1"}), \
+            patch("app.main.llm_client.chat", new_callable=AsyncMock, return_value="Think about the socket edge case."), \
+            patch("app.main.synthesize_speech", new=fake_synthesize):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/interview?session_id=socket_session&token=jwt") as websocket:
+            assert websocket.receive_json() == {"type": "welcome", "seq": 0, "feedback_seq": 0, "code_version": 0}
+            websocket.send_json({"type": "ping"})
+            assert websocket.receive_json()["type"] == "pong"
+
+            websocket.send_json({"type": "update", "code": "def f(): pass", "transcript": "I will start simple."})
+            feedback = websocket.receive_json()
+            audio_start = websocket.receive_json()
+            audio = websocket.receive_bytes()
+            audio_end = websocket.receive_json()
+
+        # Reconnect having only seen the feedback frame
+        with client.websocket_connect("/ws/interview?session_id=socket_session&token=jwt&last_seq=1") as websocket:
+            welcome = websocket.receive_json()
+            replayed = [websocket.receive_json(), websocket.receive_bytes(), websocket.receive_json()]
+
+    assert feedback == {
+        "seq": 1, "type": "feedback", "feedback": "Think about the socket edge case.", "feedback_seq": 1, "code_version": 1,
+    }
+    assert audio_start == {"seq": 2, "type": "audio_start", "feedback_seq": 1, "content_type": "audio/mpeg"}
+    assert audio == AUDIO_HEADER.pack(3) + b"Think about the socket edge case."
+    assert audio_end == {"seq": 4, "type": "audio_end", "feedback_seq": 1}
+    assert welcome["seq"] == 4 and welcome["feedback_seq"] == 1
+    assert replayed == [audio_start, audio, audio_end]
+
+def test_interview_socket_rejects_malformed_frames_without_dying():
+    asyncio.run(session_store.save(InterviewSession("socket_frames_session", question={"title": "Frames"})))
+
+    with patch("app.main.get_current_user", new_callable=AsyncMock, return_value={"sub": "user_1"}), \
+            patch("app.main.llm_client.chat", new_callable=AsyncMock, return_value="Frames look fine."):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/interview?session_id=socket_frames_session&token=jwt&audio=false") as websocket:
+            websocket.receive_json()  # welcome
+            websocket.send_bytes(b"\x00\x01")
+            binary = websocket.receive_json()
+            websocket.send_json({"type": "update", "session_id": "someone_else", "transcript": "hi"})
+            mismatch = websocket.receive_json()
+            websocket.send_json({"type": "update", "edits": "not a list"})
+            invalid = websocket.receive_json()
+            # Echoing this socket's own session_id, as the HTTP body would, is fine
+            websocket.send_json({"type": "update", "session_id": "socket_frames_session", "code": "x = 1"})
+            feedback = websocket.receive_json()
+
+    assert binary["type"] == mismatch["type"] == invalid["type"] == "error"
+    assert (binary["status"], mismatch["status"], invalid["status"]) == (400, 400, 422)
+    assert feedback["type"] == "feedback" and feedback["feedback"] == "Frames look fine."
+
+@pytest.mark.asyncio
+async def test_replay_buffer_is_bounded_by_bytes_and_expired_channels_are_swept():
+    from app.services.interview_channel import ChannelRegistry
+
+    registry = ChannelRegistry(resume_ttl=0.01, replay_bytes=100, sweep_interval=0.01)
+    channel = registry.get("s1")
+    for _ in range(5):
+        await channel.send_audio(b"\x00" * 40)
+    # Only the last two 44-byte frames fit in 100 bytes
+    assert channel.buffered_bytes == 88
+    assert channel.frames_after(3) is not None and channel.frames_after(2) is None
+
+    registry.start()
+    await asyncio.sleep(0.05)
+    assert len(registry) == 0 and registry.buffered_bytes() == 0
+    registry.close()
+
+def test_interview_socket_refuses_another_users_session():
+    asyncio.run(session_store.save(InterviewSession("socket_owner_session")))
+    client = TestClient(app)
+
+    with patch("app.main.get_current_user", new_callable=AsyncMock, return_value={"sub": "owner"}):
+        with client.websocket_connect("/ws/interview?session_id=socket_owner_session&token=jwt&audio=false") as websocket:
+            assert websocket.receive_json()["type"] == "welcome"
+
+    with patch("app.main.get_current_user", new_callable=AsyncMock, return_value={"sub": "intruder"}):
+        with client.websocket_connect("/ws/interview?session_id=socket_owner_session&token=jwt&last_seq=0") as websocket:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+    assert closed.value.code == 1008
@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from fastapi.testclient import TestClient
+from app.main import create_app, session_store
+from app.services.job_queue import DONE, FAILED, QUEUED, JobQueue, PermanentError, QueueFull
+from app.services.session_store import InterviewSession
+
+@pytest.mark.asyncio
+async def test_higher_priority_runs_first():
+    order = []
+    async def handler(payload):
+        order.append(payload)
+        return payload
+
+    queue = JobQueue(handler, workers=1)
+    queue.start()
+    jobs = [
+        await queue.submit("low", "low", priority=2),
+        await queue.submit("normal", "normal", priority=1),
+        await queue.submit("high", "high", priority=0),
+    ]
+    await asyncio.wait_for(asyncio.gather(*(job.wait() for job in jobs)), 1)
+    await queue.close()
+
+    assert order == ["high", "normal", "low"]
+    assert all(job.status == DONE for job in jobs) and queue.completed == 3
+
+@pytest.mark.asyncio
+async def test_duplicate_key_returns_pending_job():
+    release = asyncio.Event()
+    calls = []
+    async def handler(payload):
+        calls.append(payload)
+        await release.wait()
+
+    queue = JobQueue(handler, workers=2)
+    queue.start()
+    first = await queue.submit("s1", 1)
+    second = await queue.submit("s1", 2)
+    assert first is second
+    release.set()
+    await asyncio.wait_for(first.wait(), 1)
+
+    # A finished job no longer blocks a new submission
+    third = await queue.submit("s1", 3)
+    await asyncio.wait_for(third.wait(), 1)
+    await queue.close()
+    assert third is not first and calls == [1, 3]
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_then_fails():
+    updates = []
+    async def record(job):
+        updates.append(job.status)
+    handler = AsyncMock(side_effect=[ValueError("bad json"), "ok", ValueError("x"), ValueError("y")])
+
+    queue = JobQueue(handler, workers=1, max_retries=1, backoff_base=0.001, on_update=record)
+    queue.start()
+    job = await queue.submit("s1", {})
+    await asyncio.wait_for(job.wait(), 1)
+    assert job.status == DONE and job.result == "ok" and job.attempts == 2
+    assert updates == ["queued", "running", "queued", "running", "done"]
+
+    job = await queue.submit("s2", {})
+    await asyncio.wait_for(job.wait(), 1)
+    await queue.close()
+    assert job.status == FAILED and job.error == "y" and queue.failed == 1
+
+@pytest.mark.asyncio
+async def test_permanent_error_is_not_retried():
+    handler = AsyncMock(side_effect=PermanentError("Session not found"))
+    queue = JobQueue(handler, workers=1, max_retries=3, backoff_base=0.001)
+    queue.start()
+    job = await queue.submit("gone", {})
+    await asyncio.wait_for(job.wait(), 1)
+    await queue.close()
+    assert job.status == FAILED and job.attempts == 1 and handler.await_count == 1
+
+@pytest.mark.asyncio
+async def test_replace_updates_queued_job_and_supersedes_running_one():
+    release = asyncio.Event()
+    calls = []
+    updates = []
+    async def handler(payload):
+        calls.append(payload)
+        await release.wait()
+        return payload
+    async def record(job):
+        updates.append((job.payload, job.status))
+
+    queue = JobQueue(handler, workers=2, on_update=record)
+    queue.start()
+    running = await queue.submit("s1", 1)
+    await asyncio.sleep(0)
+    assert running.status == "running"
+
+    latest = await queue.submit("s1", 2, replace=True)
+    assert latest is not running and queue.get("s1") is latest
+
+    queue_only = JobQueue(handler, workers=0)
+    queue_only.start()
+    queued = await queue_only.submit("s2", 1)
+    assert await queue_only.submit("s2", 2, replace=True) is queued and queued.payload == 2 and queued.status == QUEUED
+    await queue_only.close()
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(running.wait(), latest.wait()), 1)
+    await queue.close()
+    assert calls == [1, 2] and latest.result == 2
+    # The superseded job's completion is never recorded over its successor's
+    assert (1, "done") not in updates and updates[-1] == (2, "done")
+
+@pytest.mark.asyncio
+async def test_submit_rejects_when_full():
+    queue = JobQueue(AsyncMock(), workers=0, max_pending=2)
+    queue.start()
+    await queue.submit("s1", {})
+    await queue.submit("s2", {})
+    with pytest.raises(QueueFull):
+        await queue.submit("s3", {})
+    assert len(queue) == 2
+    await queue.close()
+
+def test_evaluation_endpoints():
+    evaluation = (
+        'Here you go:\n```json\n{"code_correctness": 140, "thought_process_feedback": "Clear.", '
+        '"areas_of_excellence": "Testing.", "areas_for_improvement": "Naming."}\n```'
+    )
+    mock_client = MagicMock()
+    mock_client.admin.command = AsyncMock(return_value={"ok": 1.0})
+    evaluations = mock_client.__getitem__.return_value.__getitem__.return_value = AsyncMock()
+    asyncio.run(session_store.save(InterviewSession(
+        "eval_session", question={"title": "Two Sum"}, code="def two_sum(): pass", code_version=3,
+    )))
+
+    with patch("app.main.create_mongo_client", return_value=mock_client), \
+            patch("app.main.llm_client.warm", new_callable=AsyncMock), \
+            patch("app.main.tts_http.warm", new_callable=AsyncMock), \
+            patch("app.main.llm_client.chat", new_callable=AsyncMock, return_value=evaluation) as mock_chat:
+        with TestClient(create_app()) as client:
+            assert client.post("/api/evaluate", json={"session_id": "missing"}).status_code == 404
+            assert client.post("/api/evaluate?priority=urgent", json={"session_id": "eval_session"}).status_code == 400
+
+            response = client.post("/api/evaluate?priority=high", json={"session_id": "eval_session"})
+            assert response.status_code == 202
+            for _ in range(50):
+                result = client.get("/api/evaluation/eval_session").json()
+                if result["status"] == DONE:
+                    break
+                client.portal.call(asyncio.sleep, 0.01)
+            # An unchanged session reuses the finished evaluation
+            again = client.post("/api/evaluate", json={"session_id": "eval_session"}).json()
+
+    assert result["job_id"] == response.json()["job_id"] == again["job_id"]
+    assert result["result"]["code_correctness"] == 100
+    assert result["result"]["areas_for_improvement"] == "Naming."
+    mock_chat.assert_awaited_once()
+    saved = evaluations.replace_one.await_args
+    assert saved.args[0] == {"_id": "eval_session"}
+    assert saved.args[1]["status"] == DONE and saved.args[1]["code_version"] == 3
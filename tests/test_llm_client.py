@@ -0,0 +1,112 @@
+import asyncio
+import json
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.services.llm_client import LLMClient, LLMError
+
+def completion(content):
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+async def start_stub(statuses):
+    calls = []
+
+    async def handler(request):
+        body = await request.json()
+        calls.append(body)
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        if status != 200:
+            return web.json_response({"error": "busy"}, status=status)
+        return web.json_response(completion("  Stub feedback  "))
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server, calls
+
+@pytest.mark.asyncio
+async def test_chat_returns_stripped_content():
+    server, calls = await start_stub([200])
+    client = LLMClient(api_key="test", base_url=str(server.make_url("/v1")))
+    try:
+        feedback = await client.chat([{"role": "user", "content": "hi"}], max_tokens=10)
+    finally:
+        await client.close()
+        await server.close()
+
+    assert feedback == "Stub feedback"
+    assert calls[0]["max_tokens"] == 10
+    assert calls[0]["model"] == "gpt-4o-mini"
+
+@pytest.mark.asyncio
+async def test_chat_retries_transient_errors():
+    server, calls = await start_stub([503, 429, 200])
+    client = LLMClient(api_key="test", base_url=str(server.make_url("/v1")), backoff_base=0)
+    try:
+        feedback = await client.chat([{"role": "user", "content": "hi"}])
+    finally:
+        await client.close()
+        await server.close()
+
+    assert feedback == "Stub feedback"
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_chat_does_not_retry_client_errors():
+    server, calls = await start_stub([400])
+    client = LLMClient(api_key="test", base_url=str(server.make_url("/v1")), backoff_base=0)
+    try:
+        with pytest.raises(LLMError):
+            await client.chat([{"role": "user", "content": "hi"}])
+    finally:
+        await client.close()
+        await server.close()
+
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_stream_chat_yields_deltas():
+    async def handler(request):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for token in ["Nice", " work"]:
+            chunk = {"choices": [{"delta": {"content": token}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", handler)
+    server = TestServer(app)
+    await server.start_server()
+    client = LLMClient(api_key="test", base_url=str(server.make_url("/v1")))
+    try:
+        tokens = [token async for token in client.stream_chat([{"role": "user", "content": "hi"}])]
+    finally:
+        await client.close()
+        await server.close()
+
+    assert tokens == ["Nice", " work"]
+
+@pytest.mark.asyncio
+async def test_backoff_does_not_hold_a_concurrency_slot():
+    server, calls = await start_stub([503, 200])
+    client = LLMClient(api_key="test", base_url=str(server.make_url("/v1")), max_concurrency=1)
+    client._backoff = lambda attempt, retry_after=None: 0.3
+    finished = []
+
+    async def call(name, delay=0):
+        await asyncio.sleep(delay)
+        await client.chat([{"role": "user", "content": name}])
+        finished.append(name)
+
+    try:
+        # The retrying call sleeps 0.3s; the second one runs in its freed slot meanwhile
+        await asyncio.wait_for(asyncio.gather(call("retrying"), call("fresh", delay=0.05)), 2)
+    finally:
+        await client.close()
+        await server.close()
+
+    assert finished == ["fresh", "retrying"]
+    assert len(calls) == 3
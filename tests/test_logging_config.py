@@ -0,0 +1,36 @@
+import logging
+from app.logging_config import RedactingFilter, SamplingFilter
+
+def make_record(msg, *args, **extra):
+    record = logging.LogRecord("app.main", logging.DEBUG, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_redacts_tokens_and_truncates():
+    record = make_record("Headers: %s", {"authorization": "Bearer abc.def-ghi_jkl", "x-api-key": "sk-12345678"})
+    RedactingFilter().filter(record)
+    assert "abc.def-ghi_jkl" not in record.getMessage()
+    assert "sk-12345678" not in record.getMessage()
+
+    record = make_record("Code: %s", "x" * 5000)
+    RedactingFilter(max_chars=100).filter(record)
+    assert len(record.getMessage()) < 200
+    assert "truncated" in record.getMessage()
+
+def test_redacts_opaque_bearer_and_token_headers():
+    for line in (
+        "Authorization: Bearer sk-abcdefgh12345",
+        "authorization=Token dg_0123456789abcdef, retrying",
+        "Authorization: Basic dXNlcjpwYXNz",
+    ):
+        record = make_record(line)
+        RedactingFilter().filter(record)
+        message = record.getMessage()
+        assert "sk-abcdefgh12345" not in message and "dg_0123456789abcdef" not in message and "dXNlcjpwYXNz" not in message
+        assert "[REDACTED]" in message
+
+def test_sampling_keeps_one_in_n_per_key():
+    sampler = SamplingFilter(every=10)
+    kept = [sampler.filter(make_record("chunk", sample="tts_chunk")) for _ in range(25)]
+    assert sum(kept) == 3
+    assert sampler.filter(make_record("unsampled"))
@@ -0,0 +1,48 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.metrics import MetricsRegistry, track_stage, stage_errors, stage_latency
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_latency_seconds", "Test latency.", ("stage",), buckets=(0.1, 1.0))
+    latency.observe(0.05, "llm")
+    latency.observe(0.5, "llm")
+    latency.observe(3.0, "llm")
+
+    text = registry.render()
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert 'test_latency_seconds_bucket{stage="llm",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="llm",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{stage="llm",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{stage="llm"} 3' in text
+
+def test_track_stage_counts_errors():
+    before = stage_errors.value("test_stage")
+    with pytest.raises(RuntimeError):
+        with track_stage("test_stage"):
+            raise RuntimeError("boom")
+    assert stage_errors.value("test_stage") == before + 1
+    assert stage_latency.count("test_stage") >= 1
+
+def test_metrics_endpoint_exposes_http_latency():
+    client = TestClient(app)
+    client.get("/")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'viewee_http_request_duration_seconds_count{method="GET",handler="read_root",status="200"}' in response.text
+
+def test_monotonic_totals_are_exported_as_counters():
+    registry = MetricsRegistry()
+    registry.callback_counter("test_hits_total", "Test hits.", lambda: 3)
+    registry.callback_gauge("test_queue_depth", "Test depth.", lambda: 1)
+
+    text = registry.render()
+    assert "# TYPE test_hits_total counter\ntest_hits_total 3" in text
+    assert "# TYPE test_queue_depth gauge" in text
+
+    exposed = TestClient(app).get("/metrics").text
+    assert "# TYPE viewee_tts_cache_hits_total counter" in exposed
+    assert "# TYPE viewee_evaluations_failed_total counter" in exposed
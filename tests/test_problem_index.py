@@ -0,0 +1,44 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.services.problem_index import ProblemNameIndex
+
+NAMES = ["Two Sum", "Two Sum II - Input Array Is Sorted", "3Sum", "Add Two Numbers", "Longest Palindromic Substring"]
+
+@pytest.fixture
+def index():
+    index = ProblemNameIndex()
+    for name in NAMES:
+        index.add(name)
+    return index
+
+def names(results):
+    return [result["problem_name"] for result in results]
+
+def test_exact_match_ranks_first(index):
+    assert names(index.search("two sum"))[:2] == ["Two Sum", "Two Sum II - Input Array Is Sorted"]
+
+def test_prefix_and_word_prefix(index):
+    assert names(index.search("longest"))[0] == "Longest Palindromic Substring"
+    assert "Add Two Numbers" in names(index.search("numb"))
+
+def test_fuzzy_match_tolerates_typos(index):
+    assert names(index.search("palindromc substrng"))[0] == "Longest Palindromic Substring"
+
+def test_limit_and_empty_query(index):
+    assert len(index.search("two", limit=1)) == 1
+    assert index.search("   ") == []
+
+@pytest.mark.asyncio
+async def test_load_is_incremental():
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{"_id": 1, "problem_name": "Two Sum"}, {"_id": 2, "problem_name": "3Sum"}])
+    collection = MagicMock()
+    collection.find.return_value.sort.return_value = cursor
+    index = ProblemNameIndex()
+
+    await index.load(collection)
+    cursor.to_list.return_value = []
+    await index.load(collection)
+
+    assert len(index) == 2
+    assert collection.find.call_args_list[1].args[0] == {"_id": {"$gt": 2}}
@@ -0,0 +1,85 @@
+import pytest
+from unittest.mock import patch
+from app.services.session_store import InMemorySessionStore, InterviewSession
+
+def test_session_supports_item_access():
+    session = InterviewSession("s1", question={"title": "Two Sum"})
+    session["transcript"] += " hello"
+    assert session["transcript"] == " hello"
+    assert session.get("summary", "") == ""
+    assert session.get("not_a_field", "default") == "default"
+    with pytest.raises(KeyError):
+        session["not_a_field"] = 1
+    assert InterviewSession.from_dict(session.to_dict()).to_dict() == session.to_dict()
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_evicted():
+    store = InMemorySessionStore(idle_ttl=60)
+    with patch("app.services.session_store.time.monotonic", return_value=1000.0):
+        session = await store.create({"title": "Two Sum"})
+    with patch("app.services.session_store.time.monotonic", return_value=1030.0):
+        assert await store.get(session.session_id) is session
+    with patch("app.services.session_store.time.monotonic", return_value=1091.0):
+        assert await store.get(session.session_id) is None
+    assert len(store) == 0
+
+@pytest.mark.asyncio
+async def test_memory_cap_evicts_least_recently_used():
+    store = InMemorySessionStore(max_bytes=3000)
+    first = await store.create({"title": "first"})
+    second = await store.create({"title": "second"})
+    await store.get(first.session_id)
+
+    second["code"] = "x" * 1000
+    await store.save(second)
+    third = await store.create({"title": "third"})
+    third["transcript"] = "y" * 1500
+    await store.save(third)
+
+    assert await store.get(first.session_id) is None
+    assert await store.get(third.session_id) is third
+
+def test_incomplete_backend_fails_at_construction():
+    from app.services.session_store import SessionStore
+
+    class GetOnlyStore(SessionStore):
+        async def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyStore()
+
+@pytest.mark.asyncio
+async def test_mongo_store_merges_concurrent_saves():
+    from fake_mongo import FakeCollection
+    from app.services.session_store import MongoSessionStore
+
+    store = MongoSessionStore(FakeCollection(latency=0))
+    session = await store.create({"title": "Two Sum"})
+    first = await store.get(session.session_id)
+    second = await store.get(session.session_id)
+
+    first["transcript"] += " use a hash map"
+    first["code"] = "def two_sum(): ..."
+    first["code_version"] += 1
+    first["feedback_seq"] += 1
+    await store.save(first)
+    second["transcript"] += " check duplicates"
+    second["feedback_seq"] += 1
+    await store.save(second)
+
+    stored = await store.get(session.session_id)
+    assert stored["transcript"] == " use a hash map check duplicates"
+    assert stored["code"] == "def two_sum(): ..." and stored["code_version"] == 1
+    assert stored["feedback_seq"] == second["feedback_seq"] == 2
+
+    # Feedback for a superseded sequence number is not written
+    assert not await store.update_fields(session.session_id, {"feedback": "stale"}, expect={"feedback_seq": 1})
+    assert await store.update_fields(session.session_id, {"feedback": "fresh"}, expect={"feedback_seq": 2})
+    assert (await store.get(session.session_id))["feedback"] == "fresh"
+
+def test_mongo_store_idle_ttl_from_env(monkeypatch):
+    from app.services.session_store import MongoSessionStore
+
+    monkeypatch.setenv("SESSION_IDLE_TTL_SECONDS", "600")
+    assert MongoSessionStore.from_env(object()).idle_ttl == 600
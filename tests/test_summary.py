@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from app.services.session_store import InMemorySessionStore, InterviewSession, MongoSessionStore
+from app.services.summary import SummaryCompactor, count_tokens, split_at_tokens, tail_tokens
+
+def test_tail_tokens_keeps_most_recent_tokens():
+    assert tail_tokens("one two three four", 2) == "three four"
+    assert tail_tokens("short", 10) == "short"
+    assert count_tokens("a, b.") == 4
+
+def test_split_at_tokens():
+    older, recent = split_at_tokens("a b c d e", 2)
+    assert (older, recent) == ("a b c ", "d e")
+
+@pytest.mark.asyncio
+async def test_compaction_condenses_older_segments_and_keeps_new_updates():
+    release = asyncio.Event()
+
+    async def condense(text, target):
+        await release.wait()
+        return "Uses hash map."
+
+    store = InMemorySessionStore()
+    session = InterviewSession("s1", summary=" ".join(f"w{i}" for i in range(1, 21)))
+    await store.save(session)
+    compactor = SummaryCompactor(condense, store.replace_summary_prefix, budget=16)
+    compactor.schedule(session)
+    compactor.schedule(session)
+    await asyncio.sleep(0)
+
+    # An update lands while the condense call is still in flight
+    session["summary"] += " w21"
+    release.set()
+    await asyncio.gather(*compactor._tasks)
+
+    assert session["summary"] == "Uses hash map. " + " ".join(f"w{i}" for i in range(13, 22))
+    assert session["summary_tokens"] == count_tokens(session["summary"])
+
+@pytest.mark.asyncio
+async def test_compaction_falls_back_to_truncation():
+    async def condense(text, target):
+        raise RuntimeError("upstream down")
+
+    replaced = []
+    async def on_compacted(session_id, snapshot, replacement):
+        replaced.append((session_id, snapshot, replacement))
+        return True
+
+    compactor = SummaryCompactor(condense, on_compacted, budget=8)
+    summary = "w1 w2 w3 w4 w5 w6 w7 w8 w9 w10"
+    await compactor.compact({"session_id": "s1", "summary": summary})
+
+    assert replaced == [("s1", summary, "w5 w6 w7 w8 w9 w10")]
+
+@pytest.mark.asyncio
+async def test_mongo_compaction_only_touches_the_summary():
+    from fake_mongo import FakeCollection
+
+    async def condense(text, target):
+        # Another request saves new code and transcript while the LLM call runs
+        latest = await store.get("s1")
+        latest["code"] = "def f(): return 1"
+        latest["code_version"] += 1
+        latest["summary"] += " w21"
+        await store.save(latest)
+        return "Condensed."
+
+    store = MongoSessionStore(FakeCollection(latency=0))
+    await store.save(InterviewSession("s1", summary=" ".join(f"w{i}" for i in range(1, 21))))
+    stale = await store.get("s1")
+    await SummaryCompactor(condense, store.replace_summary_prefix, budget=16).compact(stale)
+
+    stored = await store.get("s1")
+    assert stored["summary"] == "Condensed. " + " ".join(f"w{i}" for i in range(13, 22))
+    assert stored["code"] == "def f(): return 1" and stored["code_version"] == 1
@@ -0,0 +1,109 @@
+import asyncio
+import os
+from unittest.mock import patch
+import pytest
+from app.services.tts_cache import AudioCache, audio_cache_key
+
+def counting_producer(chunks, calls, delay=0):
+    async def produce():
+        calls.append(1)
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+    return produce
+
+async def collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+def test_cache_key_covers_voice_and_encoding():
+    key = audio_cache_key("Hello", "aura-asteria-en", "mp3")
+    assert key == audio_cache_key("Hello", "aura-asteria-en", "mp3")
+    assert key != audio_cache_key("Hello", "aura-asteria-en", "opus")
+    assert key != audio_cache_key("Hello", "aura-luna-en", "mp3")
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_synthesis():
+    cache = AudioCache()
+    calls = []
+    producer = counting_producer([b"ab", b"cd", b"ef"], calls, delay=0.01)
+
+    results = await asyncio.gather(*(collect(cache.stream("k", producer)) for _ in range(5)))
+
+    assert results == [b"abcdef"] * 5
+    assert len(calls) == 1
+    assert await collect(cache.stream("k", producer)) == b"abcdef"
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_failed_synthesis_is_not_cached():
+    cache = AudioCache()
+
+    async def broken():
+        yield b"partial"
+        raise RuntimeError("upstream reset")
+
+    with pytest.raises(RuntimeError):
+        await collect(cache.stream("k", broken))
+    assert "k" not in cache
+
+@pytest.mark.asyncio
+async def test_memory_budget_spills_to_disk(tmp_path):
+    cache = AudioCache(max_bytes=10, spill_dir=str(tmp_path), chunk_size=4)
+    calls = []
+    await collect(cache.stream("first", counting_producer([b"123456"], calls)))
+    await collect(cache.stream("second", counting_producer([b"abcdef"], calls)))
+    # Spilling happens after the stream ends; wait for the background writes
+    await asyncio.gather(*cache._tasks)
+
+    assert "first" not in cache._memory
+    assert (tmp_path / "first.audio").read_bytes() == b"123456"
+    assert await collect(cache.stream("first", counting_producer([b"x"], calls))) == b"123456"
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_clip_being_spilled_is_still_a_hit(tmp_path):
+    cache = AudioCache(max_bytes=4, spill_dir=str(tmp_path))
+    calls = []
+    writing = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def slow_to_thread(func, *args):
+        writing.set()
+        await finish.wait()
+        func(*args)
+
+    with patch("app.services.tts_cache.asyncio.to_thread", new=slow_to_thread):
+        await collect(cache.stream("big", counting_producer([b"123456"], calls)))
+        await writing.wait()
+        # In neither index yet, but the bytes are still served without a second synthesis
+        assert "big" not in cache._memory and "big" not in cache._disk
+        assert await collect(cache.stream("big", counting_producer([b"x"], calls))) == b"123456"
+        finish.set()
+        await asyncio.gather(*cache._tasks)
+
+    assert len(calls) == 1 and "big" in cache._disk and not cache._spilling
+
+@pytest.mark.asyncio
+async def test_disk_stream_opens_file_lazily_and_resynthesizes_if_missing(tmp_path):
+    (tmp_path / "k.audio").write_bytes(b"cached")
+    cache = AudioCache(spill_dir=str(tmp_path))
+    calls = []
+
+    with patch("builtins.open", side_effect=open) as opened:
+        cache.stream("k", counting_producer([b"fresh"], calls))
+    assert not opened.called
+
+    (tmp_path / "k.audio").unlink()
+    assert await collect(cache.stream("k", counting_producer([b"fresh"], calls))) == b"fresh"
+    assert len(calls) == 1 and "k" not in cache._disk
+
+def test_disk_budget_is_enforced_at_startup(tmp_path):
+    for i, name in enumerate(["old", "mid", "new"]):
+        path = tmp_path / f"{name}.audio"
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (i, i))
+
+    cache = AudioCache(spill_dir=str(tmp_path), disk_max_bytes=25)
+
+    assert list(cache._disk) == ["mid", "new"] and cache._disk_bytes == 20
+    assert not (tmp_path / "old.audio").exists()
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+import pytest
+from app.services.tts_cache import audio_cache_key
+from app.services.tts_format import TTSFormat, UnsupportedFormat
+
+def test_default_format_matches_previous_requests():
+    fmt = TTSFormat.negotiate()
+    assert fmt.query() == {"model": "aura-asteria-en", "encoding": "mp3"}
+    assert fmt.cache_tag == "mp3" and fmt.segmentable
+    # Clips cached before formats were negotiable keep their keys
+    assert audio_cache_key("Hi.", fmt.model, fmt.cache_tag) == audio_cache_key("Hi.", "aura-asteria-en", "mp3")
+
+def test_negotiated_formats():
+    pcm = TTSFormat.negotiate(encoding="linear16", sample_rate=16000, model="aura-luna-en")
+    assert pcm.query() == {"model": "aura-luna-en", "encoding": "linear16", "container": "none", "sample_rate": "16000"}
+    assert pcm.segmentable and pcm.accepts("audio/l16; rate=16000")
+
+    opus = TTSFormat.negotiate(encoding="OPUS", bit_rate=24000)
+    assert opus.query()["container"] == "ogg" and opus.query()["bit_rate"] == "24000"
+    assert not opus.segmentable and opus.accepts("audio/ogg") and not opus.accepts("audio/mpeg")
+    assert len({pcm.cache_tag, opus.cache_tag, TTSFormat.negotiate(encoding="opus").cache_tag}) == 3
+
+@pytest.mark.parametrize("kwargs", [
+    {"encoding": "flac"},
+    {"encoding": "mp3", "sample_rate": 44100},
+    {"encoding": "linear16", "sample_rate": 11025},
+    {"encoding": "wav", "bit_rate": 64000},
+    {"model": "aura-unknown-en"},
+])
+def test_rejects_outside_allow_list(kwargs):
+    with pytest.raises(UnsupportedFormat):
+        TTSFormat.negotiate(**kwargs)
+
+def import_main(**env):
+    return subprocess.run(
+        [sys.executable, "-c", "import app.main as m; print(','.join(m.TTS_MODELS)); print(m.DEFAULT_TTS_FORMAT.encoding)"],
+        env={**os.environ, **env}, capture_output=True, text=True,
+    )
+
+def test_tts_defaults_are_validated_and_models_stripped_at_import():
+    ok = import_main(TTS_MODELS=" aura-luna-en , aura-orion-en,", TTS_DEFAULT_ENCODING="Linear16")
+    assert ok.returncode == 0, ok.stderr
+    assert ok.stdout.split() == ["aura-luna-en,aura-orion-en,aura-asteria-en", "linear16"]
+
+    bad = import_main(TTS_DEFAULT_ENCODING="flac")
+    assert bad.returncode != 0 and "TTS_DEFAULT_ENCODING" in bad.stderr
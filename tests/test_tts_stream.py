@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from app.services.tts_stream import coalesce_frames, split_sentences, stream_in_order
+
+def test_split_sentences_joins_short_fragments():
+    text = "Okay. Your loop is correct for the sample input. What happens when the list is empty? Nice."
+    assert split_sentences(text) == [
+        "Okay. Your loop is correct for the sample input.",
+        "What happens when the list is empty? Nice.",
+    ]
+    assert split_sentences("Fine.") == ["Fine."]
+    assert split_sentences("  ") == []
+
+@pytest.mark.asyncio
+async def test_stream_in_order_bounds_fan_out_and_keeps_order():
+    running = 0
+    peak = 0
+
+    def open_stream(item):
+        # Starts work eagerly, like AudioCache.stream
+        async def work():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.03 if item == "a" else 0.01)
+            running -= 1
+            return [f"{item}1".encode(), f"{item}2".encode()]
+
+        task = asyncio.ensure_future(work())
+
+        async def chunks():
+            for chunk in await task:
+                yield chunk
+        return chunks()
+
+    chunks = [chunk async for chunk in stream_in_order(["a", "b", "c", "d"], open_stream, max_parallel=2)]
+    assert chunks == [b"a1", b"a2", b"b1", b"b2", b"c1", b"c2", b"d1", b"d2"]
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_coalesce_frames_groups_by_size_and_delay():
+    async def source():
+        for _ in range(10):
+            yield b"x" * 100
+        await asyncio.sleep(0.05)
+        yield b"y" * 10
+
+    frames = [frame async for frame in coalesce_frames(source(), frame_bytes=400, max_delay=0.02)]
+    assert [len(frame) for frame in frames] == [400, 400, 200, 10]
+
+@pytest.mark.asyncio
+async def test_coalesce_frames_applies_backpressure():
+    produced = 0
+
+    async def source():
+        nonlocal produced
+        for _ in range(100):
+            produced += 1
+            yield b"x"
+
+    frames = coalesce_frames(source(), frame_bytes=1, max_delay=0, max_queued_chunks=4)
+    assert await frames.__anext__() == b"x"
+    await asyncio.sleep(0.01)
+    # The consumer is "blocked": the reader stops once the queue is full
+    assert produced <= 6
+    await frames.aclose()
+
+@pytest.mark.asyncio
+async def test_coalesce_frames_propagates_errors():
+    async def source():
+        yield b"x"
+        raise RuntimeError("upstream failed")
+
+    with pytest.raises(RuntimeError):
+        async for _ in coalesce_frames(source(), frame_bytes=1024, max_delay=0.01):
+            pass
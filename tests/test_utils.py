@@ -14,3 +14,10 @@ def test_construct_prompt():
     assert "Step 1 done." in prompt["user_prompt"]
     assert "Step 2 ongoing." in prompt["user_prompt"]
     assert "You are a Technical Interviewer" in prompt["system_message"]
+
+def test_construct_prompt_caps_summary():
+    session = {"summary": " ".join(f"step{i}" for i in range(5000))}
+    prompt = construct_prompt(session, "Latest.")
+
+    assert "step4999" in prompt["user_prompt"]
+    assert "step0 " not in prompt["user_prompt"]
@@ -1,11 +1,15 @@
 import pytest
 from starlette.testclient import TestClient
-from app.main import app, sessions
+from starlette.websockets import WebSocketDisconnect
+import asyncio
+from unittest.mock import patch
+from app.main import app, session_store
+from app.services.session_store import InterviewSession
 
 @pytest.mark.asyncio
 def test_websocket_tts():
     # Add a mock session with feedback
-    sessions["mock_session"] = {"feedback": "This is a test feedback"}
+    asyncio.run(session_store.save(InterviewSession("mock_session", feedback="This is a test feedback")))
 
     with TestClient(app) as client:
         with client.websocket_connect("/ws/tts?session_id=mock_session") as websocket:
@@ -13,3 +17,44 @@ def test_websocket_tts():
             binary_data = websocket.receive_bytes()
             assert binary_data is not None
             assert len(binary_data) > 0
+
+def test_websocket_tts_streams_sentences_in_order():
+    requested = []
+
+    async def fake_synthesize(text, tts_format=None):
+        requested.append(text)
+        await asyncio.sleep(0.02 if text.startswith("First") else 0)
+        yield text.encode()
+
+    feedback = "First, check the empty input. Then consider a hash map."
+    asyncio.run(session_store.save(InterviewSession("sentence_session", feedback=feedback)))
+
+    with patch("app.main.synthesize_speech", new=fake_synthesize):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/tts?session_id=sentence_session") as websocket:
+            audio = websocket.receive_bytes()
+
+    assert audio == b"First, check the empty input.Then consider a hash map."
+    assert sorted(requested) == ["First, check the empty input.", "Then consider a hash map."]
+
+def test_websocket_tts_negotiates_format():
+    formats = []
+
+    async def fake_synthesize(text, tts_format=None):
+        formats.append((text, tts_format.query()))
+        yield b"\x00\x01"
+
+    feedback = "Walk me through the complexity. What happens with duplicates?"
+    asyncio.run(session_store.save(InterviewSession("format_session", feedback=feedback)))
+
+    with patch("app.main.synthesize_speech", new=fake_synthesize):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/tts?session_id=format_session&encoding=wav&sample_rate=24000") as websocket:
+            assert websocket.receive_bytes() == b"\x00\x01"
+        with client.websocket_connect("/ws/tts?session_id=format_session&encoding=flac") as websocket:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_bytes()
+
+    # A WAV header per clip would break playback, so the feedback is synthesized as one clip
+    assert formats == [(feedback, {"model": "aura-asteria-en", "encoding": "linear16", "container": "wav", "sample_rate": "24000"})]
+    assert closed.value.code == 1003